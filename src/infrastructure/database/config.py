@@ -1,4 +1,8 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from litestar.plugins.sqlalchemy import SQLAlchemyAsyncConfig
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .models import Base
 from src.shared.settings import settings
@@ -14,3 +18,17 @@ def get_database_config() -> SQLAlchemyAsyncConfig:
         engine_dependency_key="db_engine",
         before_send_handler="autocommit"
     )
+
+
+# Configuración compartida por la app y por las sesiones fuera de request
+db_config = get_database_config()
+
+
+@asynccontextmanager
+async def pooled_session() -> AsyncIterator[AsyncSession]:
+    """
+    Sesión independiente tomada del pool del engine de la app.
+    Permite lecturas concurrentes sin compartir la sesión de la conexión.
+    """
+    async with db_config.get_session() as session:
+        yield session
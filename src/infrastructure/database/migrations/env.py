@@ -34,7 +34,7 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
-from src.database.models import Base
+from src.infrastructure.database.models import Base
 target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
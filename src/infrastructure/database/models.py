@@ -40,7 +40,7 @@ class ConfiguracionIA(Base):
     temperatura: Mapped[float] = mapped_column(nullable=False, default=0.7)
     min_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=50)
     max_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=300)
-    model: Mapped[str] = mapped_column(String(100), nullable=False, default="gpt-4")
+    model: Mapped[str] = mapped_column(String(100), nullable=False, default="gemini-2.0-flash")
     auto_derivacion_activa: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -164,3 +164,27 @@ class Mensaje(Base):
     def __repr__(self) -> str:
         return f"<Mensaje(id={self.id}, tipo='{self.tipo.value}', remitente='{self.remitente}', es_derivacion={self.es_derivacion})>"
 
+
+
+class LlamadaIA(Base):
+    """Telemetría de cada mensaje procesado por la IA (latencia, tokens, modelo y decisión)"""
+    __tablename__ = "ai_llamadas"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Sin FK: la telemetría no debe bloquear ni depender del ciclo de vida de las conversaciones
+    id_conversacion: Mapped[Optional[int]] = mapped_column(Integer, index=True)
+    origen: Mapped[str] = mapped_column(String(20), nullable=False)  # proveedor | compartida | cache | error | cancelada
+    modelo: Mapped[Optional[str]] = mapped_column(String(100))
+    escalado: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    latencia_ms: Mapped[int] = mapped_column(Integer, nullable=False)
+    tokens_entrada: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    tokens_salida: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    tokens_cacheados: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    confianza: Mapped[Optional[float]] = mapped_column()
+    derivar: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    id_area: Mapped[Optional[int]] = mapped_column(Integer)
+    error: Mapped[Optional[str]] = mapped_column(String(255))
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self) -> str:
+        return f"<LlamadaIA(id={self.id}, origen='{self.origen}', modelo='{self.modelo}', latencia_ms={self.latencia_ms})>"
@@ -0,0 +1,230 @@
+import re
+import time
+from collections import Counter as ShapeCounter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.infrastructure.database.config import db_config
+from src.shared.settings.base import settings
+from src.shared.utils.metrics import metrics_registry
+from src.shared.utils.tracing import tracer
+
+
+# Las listas de IN (...) varían en largo; se colapsan para que cuenten como la misma consulta
+_IN_LIST = re.compile(r"\(\s*(?:%s|\?|:\w+)(?:\s*,\s*(?:%s|\?|:\w+))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+_MAX_LOGGED_CHARS = 500
+
+# Conteo de consultas por unidad: de 1 a cientos (una tormenta de N+1)
+_QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250, 500)
+
+db_statements_total = metrics_registry.counter(
+    "prism_db_statements_total",
+    "Sentencias SQL ejecutadas por tipo (select, insert, update, delete, other)",
+    labelnames=("kind",)
+)
+
+db_slow_queries_total = metrics_registry.counter(
+    "prism_db_slow_queries_total",
+    "Sentencias SQL que superaron el umbral de consulta lenta"
+)
+
+db_unit_queries = metrics_registry.histogram(
+    "prism_db_unit_queries",
+    "Sentencias SQL por unidad de trabajo (request HTTP o mensaje WebSocket)",
+    labelnames=("unit",),
+    buckets=_QUERY_COUNT_BUCKETS
+)
+
+db_unit_seconds = metrics_registry.histogram(
+    "prism_db_unit_seconds",
+    "Tiempo total en la BD por unidad de trabajo",
+    labelnames=("unit",)
+)
+
+db_n_plus_one_total = metrics_registry.counter(
+    "prism_db_n_plus_one_total",
+    "Unidades de trabajo en las que se detectó un patrón N+1",
+    labelnames=("unit",)
+)
+
+
+
+def statement_shape(statement: str) -> str:
+    """Forma normalizada de una sentencia: sin saltos de línea ni largo variable de IN"""
+    return _IN_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def _truncate(value: Any) -> str:
+    text = str(value)
+    return text if len(text) <= _MAX_LOGGED_CHARS else text[:_MAX_LOGGED_CHARS] + "…"
+
+
+
+class QueryUnit:
+    """Consultas de una unidad de trabajo: conteo, tiempo y repeticiones por forma"""
+
+    __slots__ = ("name", "queries", "seconds", "shapes", "flagged")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.queries = 0
+        self.seconds = 0.0
+        self.shapes: ShapeCounter = ShapeCounter()
+        self.flagged: List[str] = []
+
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "db_queries": self.queries,
+            "db_time_ms": round(self.seconds * 1000, 2),
+            "db_n_plus_one": len(self.flagged)
+        }
+
+
+
+_current_unit: ContextVar[Optional[QueryUnit]] = ContextVar("current_query_unit", default=None)
+
+
+
+class QueryMonitor:
+    """
+    Monitor de consultas SQL basado en los eventos del engine.
+
+    before/after_cursor_execute corren en el greenlet de SQLAlchemy, que
+    hereda el contexto de la corrutina que hizo la consulta: el ContextVar de
+    la unidad activa (request o mensaje) llega intacto. Fuera de una unidad,
+    las sentencias solo suman a los contadores globales.
+    """
+
+    def __init__(self, enabled: bool, slow_query_ms: float, n_plus_one_threshold: int):
+        self.enabled = enabled
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._engines: List[AsyncEngine] = []
+        self._statements = 0
+        self._slow = 0
+        self._units = 0
+        self._n_plus_one = 0
+
+
+    def install(self, engine: AsyncEngine) -> None:
+        """Registra los eventos sobre el engine (idempotente)"""
+
+        if not self.enabled or engine in self._engines:
+            return
+
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        self._engines.append(engine)
+        print("🔎 Monitor de consultas SQL instalado")
+
+
+    @contextmanager
+    def unit(self, name: str) -> Iterator[Optional[QueryUnit]]:
+        """Agrupa las consultas de un request o mensaje y las reporta al terminar"""
+
+        if not self.enabled:
+            yield None
+            return
+
+        query_unit = QueryUnit(name)
+        token = _current_unit.set(query_unit)
+        try:
+            yield query_unit
+        finally:
+            _current_unit.reset(token)
+            self._finish(query_unit)
+
+
+    @staticmethod
+    def current_unit() -> Optional[QueryUnit]:
+        return _current_unit.get()
+
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "installed": bool(self._engines),
+            "statements": self._statements,
+            "slow": self._slow,
+            "units": self._units,
+            "n_plus_one": self._n_plus_one,
+            "slow_query_ms": self.slow_query_seconds * 1000,
+            "n_plus_one_threshold": self.n_plus_one_threshold
+        }
+
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        started_stack = conn.info.get("query_started")
+        if not started_stack:
+            return
+
+        started = started_stack.pop()
+        ended = time.perf_counter()
+        elapsed = ended - started
+
+        self._statements += 1
+        kind = statement.lstrip()[:6].lower()
+        db_statements_total.inc(kind=kind if kind in ("select", "insert", "update", "delete") else "other")
+
+        if elapsed >= self.slow_query_seconds:
+            self._slow += 1
+            db_slow_queries_total.inc()
+            print(
+                f"🐢 Consulta lenta ({elapsed * 1000:.1f} ms): {_truncate(statement_shape(statement))} "
+                f"| params={_truncate(parameters)}"
+            )
+
+        query_unit = _current_unit.get()
+        if query_unit is None:
+            return
+
+        shape = statement_shape(statement)
+        query_unit.queries += 1
+        query_unit.seconds += elapsed
+        query_unit.shapes[shape] += 1
+        tracer.record_span("sql", started, ended, statement=_truncate(shape))
+
+        # Se avisa una sola vez por forma, al cruzar el umbral
+        if query_unit.shapes[shape] == self.n_plus_one_threshold:
+            query_unit.flagged.append(shape)
+
+
+    def _finish(self, query_unit: QueryUnit) -> None:
+        self._units += 1
+        db_unit_queries.observe(query_unit.queries, unit=query_unit.name)
+        db_unit_seconds.observe(query_unit.seconds, unit=query_unit.name)
+        tracer.annotate(**query_unit.summary())
+
+        if query_unit.flagged:
+            self._n_plus_one += 1
+            db_n_plus_one_total.inc(unit=query_unit.name)
+            for shape in query_unit.flagged:
+                print(
+                    f"⚠️ Posible N+1 en {query_unit.name}: {query_unit.shapes[shape]} ejecuciones de "
+                    f"{_truncate(shape)}"
+                )
+
+
+
+# Monitor único del proceso (se instala sobre el engine al arrancar la app)
+query_monitor = QueryMonitor(
+    enabled=settings.db_monitor_enabled,
+    slow_query_ms=settings.db_slow_query_ms,
+    n_plus_one_threshold=settings.db_n_plus_one_threshold
+)
+
+
+def install_query_monitor() -> None:
+    """Hook de inicio: instala el monitor sobre el engine de la app"""
+    query_monitor.install(db_config.get_engine())
@@ -0,0 +1,27 @@
+from litestar.enums import ScopeType
+from litestar.middleware import ASGIMiddleware
+from litestar.types import ASGIApp, Receive, Scope, Send
+
+from src.infrastructure.database.query_monitor import query_monitor
+from src.shared.utils.tracing import tracer
+
+
+
+class RequestObservabilityMiddleware(ASGIMiddleware):
+    """
+    Traza y unidad de consultas SQL por request HTTP.
+
+    Los mensajes WebSocket abren su propia traza y unidad en el controlador
+    de chat, porque una conexión dura muchos mensajes.
+    """
+
+    scopes = (ScopeType.HTTP,)
+    exclude_path_pattern = ("^/static", "^/metrics")
+
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send, next_app: ASGIApp) -> None:
+        # La plantilla de la ruta (no el path real) mantiene acotadas las series de métricas
+        unit_name = f"{scope['method']} {scope.get('path_template', scope['path'])}"
+
+        with tracer.start_trace(f"http.{unit_name}"), query_monitor.unit(unit_name):
+            await next_app(scope, receive, send)
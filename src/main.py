@@ -1,9 +1,14 @@
 from litestar import Litestar
 from litestar.plugins.sqlalchemy import SQLAlchemyPlugin
 
-from src.shared.settings import template_config, static_files, logging_config
+from src.shared.settings import (
+    template_config, static_files, asset_manifest, precompile_templates, logging_config, compression_config
+)
 from src.modules.client.controllers import main_router
-from src.infrastructure.database.config import get_database_config
+from src.infrastructure.database.config import db_config
+from src.infrastructure.database.query_monitor import install_query_monitor
+from src.infrastructure.observability import RequestObservabilityMiddleware
+from src.modules.client.services import ai_call_telemetry, session_recorder
 
 
 
@@ -11,7 +16,11 @@ app = Litestar(
     route_handlers=[main_router, static_files],
     template_config=template_config,
     plugins=[
-        SQLAlchemyPlugin(config=get_database_config())
+        SQLAlchemyPlugin(config=db_config)
     ],
-    logging_config=logging_config
+    logging_config=logging_config,
+    compression_config=compression_config,
+    middleware=[RequestObservabilityMiddleware()],
+    on_startup=[asset_manifest.build, precompile_templates, install_query_monitor, ai_call_telemetry.start],
+    on_shutdown=[ai_call_telemetry.stop, session_recorder.stop]
 )
@@ -1,6 +1,8 @@
 from litestar import Router
 from .api import api_router
 from .web import web_router
+from .metrics_controller import MetricsController
+from .demo_controller import DemoController
 
 
 
@@ -10,6 +12,8 @@ main_router = Router(
     route_handlers=[
         api_router,  # Tendrá prefijo /api
         web_router,  # Sin prefijo
+        MetricsController,  # /metrics para Prometheus
+        DemoController,  # /api/demo para el backend en memoria
     ]
 )
 
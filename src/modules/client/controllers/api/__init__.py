@@ -3,6 +3,7 @@ from litestar import Router
 from .area_controller import AreaController
 from .chat_controller import ChatWebSocketController
 from .configuracion_ai_controller import ConfiguracionIAController
+from .traces_controller import TracesController
 
 
 
@@ -11,7 +12,8 @@ api_router = Router(
     route_handlers=[
         AreaController,
         ChatWebSocketController,
-        ConfiguracionIAController
+        ConfiguracionIAController,
+        TracesController
     ],
     tags=["API"],
 )
@@ -1,8 +1,11 @@
 from typing import List, Optional, Dict, Any
 
+from pydantic import TypeAdapter
 from litestar import Controller, get, post, put, patch, delete
 from litestar.di import Provide
 from litestar.exceptions import HTTPException
+from litestar.params import Parameter
+from litestar.response import Response
 from litestar.status_codes import HTTP_200_OK, HTTP_201_CREATED, HTTP_204_NO_CONTENT, HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND
 
 from src.modules.client.dependencies import (
@@ -17,7 +20,10 @@ from src.modules.client.schemas import (
     AreaStatsDTO
 )
 
-from src.modules.client.services import AreaService
+from src.modules.client.services import AreaService, area_listing_cache
+
+
+_AREA_LIST_ADAPTER = TypeAdapter(List[AreaResponseDTO])
 
 
 
@@ -34,48 +40,71 @@ class AreaController(Controller):
     async def get_all_areas(
         self,
         area_service: AreaService,
-        include_inactive: bool = True
-    ) -> List[AreaResponseDTO]:
+        include_inactive: bool = True,
+        if_none_match: Optional[str] = Parameter(header="If-None-Match", default=None)
+    ) -> Response[List[AreaResponseDTO]]:
         """
         Obtiene todas las áreas
 
         Parameters:
         - include_inactive: Si incluir áreas inactivas (default: True)
+
+        Responde 304 sin consultar la BD si el ETag del cliente sigue vigente
         """
-        try:
-            areas = await area_service.get_all_areas(include_inactive=include_inactive)
-            return [AreaResponseDTO.model_validate(area) for area in areas]
-        except Exception as e:
-            raise HTTPException(
-                status_code=HTTP_400_BAD_REQUEST,
-                detail=f"Error al obtener áreas: {str(e)}"
-            )
+        async def build() -> bytes:
+            try:
+                areas = await area_service.get_all_areas(include_inactive=include_inactive)
+                return _AREA_LIST_ADAPTER.dump_json([AreaResponseDTO.model_validate(area) for area in areas])
+            except Exception as e:
+                raise HTTPException(
+                    status_code=HTTP_400_BAD_REQUEST,
+                    detail=f"Error al obtener áreas: {str(e)}"
+                )
+
+        key = "all" if include_inactive else "all-active"
+        return await area_listing_cache.respond(key, if_none_match, build)
 
 
     @get("/active")
-    async def get_active_areas(self, area_service: AreaService) -> List[AreaResponseDTO]:
+    async def get_active_areas(
+        self,
+        area_service: AreaService,
+        if_none_match: Optional[str] = Parameter(header="If-None-Match", default=None)
+    ) -> Response[List[AreaResponseDTO]]:
         """Obtiene solo las áreas activas (útil para derivaciones)"""
-        try:
-            areas = await area_service.get_areas_for_derivation()
-            return [AreaResponseDTO.model_validate(area) for area in areas]
-        except Exception as e:
-            raise HTTPException(
-                status_code=HTTP_400_BAD_REQUEST,
-                detail=f"Error al obtener áreas activas: {str(e)}"
-            )
+
+        async def build() -> bytes:
+            try:
+                areas = await area_service.get_areas_for_derivation()
+                return _AREA_LIST_ADAPTER.dump_json([AreaResponseDTO.model_validate(area) for area in areas])
+            except Exception as e:
+                raise HTTPException(
+                    status_code=HTTP_400_BAD_REQUEST,
+                    detail=f"Error al obtener áreas activas: {str(e)}"
+                )
+
+        return await area_listing_cache.respond("derivation", if_none_match, build)
 
 
     @get("/stats")
-    async def get_area_stats(self, area_service: AreaService) -> AreaStatsDTO:
+    async def get_area_stats(
+        self,
+        area_service: AreaService,
+        if_none_match: Optional[str] = Parameter(header="If-None-Match", default=None)
+    ) -> Response[AreaStatsDTO]:
         """Obtiene estadísticas de las áreas para el dashboard"""
-        try:
-            stats = await area_service.get_dashboard_stats()
-            return AreaStatsDTO(**stats)
-        except Exception as e:
-            raise HTTPException(
-                status_code=HTTP_400_BAD_REQUEST,
-                detail=f"Error al obtener estadísticas: {str(e)}"
-            )
+
+        async def build() -> bytes:
+            try:
+                stats = await area_service.get_dashboard_stats()
+                return AreaStatsDTO(**stats).model_dump_json().encode()
+            except Exception as e:
+                raise HTTPException(
+                    status_code=HTTP_400_BAD_REQUEST,
+                    detail=f"Error al obtener estadísticas: {str(e)}"
+                )
+
+        return await area_listing_cache.respond("stats", if_none_match, build)
 
 
     @get("/search")
@@ -1,5 +1,7 @@
+import asyncio
+import time
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Awaitable, Optional, TypeVar
 
 from litestar import Controller, WebSocket, websocket
 from litestar.exceptions import WebSocketException
@@ -11,13 +13,39 @@ from src.modules.client.dependencies import (
     provide_cliente_repository, provide_cliente_service,
     provide_area_repository
 )
-from src.modules.client.dependencies.ia_dependency import (
-    provide_configuracion_repository, provide_configuracion_service, provide_ai_service
-)
+from src.modules.client.dependencies.ia_dependency import provide_ai_service
 
 from src.modules.client.services import (
-    MensajeService, ConversacionService, ClienteService, ConfiguracionIAService, AIService
+    MensajeService, ConversacionService, ClienteService, AIService,
+    ai_task_registry, AITaskCancelledError, ai_response_cache, ai_single_flight,
+    ai_limiter, ai_circuit_breaker, ai_load_shedder, ai_model_pool, load_ai_config, load_derivation_areas,
+    RecentMessage, recent_messages, ai_call_telemetry, session_recorder
 )
+from src.modules.client.services.chat_metrics import chat_stage, ws_message_seconds, ws_messages_total
+from src.shared.utils.metrics import metrics_registry
+from src.shared.utils.tracing import tracer
+from src.infrastructure.database.query_monitor import query_monitor
+from src.modules.client.services.ai_load_shedder import SHED_TRANSFER_MESSAGE
+from src.infrastructure.database.models import ConfiguracionIA, Area, Mensaje
+
+
+T = TypeVar("T")
+
+
+
+async def _write_uninterrupted(coro: Awaitable[T]) -> T:
+    """
+    Escritura en la sesión compartida de la conexión que una cancelación no corta:
+    un CancelledError a mitad de un commit de asyncmy deja el protocolo desincronizado
+    """
+
+    write = asyncio.ensure_future(coro)
+    try:
+        return await asyncio.shield(write)
+    except asyncio.CancelledError:
+        # Terminar la escritura antes de propagar la cancelación (y del rollback de quien la maneje)
+        await asyncio.wait([write])
+        raise
 
 
 
@@ -30,6 +58,12 @@ class ChatWebSocketController(Controller):
     # Conexiones por conversación (para broadcast)
     conversation_connections: Dict[int, List[str]] = {}
 
+    # Tipos de mensaje que entiende el controlador (etiquetas de métricas)
+    MESSAGE_TYPES = (
+        "new_client_message", "admin_response", "transfer_conversation", "close_conversation",
+        "join_conversation", "get_conversation_history", "get_active_conversations"
+    )
+
     dependencies = {
         "mensaje_repository": Provide(provide_mensaje_repository),
         "mensaje_service": Provide(provide_mensaje_service),
@@ -38,8 +72,6 @@ class ChatWebSocketController(Controller):
         "cliente_repository": Provide(provide_cliente_repository),
         "cliente_service": Provide(provide_cliente_service),
         "area_repository": Provide(provide_area_repository),
-        "configuracion_repository": Provide(provide_configuracion_repository),
-        "configuracion_service": Provide(provide_configuracion_service),
         "ai_service": Provide(provide_ai_service)
     }
 
@@ -52,7 +84,6 @@ class ChatWebSocketController(Controller):
         mensaje_service: MensajeService,
         conversacion_service: ConversacionService,
         cliente_service: ClienteService,
-        configuracion_service: ConfiguracionIAService,
         ai_service: AIService
     ) -> None:
         """
@@ -62,6 +93,7 @@ class ChatWebSocketController(Controller):
 
         # Registrar conexión
         self.connections[connection_id] = socket
+        session_recorder.open(connection_id)
         print(f"✅ Conexión establecida: {connection_id}")
 
         # Enviar mensaje de bienvenida
@@ -75,6 +107,7 @@ class ChatWebSocketController(Controller):
         try:
             # Loop principal para recibir mensajes
             async for message in socket.iter_json():
+                session_recorder.record(connection_id, message)
                 await self._handle_message(
                     connection_id,
                     message,
@@ -82,7 +115,6 @@ class ChatWebSocketController(Controller):
                     mensaje_service,
                     conversacion_service,
                     cliente_service,
-                    configuracion_service,
                     ai_service
                 )
         except WebSocketException:
@@ -91,6 +123,7 @@ class ChatWebSocketController(Controller):
             print(f"❌ Error en WebSocket {connection_id}: {str(e)}")
         finally:
             # Limpiar conexión
+            session_recorder.close(connection_id)
             await self._cleanup_connection(connection_id)
 
 
@@ -102,7 +135,6 @@ class ChatWebSocketController(Controller):
         mensaje_service: MensajeService,
         conversacion_service: ConversacionService,
         cliente_service: ClienteService,
-        configuracion_service: ConfiguracionIAService,
         ai_service: AIService
     ) -> None:
         """Maneja diferentes tipos de mensajes"""
@@ -110,56 +142,83 @@ class ChatWebSocketController(Controller):
         message_type = message.get("type")
         print(f"📨 Mensaje recibido de {connection_id}: {message_type}")
 
-        try:
-            if message_type == "new_client_message":
-                await self._handle_new_client_message(
-                    message, mensaje_service, conversacion_service, cliente_service,
-                    configuracion_service, ai_service
-                )
+        # Tipos desconocidos van agrupados para no multiplicar series de métricas
+        metric_type = message_type if message_type in self.MESSAGE_TYPES else "unknown"
+        ws_messages_total.inc(type=metric_type)
+        started = time.perf_counter()
 
-            elif message_type == "admin_response":
-                await self._handle_admin_response(
-                    message, mensaje_service, conversacion_service
-                )
+        # Una traza por mensaje; el cliente puede mandar su propio trace_id para correlacionar
+        with tracer.start_trace(
+            f"ws.{metric_type}", trace_id=message.get("trace_id"), connection_id=connection_id
+        ), query_monitor.unit(f"ws.{metric_type}"):
+            try:
+                if message_type == "new_client_message":
+                    await self._handle_new_client_message(
+                        message, mensaje_service, conversacion_service, cliente_service, ai_service
+                    )
 
-            elif message_type == "join_conversation":
-                await self._handle_join_conversation(
-                    connection_id, message["conversation_id"]
-                )
+                elif message_type == "admin_response":
+                    await self._handle_admin_response(
+                        message, mensaje_service, conversacion_service
+                    )
 
-            elif message_type == "get_conversation_history":
-                await self._handle_get_history(
-                    socket, message, mensaje_service
-                )
+                elif message_type == "transfer_conversation":
+                    await self._handle_transfer_conversation(
+                        message, conversacion_service
+                    )
 
-            elif message_type == "get_active_conversations":
-                await self._handle_get_active_conversations(
-                    socket, conversacion_service, cliente_service
-                )
+                elif message_type == "close_conversation":
+                    await self._handle_close_conversation(
+                        message, conversacion_service
+                    )
 
-            else:
-                await self._send_error(socket, f"Tipo de mensaje desconocido: {message_type}")
+                elif message_type == "join_conversation":
+                    await self._handle_join_conversation(
+                        connection_id, message["conversation_id"]
+                    )
 
-        except Exception as e:
-            print(f"❌ Error procesando mensaje: {str(e)}")
-            await self._send_error(socket, f"Error procesando mensaje: {str(e)}")
+                elif message_type == "get_conversation_history":
+                    await self._handle_get_history(
+                        socket, message, mensaje_service
+                    )
+
+                elif message_type == "get_active_conversations":
+                    await self._handle_get_active_conversations(
+                        socket, conversacion_service, cliente_service
+                    )
+
+                else:
+                    await self._send_error(socket, f"Tipo de mensaje desconocido: {message_type}")
 
+            except Exception as e:
+                print(f"❌ Error procesando mensaje: {str(e)}")
+                await self._send_error(socket, f"Error procesando mensaje: {str(e)}")
 
+            finally:
+                ws_message_seconds.observe(time.perf_counter() - started, type=metric_type)
+
+
+    @tracer.traced()
     async def _handle_new_client_message(
         self,
         message: Dict[str, Any],
         mensaje_service: MensajeService,
         conversacion_service: ConversacionService,
         cliente_service: ClienteService,
-        configuracion_service: ConfiguracionIAService,
         ai_service: AIService
     ) -> None:
-        """Maneja mensajes nuevos de clientes con respuesta de IA"""
+        """
+        Maneja mensajes nuevos de clientes con respuesta de IA.
+        Pipeline por etapas: las lecturas independientes corren en paralelo y
+        el guardado/broadcast del mensaje del cliente se solapa con la generación
+        """
 
         client_id = int(message.get("client_id"))
         client_name = message.get("client_name", f"Cliente {client_id}")
         message_text = message.get("message")
         timestamp = datetime.utcnow()
+        # Se devuelve en la respuesta (también sin tracing) para que el cliente la correlacione
+        trace_id = tracer.current_trace_id() or (str(message["trace_id"])[:64] if message.get("trace_id") else None)
 
         if not all([client_id, message_text]):
             print("❌ Datos incompletos en mensaje de cliente")
@@ -167,24 +226,36 @@ class ChatWebSocketController(Controller):
 
         print(f"💬 Nuevo mensaje de {client_name} (ID: {client_id}): {message_text}")
 
-        try:
-            # Crear o obtener cliente
-            cliente = await cliente_service.get_or_create_client(client_id, client_name)
+        conversation_id = None
+        config_task = None
+        areas_task = None
+        persist_task = None
+        broadcast_task = None
 
-            # Crear o obtener conversación activa
-            conversacion, conversation_id = await conversacion_service.get_or_create_active_conversation(client_id)
-
-            # Guardar mensaje del cliente
-            mensaje_cliente = await mensaje_service.create_message({
+        try:
+            # Etapa 1: lecturas independientes en paralelo. Configuración y áreas
+            # usan sesiones propias del pool; cliente y conversación la de la conexión
+            config_task = asyncio.create_task(load_ai_config())
+            areas_task = asyncio.create_task(load_derivation_areas())
+
+            with chat_stage("client_lookup"):
+                cliente = await cliente_service.get_or_create_client(client_id, client_name)
+                conversacion, conversation_id = await conversacion_service.get_or_create_active_conversation(client_id)
+            tracer.annotate(conversation_id=conversation_id, client_id=client_id)
+
+            # Etapa 2: historial previo (desde memoria), leído antes de insertar el mensaje actual
+            with chat_stage("history"):
+                history_context = await mensaje_service.get_recent_context(conversation_id)
+
+            # Etapa 3: guardar y difundir el mensaje del cliente mientras la IA genera
+            persist_task = asyncio.create_task(mensaje_service.create_message({
                 "id_conversacion": conversation_id,
                 "contenido": message_text,
                 "tipo": "cliente",
                 "remitente": client_name,
                 "es_derivacion": False
-            })
-
-            # Broadcast del mensaje del cliente
-            await self._broadcast_message({
+            }))
+            broadcast_task = asyncio.create_task(self._broadcast_message({
                 "type": "new_message",
                 "conversation_id": conversation_id,
                 "client_id": client_id,
@@ -196,80 +267,64 @@ class ChatWebSocketController(Controller):
                     "timestamp": timestamp.isoformat(),
                     "message_type": "cliente"
                 }
-            })
-
-            print(f"💾 Mensaje del cliente guardado exitosamente")
-
-            # Obtener historial para contexto de la IA
-            historial = await mensaje_service.get_conversation_messages(conversation_id, limit=10)
-            history_context = []
-            for msg in historial:
-                history_context.append({
-                    "content": msg.contenido,
-                    "message_type": msg.tipo.value,
-                    "sender": msg.remitente
-                })
+            }))
 
-            # Obtener configuración de la IA usando el método especial
-            config = await configuracion_service.get_config_for_ai()
+            config, areas = await asyncio.gather(config_task, areas_task)
 
-            # Procesar mensaje con IA
-            print("🤖 Procesando mensaje con IA...")
-            ai_response = await ai_service.process_client_message(
-                message_text,
-                client_name,
-                history_context,
-                config
-            )
-
-            print(f"🤖 Respuesta de IA: {ai_response}")
+            # Control de admisión: si la cola de IA está saturada, responder de inmediato
+            shed_decision = ai_load_shedder.decide()
+            if shed_decision:
+                print(f"🚦 IA saturada ({shed_decision['reason']}), política: {shed_decision['policy']}")
 
-            if ai_response["should_respond"]:
-                # Guardar respuesta de la IA
-                ai_timestamp = datetime.utcnow()
-                
-                mensaje_ia = await mensaje_service.create_message({
-                    "id_conversacion": conversation_id,
-                    "contenido": ai_response["response"],
-                    "tipo": "ia",
-                    "remitente": "Prism IA",
-                    "es_derivacion": False
-                })
+                if shed_decision["policy"] == "transfer":
+                    await self._shed_to_human(
+                        message_text, client_id, client_name, conversation_id, areas,
+                        persist_task, broadcast_task, trace_id, mensaje_service, conversacion_service
+                    )
+                    await broadcast_task
+                    return
 
-                # Broadcast de la respuesta de la IA
-                await self._broadcast_message({
-                    "type": "ai_response",
-                    "conversation_id": conversation_id,
-                    "client_id": client_id,
-                    "client_name": client_name,
-                    "message": {
-                        "id": f"temp_{ai_timestamp.timestamp()}",
-                        "content": ai_response["response"],
-                        "sender": "Prism IA",
-                        "timestamp": ai_timestamp.isoformat(),
-                        "message_type": "ia"
-                    }
-                })
+                await self._broadcast_queue_notice(conversation_id, client_id, client_name, shed_decision)
 
-                print(f"🤖 Respuesta de IA enviada")
-
-                # Verificar si se debe derivar
-                if ai_response["should_transfer"] and ai_response["transfer_area"]:
-                    await self._handle_ai_transfer(
-                        conversation_id,
-                        conversacion_service,
-                        mensaje_service,
-                        ai_response["transfer_area"],
-                        client_id,
-                        client_name
+            # Procesar mensaje con IA como tarea cancelable de la conversación
+            try:
+                await ai_task_registry.run(
+                    conversation_id,
+                    lambda: self._generate_ai_reply(
+                        message_text, client_id, client_name, conversation_id,
+                        history_context, config, areas, persist_task, broadcast_task, trace_id,
+                        mensaje_service, conversacion_service, ai_service
                     )
+                )
+            except AITaskCancelledError as e:
+                print(f"🛑 Respuesta de IA descartada para conversación {conversation_id}: {e.reason}")
+                await persist_task
+                await mensaje_service.mensaje_repository.rollback()
+
+            await broadcast_task
 
         except Exception as e:
             print(f"❌ Error manejando mensaje de cliente: {str(e)}")
-            
+
+            # No dejar lecturas del pipeline colgando; el broadcast del mensaje del
+            # cliente se deja terminar para que llegue antes que la respuesta de error
+            for task in (config_task, areas_task):
+                if task and not task.done():
+                    task.cancel()
+            pending = [task for task in (config_task, areas_task, broadcast_task) if task]
+            if pending:
+                # return_exceptions: recoge los errores para que no queden sin recuperar
+                await asyncio.gather(*pending, return_exceptions=True)
+
+            if conversation_id is None:
+                raise
+
             # Enviar respuesta de error al cliente
             error_timestamp = datetime.utcnow()
             try:
+                if persist_task:
+                    await asyncio.wait([persist_task])
+
                 await mensaje_service.create_message({
                     "id_conversacion": conversation_id,
                     "contenido": "Disculpa, estoy experimentando dificultades técnicas. Un especialista te atenderá pronto.",
@@ -297,6 +352,175 @@ class ChatWebSocketController(Controller):
             raise
 
 
+    @tracer.traced()
+    async def _generate_ai_reply(
+        self,
+        message_text: str,
+        client_id: int,
+        client_name: str,
+        conversation_id: int,
+        history_context: List[RecentMessage],
+        config: ConfiguracionIA,
+        areas: List[Area],
+        persist_task: asyncio.Task,
+        broadcast_task: asyncio.Task,
+        trace_id: Optional[str],
+        mensaje_service: MensajeService,
+        conversacion_service: ConversacionService,
+        ai_service: AIService
+    ) -> None:
+        """Genera, guarda y difunde la respuesta de la IA (se ejecuta como tarea cancelable)"""
+
+        print("🤖 Procesando mensaje con IA...")
+        ai_response = await ai_service.process_client_message(
+            message_text,
+            client_name,
+            history_context,
+            config,
+            areas,
+            conversation_id
+        )
+
+        print(f"🤖 Respuesta de IA: {ai_response}")
+
+        # El mensaje del cliente debe quedar guardado antes que la respuesta.
+        # shield: cancelar la generación no debe cancelar ese guardado
+        await asyncio.shield(persist_task)
+        print(f"💾 Mensaje del cliente guardado exitosamente")
+
+        if ai_response["should_respond"]:
+            # Desde aquí solo se escribe: si ya se pidió cancelar no se guarda nada,
+            # y si no, la cancelación del registro ya no corta el commit
+            if not ai_task_registry.begin_write():
+                raise asyncio.CancelledError()
+
+            # Guardar respuesta de la IA
+            ai_timestamp = datetime.utcnow()
+
+            mensaje_ia = await _write_uninterrupted(mensaje_service.create_message({
+                "id_conversacion": conversation_id,
+                "contenido": ai_response["response"],
+                "tipo": "ia",
+                "remitente": "Prism IA",
+                "es_derivacion": False
+            }))
+
+            # Los admins deben ver el mensaje del cliente antes que la respuesta.
+            # wait y no await: no propaga la cancelación al broadcast ni su error (lo maneja quien lo creó)
+            await asyncio.wait([broadcast_task])
+
+            # Broadcast de la respuesta de la IA
+            await self._broadcast_message({
+                "type": "ai_response",
+                "conversation_id": conversation_id,
+                "client_id": client_id,
+                "client_name": client_name,
+                "message": {
+                    "id": f"temp_{ai_timestamp.timestamp()}",
+                    "content": ai_response["response"],
+                    "sender": "Prism IA",
+                    "timestamp": ai_timestamp.isoformat(),
+                    "message_type": "ia"
+                },
+                # El del cliente o el de la traza: permite abrir la cascada en /api/admin/traces/{trace_id}
+                "trace_id": trace_id
+            })
+
+            print(f"🤖 Respuesta de IA enviada")
+
+            # Verificar si se debe derivar
+            if ai_response["should_transfer"] and ai_response["transfer_area"]:
+                await self._handle_ai_transfer(
+                    conversation_id,
+                    conversacion_service,
+                    mensaje_service,
+                    ai_response["transfer_area"],
+                    client_id,
+                    client_name
+                )
+
+
+    @tracer.traced()
+    async def _shed_to_human(
+        self,
+        message_text: str,
+        client_id: int,
+        client_name: str,
+        conversation_id: int,
+        areas: List[Area],
+        persist_task: asyncio.Task,
+        broadcast_task: asyncio.Task,
+        trace_id: Optional[str],
+        mensaje_service: MensajeService,
+        conversacion_service: ConversacionService
+    ) -> None:
+        """Respuesta inmediata sin IA y derivación al área más afín según el matcher local"""
+
+        await persist_task
+        # La respuesta no debe adelantarse al broadcast del mensaje del cliente
+        await asyncio.wait([broadcast_task])
+
+        shed_timestamp = datetime.utcnow()
+        await mensaje_service.create_message({
+            "id_conversacion": conversation_id,
+            "contenido": SHED_TRANSFER_MESSAGE,
+            "tipo": "ia",
+            "remitente": "Prism IA",
+            "es_derivacion": False
+        })
+
+        await self._broadcast_message({
+            "type": "ai_response",
+            "conversation_id": conversation_id,
+            "client_id": client_id,
+            "client_name": client_name,
+            "message": {
+                "id": f"temp_{shed_timestamp.timestamp()}",
+                "content": SHED_TRANSFER_MESSAGE,
+                "sender": "Prism IA",
+                "timestamp": shed_timestamp.isoformat(),
+                "message_type": "ia"
+            },
+            "trace_id": trace_id
+        })
+
+        area = ai_load_shedder.pick_area(message_text, areas)
+        if area:
+            await self._handle_ai_transfer(
+                conversation_id, conversacion_service, mensaje_service, area, client_id, client_name
+            )
+        else:
+            await conversacion_service.transfer_to_human(conversation_id)
+
+
+    async def _broadcast_queue_notice(
+        self,
+        conversation_id: int,
+        client_id: int,
+        client_name: str,
+        shed_decision: Dict[str, Any]
+    ) -> None:
+        """Avisa al cliente que la IA está ocupada y su posición en la cola (no se guarda)"""
+
+        notice_timestamp = datetime.utcnow()
+        await self._broadcast_message({
+            "type": "ai_response",
+            "conversation_id": conversation_id,
+            "client_id": client_id,
+            "client_name": client_name,
+            "queue_position": shed_decision["queue_position"],
+            "expected_wait": shed_decision["expected_wait"],
+            "message": {
+                "id": f"temp_{notice_timestamp.timestamp()}",
+                "content": ai_load_shedder.busy_message(shed_decision),
+                "sender": "Sistema Prism",
+                "timestamp": notice_timestamp.isoformat(),
+                "message_type": "sistema"
+            }
+        })
+
+
+    @tracer.traced()
     async def _handle_ai_transfer(
         self,
         conversation_id: int,
@@ -358,6 +582,7 @@ class ChatWebSocketController(Controller):
             print(f"❌ Error en derivación automática: {str(e)}")
 
 
+    @tracer.traced()
     async def _handle_admin_response(
         self,
         message: Dict[str, Any],
@@ -378,6 +603,9 @@ class ChatWebSocketController(Controller):
         print(f"👨‍💼 Respuesta de admin para conversación {conversation_id}: {response_text}")
 
         try:
+            # El humano toma el control: descartar cualquier respuesta de IA en curso
+            ai_task_registry.cancel(conversation_id, "admin_takeover")
+
             # Cambiar estado de conversación a humano respondiendo
             await conversacion_service.transfer_to_human(conversation_id)
             
@@ -410,6 +638,64 @@ class ChatWebSocketController(Controller):
             raise
 
 
+    @tracer.traced()
+    async def _handle_transfer_conversation(
+        self,
+        message: Dict[str, Any],
+        conversacion_service: ConversacionService
+    ) -> None:
+        """Transfiere manualmente una conversación a un humano"""
+
+        conversation_id = int(message.get("conversation_id"))
+        area_id = message.get("area_id")
+
+        if not conversation_id:
+            print("❌ Datos incompletos en transferencia manual")
+            return
+
+        print(f"🔄 Transferencia manual de conversación {conversation_id}")
+
+        ai_task_registry.cancel(conversation_id, "manual_transfer")
+        await conversacion_service.transfer_to_human(conversation_id, int(area_id) if area_id else None)
+
+        await self._broadcast_message({
+            "type": "conversation_status",
+            "conversation_id": conversation_id,
+            "status": "esperando_humano",
+            "area_id": area_id,
+            "timestamp": datetime.utcnow().isoformat()
+        })
+
+
+    @tracer.traced()
+    async def _handle_close_conversation(
+        self,
+        message: Dict[str, Any],
+        conversacion_service: ConversacionService
+    ) -> None:
+        """Finaliza una conversación"""
+
+        conversation_id = int(message.get("conversation_id"))
+
+        if not conversation_id:
+            print("❌ Datos incompletos en cierre de conversación")
+            return
+
+        print(f"🏁 Cerrando conversación {conversation_id}")
+
+        ai_task_registry.cancel(conversation_id, "conversation_closed")
+        await conversacion_service.close_conversation(conversation_id)
+        recent_messages.discard(conversation_id)
+
+        await self._broadcast_message({
+            "type": "conversation_status",
+            "conversation_id": conversation_id,
+            "status": "finalizada",
+            "timestamp": datetime.utcnow().isoformat()
+        })
+
+
+    @tracer.traced()
     async def _handle_join_conversation(
         self,
         connection_id: str,
@@ -425,6 +711,7 @@ class ChatWebSocketController(Controller):
             print(f"🔗 {connection_id} se unió a conversación {conversation_id}")
 
 
+    @tracer.traced()
     async def _handle_get_history(
         self,
         socket: WebSocket,
@@ -447,22 +734,10 @@ class ChatWebSocketController(Controller):
                 conversation_id, limit=limit
             )
 
-            # Formatear mensajes
-            formatted_messages = []
-            for msg in mensajes:
-                formatted_messages.append({
-                    "id": getattr(msg, 'id', f"msg_{msg.timestamp.timestamp()}" if msg.timestamp else "msg_unknown"),
-                    "content": msg.contenido,
-                    "sender": msg.remitente,
-                    "timestamp": msg.timestamp.isoformat() if msg.timestamp else datetime.utcnow().isoformat(),
-                    "message_type": msg.tipo.value,
-                    "is_derivation": msg.es_derivacion
-                })
-
             await self._send_message(socket, {
                 "type": "conversation_history",
                 "conversation_id": conversation_id,
-                "messages": formatted_messages
+                "messages": self._format_history(mensajes)
             })
 
         except Exception as e:
@@ -470,6 +745,24 @@ class ChatWebSocketController(Controller):
             raise
 
 
+    @staticmethod
+    def _format_history(mensajes: List[Mensaje]) -> List[Dict[str, Any]]:
+        """Formatea los mensajes del historial para el cliente"""
+
+        formatted_messages = []
+        for msg in mensajes:
+            formatted_messages.append({
+                "id": getattr(msg, 'id', f"msg_{msg.timestamp.timestamp()}" if msg.timestamp else "msg_unknown"),
+                "content": msg.contenido,
+                "sender": msg.remitente,
+                "timestamp": msg.timestamp.isoformat() if msg.timestamp else datetime.utcnow().isoformat(),
+                "message_type": msg.tipo.value,
+                "is_derivation": msg.es_derivacion
+            })
+        return formatted_messages
+
+
+    @tracer.traced()
     async def _handle_get_active_conversations(
         self,
         socket: WebSocket,
@@ -517,18 +810,20 @@ class ChatWebSocketController(Controller):
             await self._send_error(socket, f"Error obteniendo conversaciones: {str(e)}")
 
 
+    @tracer.traced()
     async def _broadcast_message(self, message: Dict[str, Any]) -> None:
         """Envía un mensaje a todas las conexiones activas"""
 
         disconnected = []
         sent_count = 0
 
-        for connection_id, socket in self.connections.items():
-            try:
-                await self._send_message(socket, message)
-                sent_count += 1
-            except:
-                disconnected.append(connection_id)
+        with chat_stage("broadcast"):
+            for connection_id, socket in self.connections.items():
+                try:
+                    await self._send_message(socket, message)
+                    sent_count += 1
+                except:
+                    disconnected.append(connection_id)
 
         print(f"📡 Mensaje enviado a {sent_count} conexiones")
 
@@ -583,5 +878,29 @@ class ChatWebSocketController(Controller):
             "conversations": {
                 conv_id: len(connections)
                 for conv_id, connections in self.conversation_connections.items()
-            }
-        }
\ No newline at end of file
+            },
+            "ai_tasks": ai_task_registry.get_stats(),
+            "ai_response_cache": ai_response_cache.get_stats(),
+            "ai_single_flight": ai_single_flight.get_stats(),
+            "ai_limiter": ai_limiter.get_stats(),
+            "ai_circuit_breaker": ai_circuit_breaker.get_stats(),
+            "ai_load_shedder": ai_load_shedder.get_stats(),
+            "ai_models": ai_model_pool.get_stats(),
+            "ai_recent_messages": recent_messages.get_stats(),
+            "ai_telemetry": ai_call_telemetry.get_stats(),
+            "tracing": tracer.get_stats(),
+            "db_queries": query_monitor.get_stats(),
+            "ws_recording": session_recorder.get_stats()
+        }
+
+
+
+# Conexiones abiertas, leídas al exportar métricas
+metrics_registry.callback(
+    "prism_ws_connections", "Conexiones WebSocket abiertas",
+    lambda: len(ChatWebSocketController.connections)
+)
+metrics_registry.callback(
+    "prism_ws_joined_conversations", "Conversaciones con al menos una conexión suscrita",
+    lambda: len(ChatWebSocketController.conversation_connections)
+)
@@ -8,7 +8,7 @@ from litestar.status_codes import HTTP_200_OK, HTTP_400_BAD_REQUEST
 from src.modules.client.dependencies.ia_dependency import (
     provide_configuracion_repository, provide_configuracion_service
 )
-from src.modules.client.services import ConfiguracionIAService
+from src.modules.client.services import ConfiguracionIAService, ai_model_pool
 from pydantic import BaseModel, Field
 
 from src.shared.settings.base import settings
@@ -94,8 +94,11 @@ class ConfiguracionIAController(Controller):
 
 
     @get("/test")
-    async def test_ai_connection(self) -> Dict[str, Any]:
-        """Prueba la conexión con la IA"""
+    async def test_ai_connection(
+        self,
+        configuracion_service: ConfiguracionIAService
+    ) -> Dict[str, Any]:
+        """Prueba la conexión con la IA usando el modelo configurado"""
         try:
             api_key = settings.gemini_api_key
 
@@ -116,14 +119,17 @@ class ConfiguracionIAController(Controller):
             import google.generativeai as genai
             genai.configure(api_key=api_key)
 
-            # Hacer una prueba simple
-            model = genai.GenerativeModel('gemini-pro')
-            response = model.generate_content("Di 'Hola' en español")
+            # Hacer una prueba simple con el modelo de la configuración
+            config = await configuracion_service.get_current_config()
+            model_name = ai_model_pool.resolve(config.get("model"))
+            model = ai_model_pool.get(model_name)
+            response = await model.generate_content_async("Di 'Hola' en español")
 
             if response.text:
                 return {
                     "status": "success",
                     "message": "Conexión con Gemini exitosa",
+                    "model": model_name,
                     "test_response": response.text.strip()
                 }
             else:
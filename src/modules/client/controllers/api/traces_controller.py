@@ -0,0 +1,37 @@
+from typing import Any, Dict
+
+from litestar import Controller, get
+from litestar.exceptions import HTTPException
+from litestar.status_codes import HTTP_404_NOT_FOUND
+
+from src.shared.utils.tracing import tracer
+
+
+
+class TracesController(Controller):
+    path = "/admin/traces"
+    tags = ["Observabilidad"]
+
+
+    @get("/")
+    async def list_traces(self) -> Dict[str, Any]:
+        """Resumen de las trazas recientes y de las más lentas"""
+        return {
+            "stats": tracer.get_stats(),
+            "recent": [trace.summary() for trace in tracer.recent()],
+            "slowest": [trace.summary() for trace in tracer.slowest()]
+        }
+
+
+    @get("/{trace_id:str}")
+    async def get_trace(self, trace_id: str) -> Dict[str, Any]:
+        """Cascada de spans de una traza (inicio y duración de cada etapa en ms)"""
+
+        trace = tracer.get(trace_id)
+        if trace is None:
+            raise HTTPException(
+                status_code=HTTP_404_NOT_FOUND,
+                detail=f"Traza {trace_id} no encontrada (puede haber salido del buffer)"
+            )
+
+        return trace.waterfall()
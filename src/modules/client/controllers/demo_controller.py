@@ -0,0 +1,88 @@
+from typing import Any, Dict, Optional
+
+from litestar import Controller, get, post
+from litestar.exceptions import HTTPException
+from litestar.status_codes import HTTP_200_OK, HTTP_400_BAD_REQUEST, HTTP_409_CONFLICT
+
+from src.modules.client.repositories import memory_store, uses_memory_backend
+from src.modules.client.services import area_listing_cache
+from src.shared.settings.base import settings
+from src.tools.seed_dataset import DatasetGenerator, parse_args as parse_seed_args
+
+
+
+class DemoController(Controller):
+    """Carga y limpieza de datos de demo en el backend de repositorios en memoria"""
+
+    path = "/api/demo"
+    tags = ["Demo"]
+
+
+    @get("/")
+    async def get_demo_status(self) -> Dict[str, Any]:
+        """Backend de repositorios activo y filas por tabla en memoria"""
+        return {
+            "backend": settings.repository_backend,
+            "tables": memory_store.get_stats() if uses_memory_backend() else None
+        }
+
+
+    @post("/seed", status_code=HTTP_200_OK)
+    async def seed_demo_data(
+        self,
+        areas: int = 8,
+        clientes: int = 200,
+        conversaciones: int = 500,
+        mensajes: int = 5000,
+        seed: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Genera datos sintéticos (mismas distribuciones que src.tools.seed_dataset)
+        y los agrega al backend en memoria
+        """
+        self._require_memory_backend()
+
+        argv = [
+            "--areas", str(areas), "--clientes", str(clientes),
+            "--conversaciones", str(conversaciones), "--mensajes", str(mensajes),
+            "--text-pool", "500"
+        ]
+        if seed is not None:
+            argv += ["--seed", str(seed)]
+        try:
+            args = parse_seed_args(argv)
+        except SystemExit:
+            raise HTTPException(
+                status_code=HTTP_400_BAD_REQUEST,
+                detail="Parámetros inválidos: se necesita al menos un cliente y un mensaje por conversación"
+            )
+
+        existing_names = {area.nombre for area in memory_store.all("areas")}
+        generator = DatasetGenerator(args, memory_store.next_ids(), existing_names)
+
+        loaded = {"areas": memory_store.load("areas", generator.areas())}
+        loaded["clientes"] = sum(memory_store.load("clientes", batch) for batch in generator.clientes())
+        for table, rows in generator.conversaciones_y_mensajes():
+            loaded[table.name] = loaded.get(table.name, 0) + memory_store.load(table.name, rows)
+        area_listing_cache.bump()
+
+        print(f"🧪 Datos de demo cargados en memoria: {loaded}")
+        return {"loaded": loaded, "tables": memory_store.get_stats()}
+
+
+    @post("/reset", status_code=HTTP_200_OK)
+    async def reset_demo_data(self) -> Dict[str, Any]:
+        """Vacía todas las tablas del backend en memoria"""
+        self._require_memory_backend()
+        memory_store.reset()
+        area_listing_cache.bump()
+        return {"tables": memory_store.get_stats()}
+
+
+    @staticmethod
+    def _require_memory_backend() -> None:
+        if not uses_memory_backend():
+            raise HTTPException(
+                status_code=HTTP_409_CONFLICT,
+                detail="Los datos de demo solo se cargan con REPOSITORY_BACKEND=memory"
+            )
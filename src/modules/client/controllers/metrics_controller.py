@@ -0,0 +1,17 @@
+from litestar import Controller, get
+from litestar.response import Response
+
+from src.shared.utils.metrics import metrics_registry
+
+
+
+class MetricsController(Controller):
+    path = "/metrics"
+
+    @get("/", include_in_schema=False)
+    async def metrics(self) -> Response:
+        """Métricas del proceso en formato de texto de Prometheus"""
+        return Response(
+            content=metrics_registry.render(),
+            media_type="text/plain; version=0.0.4"
+        )
@@ -1,5 +1,30 @@
+from typing import Any, Dict, Optional
+
 from litestar import Controller, get
-from litestar.response import Template
+from litestar.params import Parameter
+from litestar.response import Response, Template
+
+from src.shared.settings.templates import template_environment
+from src.shared.utils.http_cache import VersionedBodyCache
+
+
+# Las páginas de administración no dependen de datos: solo cambian con las
+# plantillas o los estáticos, que se cargan al arrancar el proceso
+admin_page_cache = VersionedBodyCache("admin_pages")
+
+
+
+async def _render_page(template_name: str, context: Dict[str, Any], if_none_match: Optional[str]) -> Response:
+    # Con auto_reload (desarrollo) la plantilla puede cambiar en caliente: sin caché
+    if template_environment.auto_reload:
+        return Template(template_name, context=context)
+
+    async def build() -> bytes:
+        return template_environment.get_template(template_name).render(context).encode()
+
+    return await admin_page_cache.respond(
+        template_name, if_none_match, build, media_type="text/html"
+    )
 
 
 
@@ -7,18 +32,23 @@ class AdminController(Controller):
     path = "/admin"
 
     @get("/areas")
-    async def areas_admin(self) -> Template:
+    async def areas_admin(
+        self,
+        if_none_match: Optional[str] = Parameter(header="If-None-Match", default=None)
+    ) -> Response:
         """Página de administración de áreas"""
-        return Template("admin/areas.html", context={
+        return await _render_page("admin/areas.html", {
             "title": "Administración de Áreas - Prism",
             "page": "areas"
-        })
+        }, if_none_match)
 
     @get("/iaconfig")
-    async def iaconfig(self) -> Template:
+    async def iaconfig(
+        self,
+        if_none_match: Optional[str] = Parameter(header="If-None-Match", default=None)
+    ) -> Response:
         """Página de administración de áreas"""
-        return Template("admin/ia_config.html", context={
+        return await _render_page("admin/ia_config.html", {
             "title": "Administración de IA - Prism",
             "page": "iaconfig"
-        })
-
+        }, if_none_match)
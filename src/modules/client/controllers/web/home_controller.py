@@ -1,6 +1,13 @@
 from litestar import Controller, get
+from litestar.di import Provide
 from litestar.response import Template
 
+from src.modules.client.dependencies import (
+    provide_cliente_repository, provide_conversacion_repository, provide_conversacion_service
+)
+from src.modules.client.services import ConversacionService
+from src.modules.client.services.chat_metrics import ws_message_seconds
+
 
 
 class HomeController(Controller):
@@ -20,16 +27,26 @@ class HomeController(Controller):
             }
         })
 
-    @get("/dashboard")
-    async def dashboard(self) -> Template:
+    @get(
+        "/dashboard",
+        dependencies={
+            "conversacion_repository": Provide(provide_conversacion_repository),
+            "cliente_repository": Provide(provide_cliente_repository),
+            "conversacion_service": Provide(provide_conversacion_service)
+        }
+    )
+    async def dashboard(self, conversacion_service: ConversacionService) -> Template:
         """Dashboard con métricas del sistema"""
+
+        # Tiempo promedio real de respuesta a un mensaje de cliente en este proceso (segundos),
+        # de punta a punta: búsquedas, IA, guardado y broadcast
+        response_mean = ws_message_seconds.mean(type="new_client_message")
+
         return Template("dashboard.html", context={
             "title": "Dashboard - Prism",
             "page": "dashboard",
             "metrics": {
-                "conversations_today": 23,
-                "response_time_avg": 2.3,
-                "satisfaction_rate": 94.5,
-                "ai_accuracy": 89.2
+                "conversations_today": await conversacion_service.count_created_today(),
+                "response_time_avg": round(response_mean, 2) if response_mean is not None else 0.0
             }
         })
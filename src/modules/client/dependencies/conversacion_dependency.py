@@ -1,12 +1,12 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.modules.client.repositories import ConversacionRepository, ClienteRepository
+from src.modules.client.repositories import ConversacionRepository, ClienteRepository, build_repository
 from src.modules.client.services import ConversacionService
 
 
 
 async def provide_conversacion_repository(db: AsyncSession) -> ConversacionRepository:
-    return ConversacionRepository(db)
+    return build_repository(ConversacionRepository, db)
 
 
 async def provide_conversacion_service(
@@ -1,13 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.modules.client.repositories import ConfiguracionIARepository
+from src.modules.client.repositories import ConfiguracionIARepository, build_repository
 from src.modules.client.services import ConfiguracionIAService, AIService
 from src.modules.client.repositories import AreaRepository
 
 
 
 async def provide_configuracion_repository(db: AsyncSession) -> ConfiguracionIARepository:
-    return ConfiguracionIARepository(db)
+    return build_repository(ConfiguracionIARepository, db)
 
 
 async def provide_configuracion_service(
@@ -1,12 +1,12 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.modules.client.repositories import MensajeRepository
+from src.modules.client.repositories import MensajeRepository, build_repository
 from src.modules.client.services import MensajeService
 
 
 
 async def provide_mensaje_repository(db: AsyncSession) -> MensajeRepository:
-    return MensajeRepository(db)
+    return build_repository(MensajeRepository, db)
 
 
 async def provide_mensaje_service(mensaje_repository: MensajeRepository) -> MensajeService:
@@ -3,6 +3,12 @@ from .cliente_repository import ClienteRepository
 from .mensaje_repository import MensajeRepository
 from .conversacion_repository import ConversacionRepository
 from .configuracion_ia_repository import ConfiguracionIARepository
+from .memory_repository import (
+    MemoryStore, memory_store,
+    InMemoryAreaRepository, InMemoryClienteRepository, InMemoryMensajeRepository,
+    InMemoryConversacionRepository, InMemoryConfiguracionIARepository
+)
+from .factory import build_repository, uses_memory_backend
 
 
 
@@ -11,5 +17,14 @@ __all__ = [
     "ClienteRepository",
     "MensajeRepository",
     "ConversacionRepository",
-    "ConfiguracionIARepository"
+    "ConfiguracionIARepository",
+    "MemoryStore",
+    "memory_store",
+    "InMemoryAreaRepository",
+    "InMemoryClienteRepository",
+    "InMemoryMensajeRepository",
+    "InMemoryConversacionRepository",
+    "InMemoryConfiguracionIARepository",
+    "build_repository",
+    "uses_memory_backend"
 ]
\ No newline at end of file
@@ -5,9 +5,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from src.infrastructure.database.models import Area, EstadoEnum
+from src.shared.utils.tracing import tracer
 
 
 
+@tracer.traced_class
 class AreaRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -156,6 +158,10 @@ class AreaRepository:
         result = await self.db.execute(query)
         return result.scalars().all()
 
+    async def refresh(self, area: Area) -> None:
+        """Recarga un área desde la base (p.ej. después de un commit)"""
+        await self.db.refresh(area)
+
     async def commit(self):
         """Confirma los cambios en la base de datos"""
         await self.db.commit()
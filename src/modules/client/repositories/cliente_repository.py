@@ -3,9 +3,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from src.infrastructure.database.models import Cliente
+from src.shared.utils.tracing import tracer
 
 
 
+@tracer.traced_class
 class ClienteRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -5,9 +5,11 @@ from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.infrastructure.database.models import ConfiguracionIA
+from src.shared.utils.tracing import tracer
 
 
 
+@tracer.traced_class
 class ConfiguracionIARepository:
     def __init__(self, db: AsyncSession):
         self.db = db
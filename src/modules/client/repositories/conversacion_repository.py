@@ -1,11 +1,15 @@
-from sqlalchemy import select, text
+from datetime import datetime
+
+from sqlalchemy import func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Tuple
 
 from src.infrastructure.database.models import Conversacion, EstadoConversacionEnum
+from src.shared.utils.tracing import tracer
 
 
 
+@tracer.traced_class
 class ConversacionRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -67,6 +71,14 @@ class ConversacionRepository:
         return list(result.scalars().all())
 
 
+    async def count_created_since(self, since: datetime) -> int:
+        """Cuenta las conversaciones creadas desde una fecha (UTC sin zona horaria)"""
+
+        query = select(func.count(Conversacion.id)).where(Conversacion.created_at >= since)
+        result = await self.db.execute(query)
+        return result.scalar() or 0
+
+
     async def update(self, conversation_id: int, update_data: dict) -> Optional[Conversacion]:
         """Actualiza una conversación"""
 
@@ -0,0 +1,38 @@
+from typing import Type, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.shared.settings.base import settings
+from .area_repository import AreaRepository
+from .cliente_repository import ClienteRepository
+from .configuracion_ia_repository import ConfiguracionIARepository
+from .conversacion_repository import ConversacionRepository
+from .mensaje_repository import MensajeRepository
+from .memory_repository import (
+    InMemoryAreaRepository, InMemoryClienteRepository, InMemoryConfiguracionIARepository,
+    InMemoryConversacionRepository, InMemoryMensajeRepository, memory_store
+)
+
+
+RepositoryT = TypeVar("RepositoryT")
+
+_IN_MEMORY = {
+    AreaRepository: InMemoryAreaRepository,
+    ClienteRepository: InMemoryClienteRepository,
+    ConfiguracionIARepository: InMemoryConfiguracionIARepository,
+    ConversacionRepository: InMemoryConversacionRepository,
+    MensajeRepository: InMemoryMensajeRepository
+}
+
+
+
+def uses_memory_backend() -> bool:
+    return settings.repository_backend == "memory"
+
+
+def build_repository(repository_class: Type[RepositoryT], db: AsyncSession) -> RepositoryT:
+    """Instancia el repositorio del backend configurado (REPOSITORY_BACKEND: sql | memory)"""
+
+    if uses_memory_backend():
+        return _IN_MEMORY[repository_class](memory_store)
+    return repository_class(db)
@@ -0,0 +1,456 @@
+"""
+Backend en memoria de los repositorios.
+
+Cada repositorio hereda del SQL (así sirve donde se inyecta ese tipo) y
+redefine todos sus métodos sobre diccionarios por tabla, para correr demos
+y benchmarks de CPU sin MySQL. Replica lo que hace la base: ids
+autoincrementales, valores por defecto y onupdate de las columnas, fechas
+sin zona horaria, orden con la collation de MySQL (sin distinguir
+mayúsculas ni acentos) y los mismos filtros de estado.
+
+No hay transacciones: cada cambio queda aplicado al momento, así que commit
+y rollback no hacen nada. El estado es por proceso.
+"""
+import unicodedata
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import DateTime
+from sqlalchemy.exc import MultipleResultsFound
+
+from src.infrastructure.database.models import (
+    Area, Cliente, Conversacion, ConfiguracionIA, Mensaje,
+    EstadoEnum, EstadoConversacionEnum
+)
+from src.shared.utils.timing import now
+from src.shared.utils.tracing import tracer
+from .area_repository import AreaRepository
+from .cliente_repository import ClienteRepository
+from .configuracion_ia_repository import ConfiguracionIARepository
+from .conversacion_repository import ConversacionRepository
+from .mensaje_repository import MensajeRepository
+
+
+_MODELS = {model.__tablename__: model for model in (Area, Cliente, Conversacion, Mensaje, ConfiguracionIA)}
+
+_ACTIVE_CONVERSATION_STATES = (EstadoConversacionEnum.IA_RESPONDIENDO, EstadoConversacionEnum.ESPERANDO_HUMANO)
+
+
+
+def collation_key(value: Optional[str]) -> str:
+    """Clave de comparación equivalente a utf8mb4_general_ci (sin mayúsculas ni acentos)"""
+
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+
+class MemoryStore:
+    """Tablas en memoria (id → instancia del modelo) con los índices que usan los repositorios"""
+
+    def __init__(self):
+        self.reset()
+
+
+    def reset(self) -> None:
+        self.tables: Dict[str, Dict[int, Any]] = {name: {} for name in _MODELS}
+        self._last_ids: Dict[str, int] = {name: 0 for name in _MODELS}
+        self._conversations_by_client: Dict[int, List[Conversacion]] = defaultdict(list)
+        self._messages_by_conversation: Dict[int, List[Mensaje]] = defaultdict(list)
+
+
+    def insert(self, instance: Any) -> Any:
+        """Guarda una instancia aplicando id, defaults de columna y fechas como las guarda MySQL"""
+
+        table = instance.__tablename__
+        for column in instance.__table__.columns:
+            value = getattr(instance, column.key)
+            if value is None and column.default is not None:
+                value = column.default.arg(None) if column.default.is_callable else column.default.arg
+            if isinstance(column.type, DateTime):
+                value = self._naive_utc(value)
+            setattr(instance, column.key, value)
+
+        if instance.id is None:
+            instance.id = self._last_ids[table] + 1
+        self._last_ids[table] = max(self._last_ids[table], instance.id)
+        self.tables[table][instance.id] = instance
+
+        if isinstance(instance, Conversacion):
+            self._conversations_by_client[instance.id_cliente].append(instance)
+        elif isinstance(instance, Mensaje):
+            self._messages_by_conversation[instance.id_conversacion].append(instance)
+        return instance
+
+
+    def load(self, table: str, rows: Iterable[Dict[str, Any]]) -> int:
+        """Carga filas (dicts con las columnas) en una tabla; retorna cuántas"""
+
+        model = _MODELS[table]
+        count = 0
+        for row in rows:
+            self.insert(model(**row))
+            count += 1
+        return count
+
+
+    def touch(self, instance: Any, changed: Iterable[str] = ()) -> None:
+        """Aplica los onupdate de las columnas no asignadas explícitamente y normaliza las fechas"""
+
+        for column in instance.__table__.columns:
+            if column.onupdate is not None and column.key not in changed:
+                setattr(instance, column.key, column.onupdate.arg(None))
+            if isinstance(column.type, DateTime):
+                setattr(instance, column.key, self._naive_utc(getattr(instance, column.key)))
+
+
+    def get(self, table: str, instance_id: Optional[int]) -> Optional[Any]:
+        return self.tables[table].get(instance_id)
+
+
+    def all(self, table: str) -> List[Any]:
+        return list(self.tables[table].values())
+
+
+    def delete(self, table: str, instance_id: int) -> bool:
+        return self.tables[table].pop(instance_id, None) is not None
+
+
+    def conversations_of(self, client_id: int) -> List[Conversacion]:
+        return self._conversations_by_client.get(client_id, [])
+
+
+    def messages_of(self, conversation_id: int) -> List[Mensaje]:
+        return self._messages_by_conversation.get(conversation_id, [])
+
+
+    def next_ids(self) -> Dict[str, int]:
+        return {table: last_id + 1 for table, last_id in self._last_ids.items()}
+
+
+    def get_stats(self) -> Dict[str, int]:
+        return {table: len(rows) for table, rows in self.tables.items()}
+
+
+    @staticmethod
+    def _naive_utc(value: Any) -> Any:
+        # DATETIME de MySQL no guarda zona: las fechas con zona se guardan en UTC sin ella
+        if isinstance(value, datetime) and value.tzinfo is not None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+
+
+@tracer.traced_class
+class InMemoryAreaRepository(AreaRepository):
+    def __init__(self, store: MemoryStore):
+        super().__init__(db=None)
+        self.store = store
+
+
+    def _sorted_by_name(self, areas: Iterable[Area]) -> List[Area]:
+        return sorted(areas, key=lambda area: (collation_key(area.nombre), area.id))
+
+
+    async def get_all(self, include_inactive: bool = True) -> List[Area]:
+        areas = self.store.all("areas")
+        if not include_inactive:
+            areas = [area for area in areas if area.estado == EstadoEnum.ACTIVE]
+        return self._sorted_by_name(areas)
+
+
+    async def get_by_id(self, area_id: int) -> Optional[Area]:
+        return self.store.get("areas", area_id)
+
+
+    async def get_by_name(self, nombre: str) -> Optional[Area]:
+        key = collation_key(nombre)
+        return next((area for area in self.store.all("areas") if collation_key(area.nombre) == key), None)
+
+
+    async def get_active_areas(self) -> List[Area]:
+        return await self.get_all(include_inactive=False)
+
+
+    async def search(self, search_term: str) -> List[Area]:
+        term = collation_key(search_term)
+        return self._sorted_by_name(
+            area for area in self.store.all("areas")
+            if any(
+                term in collation_key(value)
+                for value in (area.nombre, area.descripcion, area.instrucciones, area.especialista_asignado)
+            )
+        )
+
+
+    async def create(self, area_data: dict) -> Area:
+        return self.store.insert(Area(**area_data))
+
+
+    async def update(self, area_id: int, area_data: dict) -> Optional[Area]:
+        area = await self.get_by_id(area_id)
+        if not area:
+            return None
+
+        for key, value in area_data.items():
+            if hasattr(area, key):
+                setattr(area, key, value)
+        self.store.touch(area, area_data)
+        return area
+
+
+    async def delete(self, area_id: int) -> bool:
+        return self.store.delete("areas", area_id)
+
+
+    async def toggle_status(self, area_id: int) -> Optional[Area]:
+        area = await self.get_by_id(area_id)
+        if not area:
+            return None
+
+        area.estado = EstadoEnum.INACTIVE if area.estado == EstadoEnum.ACTIVE else EstadoEnum.ACTIVE
+        return area
+
+
+    async def get_stats(self) -> dict:
+        areas = self.store.all("areas")
+        active = [area for area in areas if area.estado == EstadoEnum.ACTIVE]
+        times = [area.tiempo_respuesta for area in active if area.tiempo_respuesta is not None]
+        avg_response_time = sum(times) / len(times) if times else 0
+
+        return {
+            "total_areas": len(areas),
+            "active_areas": len(active),
+            "inactive_areas": len(areas) - len(active),
+            "avg_response_time": round(float(avg_response_time), 1)
+        }
+
+
+    async def get_with_relationships(self, area_id: int) -> Optional[Area]:
+        area = await self.get_by_id(area_id)
+        if not area:
+            return None
+
+        area.conversaciones = [
+            conversation for conversation in self.store.all("conversaciones")
+            if conversation.id_area_derivada == area_id
+        ]
+        area.clientes = [client for client in self.store.all("clientes") if client.id_area_asignada == area_id]
+        return area
+
+
+    async def exists_by_name(self, nombre: str, exclude_id: Optional[int] = None) -> bool:
+        key = collation_key(nombre)
+        return any(
+            collation_key(area.nombre) == key and (not exclude_id or area.id != exclude_id)
+            for area in self.store.all("areas")
+        )
+
+
+    async def get_areas_for_derivation(self) -> List[Area]:
+        areas = [
+            area for area in self.store.all("areas")
+            if area.estado == EstadoEnum.ACTIVE and area.especialista_asignado is not None
+        ]
+        # MySQL ordena los NULL primero en ASC
+        return sorted(areas, key=lambda area: (area.tiempo_respuesta is not None, area.tiempo_respuesta or 0, area.id))
+
+
+    async def refresh(self, area: Area) -> None:
+        pass
+
+
+    async def commit(self):
+        pass
+
+
+    async def rollback(self):
+        pass
+
+
+
+@tracer.traced_class
+class InMemoryClienteRepository(ClienteRepository):
+    def __init__(self, store: MemoryStore):
+        super().__init__(db=None)
+        self.store = store
+
+
+    async def get_by_id(self, client_id: int) -> Optional[Cliente]:
+        return self.store.get("clientes", client_id)
+
+
+    async def create(self, data: dict) -> Cliente:
+        return self.store.insert(Cliente(**data))
+
+
+    async def update(self, client_id: int, data: dict) -> Optional[Cliente]:
+        client = await self.get_by_id(client_id)
+        if not client:
+            return None
+
+        for key, value in data.items():
+            setattr(client, key, value)
+        self.store.touch(client, data)
+        return client
+
+
+    async def commit(self):
+        pass
+
+
+
+@tracer.traced_class
+class InMemoryConfiguracionIARepository(ConfiguracionIARepository):
+    def __init__(self, store: MemoryStore):
+        super().__init__(db=None)
+        self.store = store
+
+
+    async def get_active_config(self) -> Optional[ConfiguracionIA]:
+        configs = self.store.all("configuracion_ia")
+        return max(configs, key=lambda config: (config.updated_at, config.id), default=None)
+
+
+    async def create_or_update_config(self, config_data: dict) -> ConfiguracionIA:
+        existing_config = await self.get_active_config()
+        if not existing_config:
+            config_data["updated_at"] = now()
+            return self.store.insert(ConfiguracionIA(**config_data))
+
+        for key, value in config_data.items():
+            if hasattr(existing_config, key):
+                setattr(existing_config, key, value)
+        self.store.touch(existing_config, config_data)
+        return existing_config
+
+
+    async def commit(self):
+        pass
+
+
+    async def rollback(self):
+        pass
+
+
+
+@tracer.traced_class
+class InMemoryConversacionRepository(ConversacionRepository):
+    def __init__(self, store: MemoryStore):
+        super().__init__(db=None)
+        self.store = store
+
+
+    async def create(self, conversation_data: dict) -> Conversacion:
+        return self.store.insert(Conversacion(**conversation_data))
+
+
+    async def create_and_get_id(self, conversation_data: dict) -> Tuple[Conversacion, int]:
+        conversacion = await self.create(conversation_data)
+        return conversacion, conversacion.id
+
+
+    async def get_active_by_client(self, client_id: int) -> Optional[Conversacion]:
+        active = [
+            conversation for conversation in self.store.conversations_of(client_id)
+            if conversation.estado in _ACTIVE_CONVERSATION_STATES
+        ]
+        # Igual que scalar_one_or_none: más de una activa es un estado inválido
+        if len(active) > 1:
+            raise MultipleResultsFound(f"El cliente {client_id} tiene {len(active)} conversaciones activas")
+        return active[0] if active else None
+
+
+    async def get_all_active(self) -> List[Conversacion]:
+        active = [
+            conversation for conversation in self.store.all("conversaciones")
+            if conversation.estado in _ACTIVE_CONVERSATION_STATES
+        ]
+        return sorted(active, key=lambda conversation: (conversation.updated_at, conversation.id), reverse=True)
+
+
+    async def count_created_since(self, since: datetime) -> int:
+        since = self.store._naive_utc(since)
+        return sum(1 for conversation in self.store.all("conversaciones") if conversation.created_at >= since)
+
+
+    async def update(self, conversation_id: int, update_data: dict) -> Optional[Conversacion]:
+        conversation = await self.get_by_id(conversation_id)
+        if not conversation:
+            return None
+
+        for key, value in update_data.items():
+            if hasattr(conversation, key):
+                setattr(conversation, key, value)
+        self.store.touch(conversation, update_data)
+        return conversation
+
+
+    async def get_by_id(self, conversation_id: int) -> Optional[Conversacion]:
+        return self.store.get("conversaciones", conversation_id)
+
+
+    async def commit(self):
+        pass
+
+
+    async def rollback(self):
+        pass
+
+
+
+@tracer.traced_class
+class InMemoryMensajeRepository(MensajeRepository):
+    def __init__(self, store: MemoryStore):
+        super().__init__(db=None)
+        self.store = store
+
+
+    async def create(self, message_data: dict) -> Mensaje:
+        if "timestamp" not in message_data:
+            message_data["timestamp"] = now()
+        return self.store.insert(Mensaje(**message_data))
+
+
+    async def create_and_get_id(self, message_data: dict) -> tuple[Mensaje, int]:
+        mensaje = await self.create(message_data)
+        return mensaje, mensaje.id
+
+
+    async def get_by_conversation(
+        self,
+        conversation_id: int,
+        limit: int = 50,
+        offset: int = 0
+    ) -> List[Mensaje]:
+        messages = sorted(self.store.messages_of(conversation_id), key=lambda mensaje: (mensaje.timestamp, mensaje.id))
+        return messages[offset:offset + limit]
+
+
+    async def get_recent_by_conversation(self, conversation_id: int, limit: int = 10) -> List[Mensaje]:
+        messages = sorted(
+            self.store.messages_of(conversation_id),
+            key=lambda mensaje: (mensaje.timestamp, mensaje.id),
+            reverse=True
+        )
+        return list(reversed(messages[:limit]))
+
+
+    async def get_by_id(self, message_id: int) -> Mensaje:
+        return self.store.get("mensajes", message_id)
+
+
+    async def commit(self):
+        pass
+
+
+    async def rollback(self):
+        pass
+
+
+
+# Estado compartido por todas las instancias del proceso (como la base)
+memory_store = MemoryStore()
@@ -4,9 +4,11 @@ from typing import List
 
 from src.infrastructure.database.models import Mensaje
 from src.shared.utils.timing import now
+from src.shared.utils.tracing import tracer
 
 
 
+@tracer.traced_class
 class MensajeRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -71,6 +73,19 @@ class MensajeRepository:
         return list(result.scalars().all())
 
 
+    async def get_recent_by_conversation(self, conversation_id: int, limit: int = 10) -> List[Mensaje]:
+        """Obtiene los últimos mensajes de una conversación, ordenados del más antiguo al más reciente"""
+
+        query = select(Mensaje).where(
+            Mensaje.id_conversacion == conversation_id
+        ).order_by(
+            Mensaje.timestamp.desc(), Mensaje.id.desc()
+        ).limit(limit)
+
+        result = await self.db.execute(query)
+        return list(reversed(result.scalars().all()))
+
+
     async def get_by_id(self, message_id: int) -> Mensaje:
         """Obtiene un mensaje por ID"""
         query = select(Mensaje).where(Mensaje.id == message_id)
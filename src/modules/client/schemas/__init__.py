@@ -1,7 +1,9 @@
 from .area_dtos import AreaCreateDTO, AreaResponseDTO, AreaStatsDTO, AreaUpdateDTO
+from .ai_schemas import AIDecision, AI_DECISION_RESPONSE_SCHEMA, decode_ai_decision
 
 
 
 __all__ = [
-    "AreaCreateDTO", "AreaResponseDTO", "AreaStatsDTO", "AreaUpdateDTO"
+    "AreaCreateDTO", "AreaResponseDTO", "AreaStatsDTO", "AreaUpdateDTO",
+    "AIDecision", "AI_DECISION_RESPONSE_SCHEMA", "decode_ai_decision"
 ]
@@ -0,0 +1,57 @@
+from typing import Optional
+
+import msgspec
+
+
+
+class AIDecision(msgspec.Struct, frozen=True):
+    """Salida estructurada del modelo: respuesta al cliente y decisión de derivación"""
+
+    respuesta: str
+    derivar: bool = False
+    area_id: Optional[int] = None
+    confianza: float = 0.0
+
+
+# Esquema que se le pide a Gemini (response_schema); debe coincidir con AIDecision
+AI_DECISION_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "respuesta": {"type": "string", "description": "Respuesta para el cliente"},
+        "derivar": {"type": "boolean", "description": "true si la consulta debe pasar a un especialista"},
+        "area_id": {"type": "integer", "nullable": True, "description": "ID del área a la que se deriva"},
+        "confianza": {"type": "number", "description": "Confianza en la respuesta y la decisión, entre 0 y 1"}
+    },
+    "required": ["respuesta", "derivar", "confianza"]
+}
+
+
+_decoder = msgspec.json.Decoder(AIDecision)
+
+
+def decode_ai_decision(raw: str) -> AIDecision:
+    """
+    Decodifica la respuesta JSON del modelo.
+
+    Lanza ValueError si el texto no es un AIDecision válido.
+    """
+
+    text = raw.strip()
+
+    # Algunos modelos envuelven el JSON en un bloque de código aunque se pida JSON puro
+    if text.startswith("```"):
+        text = text.strip("`").strip()
+        if text.startswith("json"):
+            text = text[4:]
+
+    try:
+        decision = _decoder.decode(text)
+    except msgspec.ValidationError as e:
+        raise ValueError(f"Respuesta estructurada inválida: {e}") from e
+    except msgspec.DecodeError as e:
+        raise ValueError(f"Respuesta de la IA no es JSON válido: {e}") from e
+
+    if not decision.respuesta.strip():
+        raise ValueError("Respuesta vacía de la IA")
+
+    return msgspec.structs.replace(decision, confianza=min(max(decision.confianza, 0.0), 1.0))
@@ -1,17 +1,56 @@
-from .area_service import AreaService
+from .area_service import AreaService, area_listing_cache
 from .cliente_service import ClienteService
 from .conversacion_service import ConversacionService
 from .mensaje_service import MensajeService
-from .ia_service import AIService
+from .ia_service import AIService, ai_single_flight, ai_limiter, ai_circuit_breaker
 from .configuracion_ia_service import ConfiguracionIAService
+from .ai_task_registry import AITaskRegistry, AITaskCancelledError, ai_task_registry
+from .ai_response_cache import AIResponseCache, ai_response_cache
+from .ai_model_pool import AIModelPool, ai_model_pool
+from .ai_load_shedder import AILoadShedder, ai_load_shedder
+from .area_ranker import AreaRanker, area_ranker
+from .recent_message_buffer import RecentMessage, RecentMessageBuffer, recent_messages
+from .ai_call_telemetry import AICallTelemetry, ai_call_telemetry
+from .simulated_llm import SimulatedLLM, simulated_llm
+from .session_recorder import SessionRecorder, session_recorder, scrub_pii
+from .chat_pipeline import load_ai_config, load_derivation_areas
+from .runtime_metrics import register_runtime_metrics
 
 
 
 __all__ = [
     "AreaService",
+    "area_listing_cache",
     "ClienteService",
     "ConversacionService",
     "MensajeService",
     "AIService",
-    "ConfiguracionIAService"
+    "ai_single_flight",
+    "ai_limiter",
+    "ai_circuit_breaker",
+    "ConfiguracionIAService",
+    "AITaskRegistry",
+    "AITaskCancelledError",
+    "ai_task_registry",
+    "AIResponseCache",
+    "ai_response_cache",
+    "AIModelPool",
+    "ai_model_pool",
+    "AILoadShedder",
+    "ai_load_shedder",
+    "AreaRanker",
+    "area_ranker",
+    "RecentMessage",
+    "RecentMessageBuffer",
+    "recent_messages",
+    "AICallTelemetry",
+    "ai_call_telemetry",
+    "SimulatedLLM",
+    "simulated_llm",
+    "SessionRecorder",
+    "session_recorder",
+    "scrub_pii",
+    "load_ai_config",
+    "load_derivation_areas",
+    "register_runtime_metrics"
 ]
\ No newline at end of file
@@ -0,0 +1,149 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from src.infrastructure.database.config import db_config
+from src.infrastructure.database.models import LlamadaIA
+from src.shared.settings.base import settings
+
+
+# Todas las filas de un lote deben traer las mismas columnas para el executemany
+_ROW_DEFAULTS: Dict[str, Any] = {
+    "id_conversacion": None,
+    "origen": "proveedor",
+    "modelo": None,
+    "escalado": False,
+    "latencia_ms": 0,
+    "tokens_entrada": 0,
+    "tokens_salida": 0,
+    "tokens_cacheados": 0,
+    "confianza": None,
+    "derivar": False,
+    "id_area": None,
+    "error": None
+}
+
+
+
+class AICallTelemetry:
+    """
+    Registro de telemetría de la IA fuera del camino del usuario.
+
+    record() solo agrega el registro a un buffer en memoria. Una tarea de
+    fondo lo vuelca a la tabla ai_llamadas en lotes (un INSERT con
+    executemany por lote) cuando el buffer llega al tamaño de lote o cuando
+    pasa el intervalo de vaciado, lo que ocurra primero.
+    """
+
+    def __init__(self, enabled: bool, batch_size: int, flush_interval: float, max_buffer: int):
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._buffer: List[Dict[str, Any]] = []
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._recorded = 0
+        self._written = 0
+        self._dropped = 0
+        self._flushes = 0
+
+
+    def record(self, **fields: Any) -> None:
+        """Encola un registro de ai_llamadas; nunca hace I/O"""
+
+        if not self.enabled:
+            return
+
+        # Si la BD no da abasto, se pierde telemetría antes que memoria
+        if len(self._buffer) >= self.max_buffer:
+            self._dropped += 1
+            return
+
+        self._buffer.append({**_ROW_DEFAULTS, "created_at": datetime.utcnow(), **fields})
+        self._recorded += 1
+
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+
+    async def start(self) -> None:
+        """Arranca el escritor de fondo (hook de inicio de la app)"""
+
+        if not self.enabled or self._task is not None:
+            return
+
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+        print("📊 Telemetría de IA iniciada")
+
+
+    async def stop(self) -> None:
+        """Vacía lo pendiente y detiene el escritor (hook de cierre de la app)"""
+
+        if self._task is None:
+            return
+
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        print(f"📊 Telemetría de IA detenida ({self._written} registros escritos)")
+
+
+    async def flush(self) -> None:
+        """Escribe todo el buffer en lotes de batch_size"""
+
+        while self._buffer:
+            batch = self._buffer[:self.batch_size]
+            del self._buffer[:self.batch_size]
+
+            try:
+                async with db_config.get_engine().begin() as connection:
+                    # Lista de parámetros → executemany en el driver
+                    await connection.execute(insert(LlamadaIA), batch)
+                self._written += len(batch)
+                self._flushes += 1
+            except Exception as e:
+                self._dropped += len(batch)
+                print(f"❌ Error guardando telemetría de IA ({len(batch)} registros): {str(e)}")
+
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "running": self._task is not None,
+            "buffered": len(self._buffer),
+            "recorded": self._recorded,
+            "written": self._written,
+            "dropped": self._dropped,
+            "flushes": self._flushes
+        }
+
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+
+            self._wakeup.clear()
+            await self.flush()
+
+        # Último vaciado al cerrar
+        await self.flush()
+
+
+
+# Singleton compartido por todas las conexiones del worker
+ai_call_telemetry = AICallTelemetry(
+    # Con el backend en memoria no hay tabla donde escribir
+    enabled=settings.ai_telemetry_enabled and settings.repository_backend == "sql",
+    batch_size=settings.ai_telemetry_batch_size,
+    flush_interval=settings.ai_telemetry_flush_interval,
+    max_buffer=settings.ai_telemetry_max_buffer
+)
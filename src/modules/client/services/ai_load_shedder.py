@@ -0,0 +1,119 @@
+import math
+from typing import Optional, Dict, Any, List
+
+from src.infrastructure.database.models import Area
+from src.shared.settings.base import settings
+from .ai_task_registry import ai_task_registry
+from .area_service import AreaService
+from .ia_service import ai_limiter, ai_circuit_breaker
+
+
+SHED_TRANSFER_MESSAGE = (
+    "Estamos recibiendo muchas consultas en este momento. "
+    "Para no hacerte esperar, te conectaremos con un especialista."
+)
+
+
+
+class AILoadShedder:
+    """
+    Control de admisión delante de AIService.
+
+    Estima la profundidad de la cola y la espera esperada a partir del
+    registro de tareas y del limitador adaptativo. Si la espera supera el
+    máximo configurado (o el circuito está abierto) aplica la política:
+    - transfer: respuesta inmediata y derivación al área más afín
+    - busy: aviso de "estamos ocupados" con la posición en la cola
+    - off: nunca descarta
+    """
+
+    POLICIES = ("off", "transfer", "busy")
+
+    def __init__(self, policy: str, max_wait: float, default_latency: float):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Política de descarte inválida: {policy}")
+
+        self.policy = policy
+        self.max_wait = max_wait
+        self.default_latency = default_latency
+        self._shed: Dict[str, int] = {}
+
+
+    def estimate(self) -> Dict[str, Any]:
+        """Profundidad de cola y espera estimada para un mensaje que llega ahora"""
+
+        tasks = ai_task_registry.get_stats()
+        limiter = ai_limiter.get_stats()
+
+        limit = max(limiter["limit"], 1)
+        latency = limiter["latency_ewma"] or self.default_latency
+        queue_depth = tasks["queued"] + limiter["waiting"]
+
+        # Mensajes por delante que no caben en los slots libres
+        ahead = max(limiter["in_flight"] + queue_depth - limit + 1, 0)
+        expected_wait = math.ceil(ahead / limit) * latency
+
+        return {
+            "queue_depth": queue_depth,
+            "queue_position": ahead,
+            "limit": limit,
+            "latency_estimate": round(latency, 3),
+            "expected_wait": round(expected_wait, 3),
+            "circuit_state": ai_circuit_breaker.state
+        }
+
+
+    def decide(self) -> Optional[Dict[str, Any]]:
+        """Retorna la decisión de descarte, o None si el mensaje debe ir a la IA normalmente"""
+
+        if self.policy == "off":
+            return None
+
+        estimate = self.estimate()
+        circuit_open = estimate["circuit_state"] == ai_circuit_breaker.OPEN
+
+        if not circuit_open and estimate["expected_wait"] <= self.max_wait:
+            return None
+
+        # Con el circuito abierto no hay cola que esperar: derivar directamente
+        policy = "transfer" if circuit_open else self.policy
+        self._shed[policy] = self._shed.get(policy, 0) + 1
+
+        return {
+            "policy": policy,
+            "reason": "circuit_open" if circuit_open else "queue_saturated",
+            **estimate
+        }
+
+
+    def pick_area(self, message: str, areas: List[Area]) -> Optional[Area]:
+        """Área más afín al mensaje según el matcher local"""
+        return AreaService.match_best_area(message, areas)
+
+
+    def busy_message(self, decision: Dict[str, Any]) -> str:
+        wait_seconds = max(int(decision["expected_wait"]), 1)
+        return (
+            "⏳ Estamos atendiendo muchas consultas en este momento. "
+            f"Tu mensaje está en la posición {decision['queue_position']} de la fila; "
+            f"te responderemos en aproximadamente {wait_seconds} segundos."
+        )
+
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "policy": self.policy,
+            "max_wait": self.max_wait,
+            "shed": sum(self._shed.values()),
+            "shed_by_policy": dict(self._shed),
+            **self.estimate()
+        }
+
+
+
+# Singleton compartido por todas las conexiones del worker
+ai_load_shedder = AILoadShedder(
+    policy=settings.ai_shed_policy,
+    max_wait=settings.ai_shed_max_wait,
+    default_latency=settings.ai_latency_target / 2
+)
@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Optional, Dict, Any, Tuple
+
+import google.generativeai as genai
+from google.generativeai import caching
+
+from src.shared.settings.base import settings
+from src.shared.utils.single_flight import SingleFlight
+from src.modules.client.schemas import AIDecision
+
+
+# Modelos guardados por configuraciones antiguas que ya no existen en la API
+LEGACY_MODEL_ALIASES = {
+    "gemini-pro": "gemini-2.0-flash",
+    "gpt-4": "gemini-2.0-flash",
+}
+
+# Instrucción para el modelo barato de la cascada: declarar baja confianza en vez de improvisar
+CASCADE_INSTRUCTIONS = """
+
+MODO RESPUESTA RÁPIDA:
+Si puedes responder con seguridad en pocas frases, o si la consulta solo debe derivarse, responde normalmente.
+Si la consulta requiere un análisis detallado o no estás seguro de la respuesta, usa una confianza menor a 0.5.
+"""
+
+# Modelos con instrucción de sistema distintos que se mantienen en memoria
+MAX_INSTRUCTED_MODELS = 64
+
+
+
+class AIModelPool:
+    """
+    Pool de clientes de modelo de Gemini, uno por nombre de modelo.
+
+    El modelo a usar sale de ConfiguracionIA.model. Opcionalmente se puede
+    configurar una cascada: un modelo barato y rápido atiende primero los
+    mensajes cortos y solo se escala al modelo configurado cuando la
+    confianza que reporta el barato en su salida estructurada es baja.
+
+    Cada combinación (modelo, versión del prompt del sistema) tiene su propio
+    cliente con la instrucción de sistema fija. Si el prompt es lo bastante
+    largo se usa la caché de contexto explícita de Gemini, de modo que el
+    prefijo estable no se vuelve a procesar (ni a cobrar) en cada turno.
+    """
+
+    def __init__(
+        self,
+        default_model: str,
+        cascade_model: str,
+        cascade_max_chars: int,
+        cascade_min_confidence: float,
+        context_cache_enabled: bool,
+        context_cache_min_chars: int,
+        context_cache_ttl: int
+    ):
+        self.default_model = default_model
+        self.cascade_model = cascade_model or None
+        self.cascade_max_chars = cascade_max_chars
+        self.cascade_min_confidence = cascade_min_confidence
+        self._models: Dict[str, genai.GenerativeModel] = {}
+        self._calls: Dict[str, int] = {}
+        self._cascade_attempts = 0
+        self._escalations = 0
+
+        self.context_cache_enabled = context_cache_enabled
+        self.context_cache_min_chars = context_cache_min_chars
+        self.context_cache_ttl = context_cache_ttl
+        self._instructed: "OrderedDict[Tuple[str, str], genai.GenerativeModel]" = OrderedDict()
+        # (modelo, versión) → (cliente sobre la caché, instante en que hay que renovarla)
+        self._context_caches: Dict[Tuple[str, str], Tuple[genai.GenerativeModel, float]] = {}
+        # (modelo, versión) → instante hasta el que no se reintenta crear la caché
+        self._context_cache_backoff: Dict[Tuple[str, str], float] = {}
+        self._context_cache_flight = SingleFlight()
+        self._context_cache_hits = 0
+        self._context_cache_created = 0
+        self._context_cache_failures = 0
+
+
+    def resolve(self, model_name: Optional[str]) -> str:
+        """Normaliza el nombre configurado a un modelo de Gemini válido"""
+
+        name = (model_name or "").strip()
+        name = LEGACY_MODEL_ALIASES.get(name, name)
+        if not name.startswith("gemini"):
+            return self.default_model
+        return name
+
+
+    def get(self, model_name: Optional[str]) -> genai.GenerativeModel:
+        """Obtiene (o crea la primera vez) el cliente del modelo"""
+
+        name = self.resolve(model_name)
+        model = self._models.get(name)
+        if model is None:
+            model = genai.GenerativeModel(name)
+            self._models[name] = model
+            print(f"✅ Cliente Gemini inicializado: {name}")
+        return model
+
+
+    @staticmethod
+    def prompt_version(system_instruction: str) -> str:
+        """Huella del prompt del sistema; cambia cuando cambia la configuración o las áreas"""
+        return hashlib.sha1(system_instruction.encode("utf-8")).hexdigest()[:16]
+
+
+    async def get_for_prompt(self, model_name: Optional[str], system_instruction: str) -> genai.GenerativeModel:
+        """Cliente del modelo con la instrucción de sistema fija, sobre caché de contexto si aplica"""
+
+        name = self.resolve(model_name)
+        key = (name, self.prompt_version(system_instruction))
+
+        if self.context_cache_enabled and len(system_instruction) >= self.context_cache_min_chars:
+            model = await self._get_context_cached(key, system_instruction)
+            if model is not None:
+                return model
+
+        model = self._instructed.get(key)
+        if model is None:
+            model = genai.GenerativeModel(name, system_instruction=system_instruction)
+            self._instructed[key] = model
+            if len(self._instructed) > MAX_INSTRUCTED_MODELS:
+                self._instructed.popitem(last=False)
+        else:
+            self._instructed.move_to_end(key)
+        return model
+
+
+    def cascade_for(self, primary_model: str, message: str) -> Optional[str]:
+        """Modelo barato a probar primero, o None si la cascada no aplica a este mensaje"""
+
+        if not self.cascade_model:
+            return None
+
+        cascade = self.resolve(self.cascade_model)
+        if cascade == primary_model or len(message) > self.cascade_max_chars:
+            return None
+        return cascade
+
+
+    def should_escalate(self, decision: AIDecision) -> bool:
+        """El modelo barato no confía en su respuesta: pasar al modelo configurado"""
+        return decision.confianza < self.cascade_min_confidence
+
+
+    def record_call(self, model_name: str) -> None:
+        self._calls[model_name] = self._calls.get(model_name, 0) + 1
+
+
+    def record_cascade(self, escalated: bool) -> None:
+        self._cascade_attempts += 1
+        if escalated:
+            self._escalations += 1
+
+
+    async def _get_context_cached(
+        self,
+        key: Tuple[str, str],
+        system_instruction: str
+    ) -> Optional[genai.GenerativeModel]:
+        now = time.monotonic()
+
+        entry = self._context_caches.get(key)
+        if entry is not None and now < entry[1]:
+            self._context_cache_hits += 1
+            return entry[0]
+
+        if now < self._context_cache_backoff.get(key, 0.0):
+            return None
+
+        try:
+            # Una sola creación por versión aunque lleguen varios mensajes a la vez
+            return await self._context_cache_flight.do(
+                key, lambda: self._create_context_cache(key, system_instruction)
+            )
+        except Exception as e:
+            # Modelo sin soporte, prompt bajo el mínimo del proveedor, cuota, etc.
+            self._context_cache_failures += 1
+            self._context_cache_backoff[key] = now + self.context_cache_ttl
+            print(f"⚠️ Caché de contexto no disponible para {key[0]}: {str(e)}")
+            return None
+
+
+    async def _create_context_cache(self, key: Tuple[str, str], system_instruction: str) -> genai.GenerativeModel:
+        name, version = key
+
+        # La API de caché del SDK es síncrona: no bloquear el event loop
+        cached_content = await asyncio.to_thread(
+            caching.CachedContent.create,
+            model=f"models/{name}",
+            display_name=f"prism-{version}",
+            system_instruction=system_instruction,
+            ttl=timedelta(seconds=self.context_cache_ttl)
+        )
+        model = genai.GenerativeModel.from_cached_content(cached_content)
+
+        # Renovar antes de que expire en el proveedor; las versiones vencidas se olvidan
+        now = time.monotonic()
+        self._context_caches = {
+            cache_key: entry for cache_key, entry in self._context_caches.items() if entry[1] > now
+        }
+        self._context_caches[key] = (model, now + self.context_cache_ttl * 0.9)
+        self._context_cache_created += 1
+        print(f"✅ Caché de contexto creada: {name} ({version})")
+        return model
+
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "default_model": self.default_model,
+            "cascade_model": self.cascade_model,
+            "models": list(self._models.keys()),
+            "calls_by_model": dict(self._calls),
+            "cascade_attempts": self._cascade_attempts,
+            "escalations": self._escalations,
+            "escalation_rate": round(self._escalations / self._cascade_attempts, 4) if self._cascade_attempts else 0.0,
+            "instructed_models": len(self._instructed),
+            "context_cache_enabled": self.context_cache_enabled,
+            "context_caches": len(self._context_caches),
+            "context_cache_hits": self._context_cache_hits,
+            "context_cache_created": self._context_cache_created,
+            "context_cache_failures": self._context_cache_failures
+        }
+
+
+
+# Singleton compartido por todas las conexiones del worker
+ai_model_pool = AIModelPool(
+    default_model=settings.ai_default_model,
+    cascade_model=settings.ai_cascade_model,
+    cascade_max_chars=settings.ai_cascade_max_chars,
+    cascade_min_confidence=settings.ai_cascade_min_confidence,
+    context_cache_enabled=settings.ai_context_cache_enabled,
+    context_cache_min_chars=settings.ai_context_cache_min_chars,
+    context_cache_ttl=settings.ai_context_cache_ttl
+)
@@ -0,0 +1,145 @@
+import hashlib
+import re
+import unicodedata
+from typing import Optional, Dict, Any, Tuple
+
+from cachetools import TTLCache
+
+from src.infrastructure.database.models import ConfiguracionIA
+from src.shared.settings.base import settings
+
+
+CLIENT_NAME_PLACEHOLDER = "{{cliente}}"
+
+
+
+def to_client_placeholder(text: str, client_name: str) -> Optional[str]:
+    """
+    Texto con el nombre del cliente cambiado por el marcador donde aparece como
+    palabra completa. None si además aparece dentro de otra palabra ("Ana" en
+    "Analizaremos") o con otras mayúsculas: ese texto no se puede personalizar
+    para otro cliente sin corromperlo.
+    """
+
+    if CLIENT_NAME_PLACEHOLDER in text:
+        return None
+    if not client_name:
+        return text
+
+    templated, replaced = re.subn(rf"(?<!\w){re.escape(client_name)}(?!\w)", CLIENT_NAME_PLACEHOLDER, text)
+    if text.lower().count(client_name.lower()) != replaced:
+        return None
+    return templated
+
+
+
+class AIResponseCache:
+    """
+    Caché LRU+TTL de respuestas de la IA para preguntas frecuentes.
+
+    Solo aplica a mensajes sin historial (primer turno): la clave es el texto
+    normalizado del mensaje más la versión del prompt del sistema, así que
+    cambiar la configuración o las áreas invalida las entradas anteriores.
+    """
+
+    def __init__(self, enabled: bool, maxsize: int, ttl: int):
+        self.enabled = enabled
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normaliza el texto: minúsculas, sin tildes, sin signos y espacios colapsados"""
+
+        text = unicodedata.normalize("NFKD", text.lower())
+        text = "".join(char for char in text if not unicodedata.combining(char))
+        text = re.sub(r"[^\w\s]", " ", text)
+        return " ".join(text.split())
+
+
+    @staticmethod
+    def prompt_version(system_prompt: str, config: ConfiguracionIA) -> str:
+        """Huella del prompt del sistema y de los parámetros de generación"""
+
+        fingerprint = "|".join([
+            system_prompt,
+            str(getattr(config, 'model', '')),
+            str(getattr(config, 'temperatura', '')),
+            str(getattr(config, 'max_tokens', ''))
+        ])
+        return hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:16]
+
+
+    def make_key(self, message: str, system_prompt: str, config: ConfiguracionIA) -> Tuple[str, str]:
+        return self.normalize(message), self.prompt_version(system_prompt, config)
+
+
+    def get(self, key: Tuple[str, str], client_name: str) -> Optional[Dict[str, Any]]:
+        """Retorna la respuesta cacheada personalizada para el cliente, o None"""
+
+        entry = self._cache.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        return {
+            **entry,
+            "response": entry["response"].replace(CLIENT_NAME_PLACEHOLDER, client_name),
+            "transfer_area": None,
+            "reasoning": "Respuesta desde caché"
+        }
+
+
+    def set(self, key: Tuple[str, str], result: Dict[str, Any], client_name: str) -> None:
+        """
+        Guarda una respuesta que no deriva; el nombre del cliente se guarda como
+        marcador. No se guarda si el nombre no se puede separar del texto.
+        """
+
+        if result.get("should_transfer"):
+            return
+
+        response = to_client_placeholder(result["response"], client_name)
+        if response is None:
+            return
+
+        self._cache[key] = {
+            "should_respond": result["should_respond"],
+            "response": response,
+            "should_transfer": False,
+            "confidence": result["confidence"]
+        }
+        self._stores += 1
+
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estadísticas de uso de la caché"""
+
+        lookups = self._hits + self._misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._cache),
+            "maxsize": self._cache.maxsize,
+            "ttl": self._cache.ttl,
+            "hits": self._hits,
+            "misses": self._misses,
+            "stores": self._stores,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0
+        }
+
+
+
+# Singleton compartido por todas las conexiones del worker
+ai_response_cache = AIResponseCache(
+    enabled=settings.ai_response_cache_enabled,
+    maxsize=settings.ai_response_cache_maxsize,
+    ttl=settings.ai_response_cache_ttl
+)
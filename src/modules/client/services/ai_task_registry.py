@@ -0,0 +1,148 @@
+import asyncio
+from typing import Dict, Set, Any, Awaitable, Callable, TypeVar
+
+from src.shared.settings.base import settings
+
+
+T = TypeVar("T")
+
+
+
+class AITaskCancelledError(Exception):
+    """La generación de IA de una conversación fue cancelada desde el registro"""
+
+    def __init__(self, conversation_id: int, reason: str):
+        super().__init__(f"Generación cancelada en conversación {conversation_id}: {reason}")
+        self.conversation_id = conversation_id
+        self.reason = reason
+
+
+
+class AITaskRegistry:
+    """
+    Registro de tareas de IA en curso, agrupadas por conversación.
+
+    Cada generación corre como una tarea cancelable que ocupa un slot de
+    concurrencia mientras está viva. Cancelar la tarea libera el slot de
+    inmediato, aunque la llamada al proveedor no haya terminado.
+
+    Solo la generación es cancelable: cuando la tarea empieza a guardar su
+    respuesta (begin_write) cancel() ya no la interrumpe, para no cortar un
+    commit a mitad en la sesión compartida de la conexión.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._tasks: Dict[int, Set[asyncio.Task]] = {}
+        self._cancel_reasons: Dict[asyncio.Task, str] = {}
+        self._writing: Set[asyncio.Task] = set()
+        self._in_flight = 0
+        self._started = 0
+        self._completed = 0
+        self._failed = 0
+        self._cancelled: Dict[str, int] = {}
+
+
+    async def run(self, conversation_id: int, coro_factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Ejecuta la generación como tarea registrada para la conversación.
+        Lanza AITaskCancelledError si la tarea se cancela con cancel()
+        """
+
+        task = asyncio.create_task(self._run_with_slot(coro_factory))
+        self._tasks.setdefault(conversation_id, set()).add(task)
+        self._started += 1
+
+        try:
+            result = await task
+            self._completed += 1
+            return result
+
+        except asyncio.CancelledError:
+            reason = self._cancel_reasons.get(task)
+            if reason is None:
+                # La cancelación viene de quien espera (p.ej. socket cerrado), no del registro
+                raise
+            raise AITaskCancelledError(conversation_id, reason)
+
+        except Exception:
+            self._failed += 1
+            raise
+
+        finally:
+            self._cancel_reasons.pop(task, None)
+            self._writing.discard(task)
+            tasks = self._tasks.get(conversation_id)
+            if tasks is not None:
+                tasks.discard(task)
+                if not tasks:
+                    del self._tasks[conversation_id]
+
+
+    def cancel(self, conversation_id: int, reason: str) -> int:
+        """Cancela todas las generaciones en curso de una conversación"""
+
+        cancelled = 0
+        for task in list(self._tasks.get(conversation_id, ())):
+            if task.done() or task in self._cancel_reasons or task in self._writing:
+                continue
+
+            self._cancel_reasons[task] = reason
+            task.cancel(reason)
+            cancelled += 1
+
+        if cancelled:
+            self._cancelled[reason] = self._cancelled.get(reason, 0) + cancelled
+            print(f"🛑 {cancelled} generación(es) de IA cancelada(s) en conversación {conversation_id} ({reason})")
+
+        return cancelled
+
+
+    def begin_write(self) -> bool:
+        """
+        Llamado por la generación antes de guardar su respuesta. Retorna False si
+        ya se pidió cancelarla; si no, desde aquí cancel() ya no la interrumpe
+        """
+
+        task = asyncio.current_task()
+        if task in self._cancel_reasons:
+            return False
+        self._writing.add(task)
+        return True
+
+
+    def has_pending(self, conversation_id: int) -> bool:
+        """Indica si la conversación tiene generaciones en curso"""
+        return bool(self._tasks.get(conversation_id))
+
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Métricas del registro para monitoreo"""
+
+        registered = sum(len(tasks) for tasks in self._tasks.values())
+        return {
+            "in_flight": self._in_flight,
+            "queued": max(registered - self._in_flight, 0),
+            "conversations": len(self._tasks),
+            "started": self._started,
+            "completed": self._completed,
+            "failed": self._failed,
+            "cancelled": sum(self._cancelled.values()),
+            "cancelled_by_reason": dict(self._cancelled)
+        }
+
+
+    async def _run_with_slot(self, coro_factory: Callable[[], Awaitable[T]]) -> T:
+        """Ocupa un slot de concurrencia durante la generación"""
+
+        async with self._slots:
+            self._in_flight += 1
+            try:
+                return await coro_factory()
+            finally:
+                self._in_flight -= 1
+
+
+
+# Singleton compartido por todas las conexiones del worker
+ai_task_registry = AITaskRegistry(max_concurrency=settings.ai_max_concurrency)
@@ -0,0 +1,108 @@
+import re
+import unicodedata
+from typing import Dict, FrozenSet, List, Tuple
+
+from src.infrastructure.database.models import Area
+from src.shared.settings.base import settings
+
+
+_WORD_RE = re.compile(r"\w+")
+
+# Palabras cortas o demasiado comunes para distinguir un área de otra
+_STOPWORDS = frozenset({
+    "para", "como", "cual", "cuales", "cuando", "donde", "esta", "este", "esto",
+    "estos", "estas", "sobre", "tengo", "necesito", "quiero", "puedo", "tiene",
+    "hola", "gracias", "favor", "consulta", "consultas", "ayuda", "todo", "todos",
+    "desde", "hasta", "entre", "porque", "pero", "tambien", "solo", "muy", "mas"
+})
+
+# Largo del prefijo usado como raíz: "tributario" y "tributaria" comparten "tribut"
+_STEM_LENGTH = 6
+
+
+
+class AreaRanker:
+    """
+    Pre-ranking local de áreas de derivación según el mensaje del cliente.
+
+    Permite que el prompt del sistema incluya el detalle completo solo de las
+    top_k áreas más relevantes y un índice de una línea para el resto, de modo
+    que el tamaño del prompt no crezca con el catálogo de áreas.
+    """
+
+    def __init__(self, top_k: int):
+        self.top_k = top_k
+        # id de área → (firma del contenido, raíces del nombre, raíces de nombre + descripción + instrucciones)
+        self._area_terms: Dict[int, Tuple[Tuple[str, ...], FrozenSet[str], FrozenSet[str]]] = {}
+
+
+    @staticmethod
+    def stems(text: str) -> FrozenSet[str]:
+        """Raíces normalizadas (sin tildes, minúsculas, prefijo fijo) de las palabras del texto"""
+
+        normalized = unicodedata.normalize("NFKD", (text or "").lower())
+        normalized = "".join(char for char in normalized if not unicodedata.combining(char))
+
+        return frozenset(
+            word[:_STEM_LENGTH]
+            for word in _WORD_RE.findall(normalized)
+            if len(word) >= 3 and word not in _STOPWORDS and not word.isdigit()
+        )
+
+
+    def prunes(self, areas: List[Area]) -> bool:
+        """Indica si el catálogo es lo bastante grande como para detallar solo algunas áreas"""
+        return 0 < self.top_k < len(areas)
+
+
+    def score(self, query_stems: FrozenSet[str], area: Area) -> float:
+        """Relevancia del área para la consulta; el nombre pesa el doble que el resto"""
+
+        name_stems, text_stems = self._terms_for(area)
+        return len(query_stems & text_stems) + len(query_stems & name_stems)
+
+
+    def select(self, query: str, areas: List[Area]) -> Tuple[List[Area], List[Area]]:
+        """
+        Separa las áreas en (detalladas, resto).
+
+        Las detalladas van ordenadas por relevancia; el resto conserva el orden
+        original. Sin top_k (0) o con pocas áreas, todas van detalladas.
+        """
+
+        if not self.prunes(areas):
+            return list(areas), []
+
+        query_stems = self.stems(query)
+        scored = [(self.score(query_stems, area), index) for index, area in enumerate(areas)]
+
+        # Orden estable: ante empate (o sin señal) gana el orden del catálogo
+        ranked = sorted(scored, key=lambda item: (-item[0], item[1]))
+        selected = {index for _, index in ranked[:self.top_k]}
+
+        detailed = [areas[index] for _, index in ranked[:self.top_k]]
+        rest = [area for index, area in enumerate(areas) if index not in selected]
+        return detailed, rest
+
+
+    def _terms_for(self, area: Area) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+        signature = (
+            getattr(area, 'nombre', '') or '',
+            getattr(area, 'descripcion', '') or '',
+            getattr(area, 'instrucciones', '') or ''
+        )
+
+        cached = self._area_terms.get(area.id)
+        if cached is not None and cached[0] == signature:
+            return cached[1], cached[2]
+
+        # Primera vez o el área cambió: recalcular sus raíces
+        name_stems = self.stems(signature[0])
+        text_stems = self.stems(" ".join(signature))
+        self._area_terms[area.id] = (signature, name_stems, text_stems)
+        return name_stems, text_stems
+
+
+
+# Singleton compartido por todas las conexiones del worker
+area_ranker = AreaRanker(top_k=settings.ai_prompt_areas_top_k)
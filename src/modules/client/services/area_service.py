@@ -2,9 +2,17 @@ from typing import List, Optional, Dict, Any
 
 from src.modules.client.repositories import AreaRepository
 from src.infrastructure.database.models import Area, EstadoEnum
+from src.shared.settings.base import settings
+from src.shared.utils.http_cache import VersionedBodyCache
+from src.shared.utils.tracing import tracer
 
 
+# ETags y cuerpos codificados de los listados de áreas; cada escritura los invalida
+area_listing_cache = VersionedBodyCache("areas", ttl=settings.area_cache_ttl)
 
+
+
+@tracer.traced_class
 class AreaService:
     def __init__(self, area_repository: AreaRepository):
         self.area_repository = area_repository
@@ -46,7 +54,8 @@ class AreaService:
         # Crear área
         area = await self.area_repository.create(processed_data)
         await self.area_repository.commit()
-        await self.area_repository.db.refresh(area)
+        area_listing_cache.bump()
+        await self.area_repository.refresh(area)
 
         return area
 
@@ -75,7 +84,8 @@ class AreaService:
         # Actualizar
         updated_area = await self.area_repository.update(area_id, processed_data)
         await self.area_repository.commit()
-        await self.area_repository.db.refresh(updated_area)
+        area_listing_cache.bump()
+        await self.area_repository.refresh(updated_area)
 
         return updated_area
 
@@ -99,6 +109,7 @@ class AreaService:
         success = await self.area_repository.delete(area_id)
         if success:
             await self.area_repository.commit()
+            area_listing_cache.bump()
 
         return success
 
@@ -114,6 +125,7 @@ class AreaService:
 
         updated_area = await self.area_repository.toggle_status(area_id)
         await self.area_repository.commit()
+        area_listing_cache.bump()
 
         return updated_area
 
@@ -161,13 +173,19 @@ class AreaService:
         (Lógica básica - en producción usarías IA más sofisticada)
         """
         active_areas = await self.area_repository.get_active_areas()
+        return self.match_best_area(query, active_areas)
+
+
+    @staticmethod
+    def match_best_area(query: str, areas: List[Area]) -> Optional[Area]:
+        """Elige la mejor área entre las dadas con el matcher local, sin consultar la BD"""
 
         query_lower = query.lower()
         best_match = None
         best_score = 0
 
-        for area in active_areas:
-            score = self._calculate_match_score(query_lower, area)
+        for area in areas:
+            score = AreaService._calculate_match_score(query_lower, area)
             if score > best_score:
                 best_score = score
                 best_match = area
@@ -176,7 +194,8 @@ class AreaService:
         return best_match if best_score > 0.3 else None
 
 
-    def _calculate_match_score(self, query: str, area: Area) -> float:
+    @staticmethod
+    def _calculate_match_score(query: str, area: Area) -> float:
         """Calcula un score de coincidencia entre query y área"""
         score = 0.0
 
@@ -0,0 +1,51 @@
+from contextlib import contextmanager
+from typing import Iterator
+
+from src.shared.utils.metrics import metrics_registry
+from src.shared.utils.tracing import tracer
+
+
+# Etapas del pipeline de chat: client_lookup, history, db_write, config_load,
+# areas_load, prompt_build, llm, broadcast
+chat_stage_seconds = metrics_registry.histogram(
+    "prism_chat_stage_seconds",
+    "Duración de cada etapa del pipeline de chat",
+    labelnames=("stage",)
+)
+
+ws_message_seconds = metrics_registry.histogram(
+    "prism_ws_message_seconds",
+    "Duración del manejo de cada mensaje WebSocket por tipo",
+    labelnames=("type",)
+)
+
+ws_messages_total = metrics_registry.counter(
+    "prism_ws_messages_total",
+    "Mensajes WebSocket recibidos por tipo",
+    labelnames=("type",)
+)
+
+llm_call_seconds = metrics_registry.histogram(
+    "prism_llm_call_seconds",
+    "Duración de cada llamada al proveedor de IA (incluye reintentos)",
+    labelnames=("model", "outcome")
+)
+
+ai_requests_total = metrics_registry.counter(
+    "prism_ai_requests_total",
+    "Mensajes procesados por la IA según su origen (proveedor, compartida, cache, error, cancelada)",
+    labelnames=("origin",)
+)
+
+ai_tokens_total = metrics_registry.counter(
+    "prism_ai_tokens_total",
+    "Tokens consumidos por modelo y tipo (entrada, salida, cacheados)",
+    labelnames=("model", "kind")
+)
+
+
+@contextmanager
+def chat_stage(stage: str) -> Iterator[None]:
+    """Mide una etapa del pipeline de chat (histograma y span de la traza activa)"""
+    with chat_stage_seconds.time(stage=stage), tracer.span(f"stage.{stage}"):
+        yield
@@ -0,0 +1,28 @@
+"""
+Lecturas del pipeline de mensajes de cliente que no dependen de la
+conversación. Cada una usa su propia sesión del pool para poder correr
+en paralelo con el trabajo que ocupa la sesión de la conexión WebSocket.
+"""
+from typing import List
+
+from src.infrastructure.database.config import pooled_session
+from src.infrastructure.database.models import ConfiguracionIA, Area
+from src.modules.client.repositories import AreaRepository, ConfiguracionIARepository, build_repository
+from .configuracion_ia_service import ConfiguracionIAService
+from .chat_metrics import chat_stage
+
+
+
+async def load_ai_config() -> ConfiguracionIA:
+    """Obtiene la configuración de la IA en una sesión independiente"""
+    with chat_stage("config_load"):
+        async with pooled_session() as session:
+            configuracion_service = ConfiguracionIAService(build_repository(ConfiguracionIARepository, session))
+            return await configuracion_service.get_config_for_ai()
+
+
+async def load_derivation_areas() -> List[Area]:
+    """Obtiene las áreas de derivación en una sesión independiente"""
+    with chat_stage("areas_load"):
+        async with pooled_session() as session:
+            return await build_repository(AreaRepository, session).get_areas_for_derivation()
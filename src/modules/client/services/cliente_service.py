@@ -3,9 +3,11 @@ from typing import Optional
 from src.modules.client.repositories import ClienteRepository
 from src.infrastructure.database.models import Cliente
 from src.shared.utils.timing import now
+from src.shared.utils.tracing import tracer
 
 
 
+@tracer.traced_class
 class ClienteService:
     def __init__(self, cliente_repository: ClienteRepository):
         self.cliente_repository = cliente_repository
@@ -3,9 +3,12 @@ from datetime import datetime
 
 from src.modules.client.repositories import ConfiguracionIARepository
 from src.infrastructure.database.models import ConfiguracionIA
+from src.shared.settings.base import settings
+from src.shared.utils.tracing import tracer
 
 
 
+@tracer.traced_class
 class ConfiguracionIAService:
     def __init__(self, configuracion_repository: ConfiguracionIARepository):
         self.configuracion_repository = configuracion_repository
@@ -23,12 +26,12 @@ class ConfiguracionIAService:
 
 Debes ser profesional, amigable y eficiente. Responde preguntas generales sobre los servicios y deriva consultas específicas o técnicas al área correspondiente.
 
-Si necesitas derivar una consulta, incluye en tu respuesta: "🔄 DERIVAR: [nombre_del_área]"
+Si necesitas derivar una consulta, indícalo en el campo "derivar" junto con el ID del área.
 """,
                 "temperatura": 0.7,
                 "min_tokens": 50,
                 "max_tokens": 300,
-                "model": "gemini-pro",
+                "model": settings.ai_default_model,
                 "auto_derivacion_activa": True
             }
 
@@ -55,7 +58,7 @@ Si necesitas derivar una consulta, incluye en tu respuesta: "🔄 DERIVAR: [nomb
                 "temperatura": getattr(config, 'temperatura', 0.7),
                 "min_tokens": getattr(config, 'min_tokens', 50),
                 "max_tokens": getattr(config, 'max_tokens', 300),
-                "model": getattr(config, 'model', 'gemini-pro'),
+                "model": getattr(config, 'model', settings.ai_default_model),
                 "auto_derivacion_activa": getattr(config, 'auto_derivacion_activa', True),
                 "updated_at": getattr(config, 'updated_at', datetime.utcnow()).isoformat()
             }
@@ -68,12 +71,12 @@ Si necesitas derivar una consulta, incluye en tu respuesta: "🔄 DERIVAR: [nomb
 
 Debes ser profesional, amigable y eficiente. Responde preguntas generales sobre los servicios y deriva consultas específicas o técnicas al área correspondiente.
 
-Si necesitas derivar una consulta, incluye en tu respuesta: "🔄 DERIVAR: [nombre_del_área]"
+Si necesitas derivar una consulta, indícalo en el campo "derivar" junto con el ID del área.
 """,
                 "temperatura": 0.7,
                 "min_tokens": 50,
                 "max_tokens": 300,
-                "model": "gemini-pro",
+                "model": settings.ai_default_model,
                 "auto_derivacion_activa": True,
                 "updated_at": datetime.utcnow().isoformat()
             }
@@ -104,7 +107,7 @@ Si necesitas derivar una consulta, incluye en tu respuesta: "🔄 DERIVAR: [nomb
             "temperatura": config_data.get("temperatura", 0.7),
             "min_tokens": config_data.get("min_tokens", 50),
             "max_tokens": config_data.get("max_tokens", 300),
-            "model": config_data.get("model", "gemini-pro"),
+            "model": config_data.get("model", settings.ai_default_model),
             "auto_derivacion_activa": config_data.get("auto_derivacion_activa", True),
             "updated_at": update_timestamp.isoformat()
         }
@@ -142,12 +145,12 @@ Si necesitas derivar una consulta, incluye en tu respuesta: "🔄 DERIVAR: [nomb
 
 Debes ser profesional, amigable y eficiente. Responde preguntas generales sobre los servicios y deriva consultas específicas o técnicas al área correspondiente.
 
-Si necesitas derivar una consulta, incluye en tu respuesta: "🔄 DERIVAR: [nombre_del_área]"
+Si necesitas derivar una consulta, indícalo en el campo "derivar" junto con el ID del área.
 """,
             "temperatura": 0.7,
             "min_tokens": 50,
             "max_tokens": 300,
-            "model": "gemini-pro",
+            "model": settings.ai_default_model,
             "auto_derivacion_activa": True
         }
 
@@ -3,9 +3,11 @@ from typing import Optional, List, Tuple
 from src.modules.client.repositories import ConversacionRepository, ClienteRepository
 from src.infrastructure.database.models import Conversacion, EstadoConversacionEnum
 from src.shared.utils.timing import now
+from src.shared.utils.tracing import tracer
 
 
 
+@tracer.traced_class
 class ConversacionService:
     def __init__(
         self,
@@ -76,8 +78,27 @@ class ConversacionService:
         return conversation
 
 
+    async def close_conversation(self, conversation_id: int) -> Optional[Conversacion]:
+        """Finaliza una conversación"""
+
+        conversation = await self.conversacion_repository.update(conversation_id, {
+            "estado": EstadoConversacionEnum.FINALIZADA,
+            "updated_at": now()
+        })
+        await self.conversacion_repository.commit()
+
+        return conversation
+
+
     async def get_all_active_conversations(self) -> List[Conversacion]:
         """Obtiene todas las conversaciones activas para el panel admin"""
 
         return await self.conversacion_repository.get_all_active()
 
+
+    async def count_created_today(self) -> int:
+        """Conversaciones creadas desde el inicio del día (UTC)"""
+
+        start_of_day = now().replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+        return await self.conversacion_repository.count_created_since(start_of_day)
+
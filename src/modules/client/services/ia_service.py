@@ -1,15 +1,60 @@
+import asyncio
+import hashlib
 import os
-from typing import Optional, Dict, Any, List
+import time
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
 
 import google.generativeai as genai
+import msgspec
+from google.api_core import exceptions as google_exceptions
 from google.generativeai.types import GenerationConfig
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential
 
 from src.modules.client.repositories import AreaRepository
+from src.modules.client.schemas import AIDecision, AI_DECISION_RESPONSE_SCHEMA, decode_ai_decision
 from src.infrastructure.database.models import ConfiguracionIA, Area
 from src.shared.settings.base import settings
-
-
+from src.shared.utils.single_flight import SingleFlight
+from src.shared.utils.resilience import AdaptiveLimiter, CircuitBreaker
+from src.shared.utils.tracing import tracer
+from .ai_response_cache import ai_response_cache, to_client_placeholder, CLIENT_NAME_PLACEHOLDER
+from .ai_model_pool import ai_model_pool, CASCADE_INSTRUCTIONS
+from .area_ranker import area_ranker
+from .recent_message_buffer import RecentMessage
+from .ai_call_telemetry import ai_call_telemetry
+from .simulated_llm import simulated_llm
+from .chat_metrics import chat_stage, llm_call_seconds, ai_requests_total, ai_tokens_total
+
+
+
+def is_provider_overload(exc: BaseException) -> bool:
+    """Errores que indican proveedor saturado o degradado (429, 5xx, timeout)"""
+    return isinstance(exc, (
+        asyncio.TimeoutError,
+        google_exceptions.TooManyRequests,
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServerError
+    ))
+
+
+# Estado compartido por todas las conexiones del worker
+ai_single_flight = SingleFlight()
+ai_limiter = AdaptiveLimiter(
+    initial_limit=settings.ai_max_concurrency,
+    min_limit=1,
+    max_limit=settings.ai_max_concurrency,
+    latency_target=settings.ai_latency_target,
+    is_overload=is_provider_overload
+)
+ai_circuit_breaker = CircuitBreaker(
+    failure_threshold=settings.ai_circuit_failure_threshold,
+    recovery_timeout=settings.ai_circuit_recovery_timeout
+)
+
+
+
+@tracer.traced_class
 class AIService:
     def __init__(self, area_repository: AreaRepository):
         self.area_repository = area_repository
@@ -24,19 +69,22 @@ class AIService:
             raise ValueError("GEMINI_API_KEY no encontrada en variables de entorno")
 
         genai.configure(api_key=api_key)
-        self.client = genai.GenerativeModel('gemini-2.0-flash')
-        print("✅ Cliente Gemini inicializado")
+        # Modelo por defecto; cada llamada usa el modelo de la configuración vía el pool
+        self.client = ai_model_pool.get(settings.ai_default_model)
 
 
     async def process_client_message(
         self,
         message: str,
         client_name: str,
-        conversation_history: List[Dict[str, str]] = None,
-        config: Optional[ConfiguracionIA] = None
+        conversation_history: List[RecentMessage] = None,
+        config: Optional[ConfiguracionIA] = None,
+        areas: Optional[List[Area]] = None,
+        conversation_id: Optional[int] = None
     ) -> Dict[str, Any]:
         """
-        Procesa un mensaje de cliente y determina si responder o derivar
+        Procesa un mensaje de cliente y determina si responder o derivar.
+        Cada llamada deja un registro de telemetría en ai_llamadas (en segundo plano)
 
         Returns:
         {
@@ -51,59 +99,106 @@ class AIService:
         if not self.client:
             raise ValueError("Cliente de IA no inicializado")
 
+        started = time.perf_counter()
+        telemetry: Dict[str, Any] = {"id_conversacion": conversation_id, "origen": "error"}
+
         try:
             # Obtener configuración por defecto si no se proporciona
             if not config:
                 config = await self._get_default_config()
 
-            # Obtener áreas activas para derivación
-            areas = await self.area_repository.get_areas_for_derivation()
-
-            # Construir el prompt del sistema
-            system_prompt = await self._build_system_prompt(config, areas)
-
-            # Construir el contexto de la conversación
-            conversation_context = self._build_conversation_context(
-                message, client_name, conversation_history or []
-            )
-
-            # Generar respuesta de la IA
-            full_prompt = f"{system_prompt}\n\n{conversation_context}"
+            # Obtener áreas activas para derivación (si el pipeline no las trajo ya)
+            if areas is None:
+                areas = await self.area_repository.get_areas_for_derivation()
+
+            # Prompt del sistema estable (instrucción de sistema, cacheable) y detalle
+            # de las áreas más relevantes para este turno
+            with chat_stage("prompt_build"):
+                system_prompt = await self._build_system_prompt(config, areas)
+                ranking_query = self._build_ranking_query(message, conversation_history or [])
+                area_details = self._build_area_details(areas, ranking_query)
+
+                # Historial como turnos con rol, más el mensaje actual
+                contents = self._build_conversation_contents(
+                    message, client_name, conversation_history or [], area_details
+                )
+
+            # Caché de respuestas: solo para mensajes sin contexto previo
+            cache_key = None
+            if ai_response_cache.enabled and not conversation_history:
+                cache_key = ai_response_cache.make_key(message, system_prompt + area_details, config)
+                cached_response = ai_response_cache.get(cache_key, client_name)
+                if cached_response:
+                    telemetry.update(origen="cache", confianza=cached_response["confidence"])
+                    self._record_telemetry(telemetry, started)
+                    return cached_response
+
+            # Modelo según la configuración, con cascada opcional a un modelo barato
+            model_name = ai_model_pool.resolve(getattr(config, 'model', None))
+            cascade_model = ai_model_pool.cascade_for(model_name, message)
 
             # Usar getattr para acceso seguro a las propiedades de configuración
             temperatura = getattr(config, 'temperatura', 0.7)
             max_tokens = getattr(config, 'max_tokens', 300)
 
+            # Salida estructurada: respuesta y decisión de derivación en un solo JSON
             generation_config = GenerationConfig(
                 temperature=temperatura,
                 max_output_tokens=max_tokens,
                 top_p=0.8,
-                top_k=40
+                top_k=40,
+                response_mime_type="application/json",
+                response_schema=AI_DECISION_RESPONSE_SCHEMA
             )
 
-            response = self.client.generate_content(
-                full_prompt,
-                generation_config=generation_config
+            # Llamadas idénticas concurrentes comparten una sola petición al proveedor
+            flight_key = self._single_flight_key(
+                system_prompt, contents, client_name,
+                conversation_history or [], generation_config, model_name, cascade_model
             )
+            with chat_stage("llm"):
+                decision, call_info = await self._generate_decision(
+                    system_prompt, contents, generation_config,
+                    client_name, flight_key, model_name, cascade_model
+                )
+            telemetry.update(call_info)
 
-            if not response.text:
-                raise ValueError("Respuesta vacía de la IA")
+            # Resolver la derivación indicada por el modelo contra las áreas activas
+            analysis = self._analyze_response_for_transfer(decision, areas)
 
-            # Analizar la respuesta para determinar derivación
-            analysis = await self._analyze_response_for_transfer(response.text, areas)
-
-            return {
+            result = {
                 "should_respond": True,
-                "response": response.text.strip(),
+                "response": decision.respuesta.strip(),
                 "should_transfer": analysis["should_transfer"],
                 "transfer_area": analysis["area"],
                 "confidence": analysis["confidence"],
                 "reasoning": analysis.get("reasoning", "")
             }
 
+            # Las respuestas que derivan no se cachean
+            if cache_key is not None:
+                ai_response_cache.set(cache_key, result, client_name)
+
+            telemetry.update(
+                confianza=decision.confianza,
+                derivar=analysis["should_transfer"],
+                id_area=analysis["area"].id if analysis["area"] else None
+            )
+            self._record_telemetry(telemetry, started)
+
+            return result
+
+        except asyncio.CancelledError:
+            telemetry["origen"] = "cancelada"
+            self._record_telemetry(telemetry, started)
+            raise
+
         except Exception as e:
             print(f"❌ Error procesando mensaje con IA: {str(e)}")
 
+            telemetry.update(origen="error", derivar=True, error=str(e)[:255])
+            self._record_telemetry(telemetry, started)
+
             # Respuesta de fallback
             return {
                 "should_respond": True,
@@ -115,8 +210,228 @@ class AIService:
             }
 
 
+    @tracer.traced()
+    async def _generate_decision(
+        self,
+        system_prompt: str,
+        contents: List[Dict[str, Any]],
+        generation_config: GenerationConfig,
+        client_name: str,
+        flight_key: Optional[str],
+        model_name: str,
+        cascade_model: Optional[str]
+    ) -> Tuple[AIDecision, Dict[str, Any]]:
+        """
+        Llama al proveedor, fusionando la llamada con otra idéntica en vuelo si la hay.
+        Retorna la decisión y los datos de la llamada (modelo que respondió, tokens)
+        """
+
+        leader = False
+
+        async def call_provider() -> Tuple[AIDecision, Dict[str, Any], Optional[str]]:
+            nonlocal leader
+            leader = True
+            decision = None
+            call_info = {"modelo": model_name, "escalado": False}
+
+            # Cascada: el modelo barato responde salvo que reporte baja confianza
+            if cascade_model:
+                decision, usage = await self._call_model(
+                    cascade_model, f"{system_prompt}{CASCADE_INSTRUCTIONS}", contents, generation_config
+                )
+                self._add_usage(call_info, usage)
+                escalated = ai_model_pool.should_escalate(decision)
+                ai_model_pool.record_cascade(escalated)
+                if escalated:
+                    print(f"⬆️ Escalando de {cascade_model} a {model_name} (confianza {decision.confianza:.2f})")
+                    call_info["escalado"] = True
+                    decision = None
+                else:
+                    call_info["modelo"] = cascade_model
+
+            if decision is None:
+                decision, usage = await self._call_model(model_name, system_prompt, contents, generation_config)
+                self._add_usage(call_info, usage)
+
+            # El nombre del cliente queda como marcador para quienes compartan la respuesta
+            # (None si no se puede separar del texto: entonces no se comparte)
+            shared_response = (
+                to_client_placeholder(decision.respuesta, client_name) if flight_key is not None else None
+            )
+            return decision, call_info, shared_response
+
+        if flight_key is None:
+            decision, call_info, _ = await call_provider()
+            return decision, {**call_info, "origen": "proveedor"}
+
+        decision, call_info, shared_response = await ai_single_flight.do(flight_key, call_provider)
+        if leader:
+            return decision, {**call_info, "origen": "proveedor"}
+
+        if shared_response is None:
+            # La respuesta del líder no se puede personalizar sin corromperla: llamada propia
+            decision, call_info, _ = await call_provider()
+            return decision, {**call_info, "origen": "proveedor"}
+
+        decision = msgspec.structs.replace(
+            decision, respuesta=shared_response.replace(CLIENT_NAME_PLACEHOLDER, client_name)
+        )
+        # Los tokens ya quedaron registrados en la llamada que se compartió
+        call_info = {"modelo": call_info["modelo"], "escalado": call_info["escalado"], "origen": "compartida"}
+        return decision, call_info
+
+
+    @tracer.traced()
+    async def _call_model(
+        self,
+        model_name: str,
+        system_instruction: str,
+        contents: List[Dict[str, Any]],
+        generation_config: GenerationConfig
+    ) -> Tuple[AIDecision, Dict[str, int]]:
+        """Llama a un modelo del pool y decodifica su salida estructurada; retorna también el uso de tokens"""
+
+        # El LLM simulado pasa igual por el limitador, los reintentos y el circuit breaker
+        if settings.ai_simulated:
+            model = simulated_llm
+        else:
+            model = await ai_model_pool.get_for_prompt(model_name, system_instruction)
+        ai_model_pool.record_call(model_name)
+
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self._call_provider_guarded(model, contents, generation_config)
+            outcome = "ok"
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            llm_call_seconds.observe(time.perf_counter() - started, model=model_name, outcome=outcome)
+
+        if not response.text:
+            raise ValueError("Respuesta vacía de la IA")
+
+        usage = getattr(response, "usage_metadata", None)
+        return decode_ai_decision(response.text), {
+            "tokens_entrada": getattr(usage, "prompt_token_count", 0) or 0,
+            "tokens_salida": getattr(usage, "candidates_token_count", 0) or 0,
+            "tokens_cacheados": getattr(usage, "cached_content_token_count", 0) or 0
+        }
+
+
+    @staticmethod
+    def _add_usage(call_info: Dict[str, Any], usage: Dict[str, int]) -> None:
+        for field, tokens in usage.items():
+            call_info[field] = call_info.get(field, 0) + tokens
+
+
+    @staticmethod
+    def _record_telemetry(telemetry: Dict[str, Any], started: float) -> None:
+        ai_call_telemetry.record(latencia_ms=int((time.perf_counter() - started) * 1000), **telemetry)
+
+        ai_requests_total.inc(origin=telemetry["origen"])
+        for kind in ("entrada", "salida", "cacheados"):
+            tokens = telemetry.get(f"tokens_{kind}")
+            if tokens:
+                ai_tokens_total.inc(tokens, model=telemetry.get("modelo", ""), kind=kind)
+
+
+    async def _call_provider_guarded(
+        self,
+        model: genai.GenerativeModel,
+        contents: List[Dict[str, Any]],
+        generation_config: GenerationConfig
+    ):
+        """
+        Llamada a Gemini protegida: circuit breaker, límite de concurrencia adaptativo,
+        timeout por intento, reintentos con jitter ante 429/5xx y deadline total
+        """
+
+        ai_circuit_breaker.check()
+
+        try:
+            response = await asyncio.wait_for(
+                self._call_provider_with_retries(model, contents, generation_config),
+                timeout=settings.ai_call_deadline
+            )
+        except Exception as e:
+            if is_provider_overload(e):
+                ai_circuit_breaker.record_failure()
+            raise
+
+        ai_circuit_breaker.record_success()
+        return response
+
+
+    async def _call_provider_with_retries(
+        self,
+        model: genai.GenerativeModel,
+        contents: List[Dict[str, Any]],
+        generation_config: GenerationConfig
+    ):
+        async for attempt in AsyncRetrying(
+            stop=stop_after_attempt(settings.ai_retry_attempts),
+            wait=wait_random_exponential(multiplier=0.5, max=4),
+            retry=retry_if_exception(is_provider_overload),
+            reraise=True
+        ):
+            with attempt:
+                async with ai_limiter.acquire():
+                    # Llamada asíncrona: no bloquea el event loop y puede cancelarse
+                    return await asyncio.wait_for(
+                        model.generate_content_async(
+                            contents,
+                            generation_config=generation_config
+                        ),
+                        timeout=settings.ai_call_timeout
+                    )
+
+
+    def _single_flight_key(
+        self,
+        system_prompt: str,
+        contents: List[Dict[str, Any]],
+        client_name: str,
+        history: List[RecentMessage],
+        generation_config: GenerationConfig,
+        model_name: str,
+        cascade_model: Optional[str]
+    ) -> Optional[str]:
+        """
+        Huella del prompt y de la configuración de generación según la política:
+        - off: nunca se fusiona
+        - exact: solo prompts idénticos (mismo cliente e historial)
+        - first_turn: además fusiona primeros mensajes idénticos de clientes distintos
+        """
+
+        policy = settings.ai_single_flight_policy
+        if policy == "off":
+            return None
+
+        conversation = msgspec.json.encode(contents).decode("utf-8")
+        if policy == "first_turn" and not history and client_name:
+            # Si el nombre no se puede separar del texto la clave queda exacta (solo ese cliente)
+            conversation = to_client_placeholder(conversation, client_name) or conversation
+
+        fingerprint = "|".join([
+            model_name,
+            cascade_model or "",
+            system_prompt,
+            conversation,
+            str(generation_config)
+        ])
+        return hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()
+
+
     async def _build_system_prompt(self, config: ConfiguracionIA, areas: List[Area]) -> str:
-        """Construye el prompt del sistema con instrucciones de áreas"""
+        """
+        Construye el prompt del sistema con instrucciones de áreas.
+
+        Es estable entre turnos (no depende del mensaje) para que el proveedor
+        pueda reutilizarlo como prefijo cacheado. Con un catálogo grande solo
+        lleva el índice de áreas; el detalle de las relevantes va en cada turno.
+        """
 
         # Acceso seguro al system_prompt
         base_prompt = getattr(config, 'system_prompt', None) or """
@@ -135,18 +450,13 @@ Información de la empresa:
 
         # Agregar instrucciones de derivación por áreas
         areas_instructions = "\n\nÁREAS DE DERIVACIÓN:\n"
-        for area in areas:
-            area_name = getattr(area, 'nombre', 'Área desconocida')
-            area_instructions = getattr(area, 'instrucciones', 'Sin instrucciones')
-            area_specialist = getattr(area, 'especialista_asignado', None)
-            area_time = getattr(area, 'tiempo_respuesta', None)
-
-            areas_instructions += f"\n🔹 {area_name}:\n"
-            areas_instructions += f"   Instrucciones: {area_instructions}\n"
-            if area_specialist:
-                areas_instructions += f"   Especialista: {area_specialist}\n"
-            if area_time:
-                areas_instructions += f"   Tiempo estimado: {area_time} minutos\n"
+        if area_ranker.prunes(areas):
+            for area in areas:
+                areas_instructions += f"🔸 [ID {area.id}] {getattr(area, 'nombre', 'Área desconocida')}\n"
+            areas_instructions += "\nJunto a cada mensaje del cliente se incluye el detalle de las áreas más relevantes.\n"
+        else:
+            for area in areas:
+                areas_instructions += self._format_area_details(area)
 
         # Instrucciones finales
         final_instructions = """
@@ -158,103 +468,130 @@ INSTRUCCIONES IMPORTANTES:
 4. Sé conciso pero completo en tus respuestas
 5. Siempre mantén un tono profesional y cordial
 
-FORMATO DE DERIVACIÓN:
-Si decides derivar, incluye en tu respuesta: "🔄 DERIVAR: [nombre_del_área]"
+FORMATO DE RESPUESTA:
+Responde siempre con un objeto JSON (ignora cualquier otro formato de derivación indicado arriba):
+- "respuesta": el texto para el cliente
+- "derivar": true solo si la consulta debe pasar a un especialista
+- "area_id": el ID del área elegida de la lista anterior, o null si no derivas
+- "confianza": número entre 0 y 1 con tu seguridad en la respuesta y la decisión
 """
 
         return base_prompt + areas_instructions + final_instructions
 
 
-    def _build_conversation_context(
+    def _format_area_details(self, area: Area) -> str:
+        """Bloque con el detalle completo de un área"""
+
+        area_name = getattr(area, 'nombre', 'Área desconocida')
+        area_instructions = getattr(area, 'instrucciones', 'Sin instrucciones')
+        area_specialist = getattr(area, 'especialista_asignado', None)
+        area_time = getattr(area, 'tiempo_respuesta', None)
+
+        details = f"\n🔹 [ID {area.id}] {area_name}:\n"
+        details += f"   Instrucciones: {area_instructions}\n"
+        if area_specialist:
+            details += f"   Especialista: {area_specialist}\n"
+        if area_time:
+            details += f"   Tiempo estimado: {area_time} minutos\n"
+        return details
+
+
+    def _build_area_details(self, areas: List[Area], query: str) -> str:
+        """Detalle de las áreas más relevantes para el turno; vacío si el prompt ya las trae todas"""
+
+        if not area_ranker.prunes(areas):
+            return ""
+
+        detailed_areas, _ = area_ranker.select(query, areas)
+        details = "ÁREAS MÁS RELEVANTES PARA ESTA CONSULTA:\n"
+        for area in detailed_areas:
+            details += self._format_area_details(area)
+        return details
+
+
+    def _build_ranking_query(self, message: str, history: List[RecentMessage]) -> str:
+        """Texto para rankear áreas: el mensaje actual más los últimos mensajes del cliente"""
+
+        recent_client_messages = [
+            msg.content for msg in history[-settings.ai_context_messages:] if msg.message_type == "cliente"
+        ]
+        return " ".join(recent_client_messages[-2:] + [message])
+
+
+    def _build_conversation_contents(
         self,
         current_message: str,
         client_name: str,
-        history: List[Dict[str, str]]
-    ) -> str:
-        """Construye el contexto de la conversación"""
+        history: List[RecentMessage],
+        area_details: str = ""
+    ) -> List[Dict[str, Any]]:
+        """
+        Construye los turnos de la conversación con su rol (user/model).
+
+        Los mensajes de especialistas y del sistema van del lado del modelo con
+        una etiqueta; turnos consecutivos del mismo rol se agrupan en uno.
+        """
+
+        contents: List[Dict[str, Any]] = []
 
-        context = f"CONVERSACIÓN CON {client_name}:\n\n"
+        def add_turn(role: str, text: str) -> None:
+            if contents and contents[-1]["role"] == role:
+                contents[-1]["parts"].append(text)
+            else:
+                contents.append({"role": role, "parts": [text]})
 
-        # Agregar historial si existe
-        if history:
-            context += "Historial previo:\n"
-            for msg in history[-5:]:  # Solo últimos 5 mensajes
-                sender = "Cliente" if msg.get("message_type") == "cliente" else "Asistente"
-                context += f"{sender}: {msg.get('content', '')}\n"
-            context += "\n"
+        for message_type, content, _ in history[-settings.ai_context_messages:]:
+            if message_type == "cliente":
+                add_turn("user", content)
+            elif message_type == "humano":
+                add_turn("model", f"[Especialista] {content}")
+            elif message_type == "sistema":
+                add_turn("model", f"[Sistema] {content}")
+            else:
+                add_turn("model", content)
 
-        # Agregar mensaje actual
-        context += f"Cliente: {current_message}\n\n"
-        context += "Respuesta del Asistente:"
+        # Mensaje actual, con el nombre del cliente y las áreas relevantes del turno
+        current_turn = f"[Cliente: {client_name}]\n"
+        if area_details:
+            current_turn += f"{area_details}\n"
+        add_turn("user", current_turn + current_message)
 
-        return context
+        return contents
 
 
-    async def _analyze_response_for_transfer(
+    def _analyze_response_for_transfer(
         self,
-        response: str,
+        decision: AIDecision,
         areas: List[Area]
     ) -> Dict[str, Any]:
-        """Analiza la respuesta para determinar si se debe derivar"""
+        """Traduce la decisión estructurada del modelo a una derivación concreta"""
 
-        response_lower = response.lower()
+        if not decision.derivar:
+            return {
+                "should_transfer": False,
+                "area": None,
+                "confidence": decision.confianza,
+                "reasoning": "La IA respondió directamente"
+            }
 
-        # Buscar indicador explícito de derivación
-        if "🔄 derivar:" in response_lower:
-            # Extraer el área mencionada
-            for area in areas:
-                area_name = getattr(area, 'nombre', '').lower()
-                if area_name and area_name in response_lower:
-                    return {
-                        "should_transfer": True,
-                        "area": area,
-                        "confidence": 0.9,
-                        "reasoning": "Derivación explícita solicitada por la IA"
-                    }
-
-        # Análisis por palabras clave de áreas
-        for area in areas:
-            area_instructions = getattr(area, 'instrucciones', '')
-            area_keywords = self._extract_keywords_from_instructions(area_instructions)
-            keyword_matches = sum(1 for keyword in area_keywords if keyword in response_lower)
-
-            if keyword_matches >= 2:  # Al menos 2 palabras clave coinciden
-                return {
-                    "should_transfer": True,
-                    "area": area,
-                    "confidence": min(0.8, keyword_matches * 0.2),
-                    "reasoning": f"Múltiples palabras clave detectadas: {keyword_matches}"
-                }
+        area = next((area for area in areas if area.id == decision.area_id), None)
+        if area is None:
+            # Área inexistente o inactiva: se informa, pero no hay área a la cual transferir
+            return {
+                "should_transfer": True,
+                "area": None,
+                "confidence": decision.confianza,
+                "reasoning": f"Derivación solicitada con área desconocida: {decision.area_id}"
+            }
 
         return {
-            "should_transfer": False,
-            "area": None,
-            "confidence": 0.1,
-            "reasoning": "No se detectaron criterios de derivación"
+            "should_transfer": True,
+            "area": area,
+            "confidence": decision.confianza,
+            "reasoning": "Derivación explícita solicitada por la IA"
         }
 
 
-    def _extract_keywords_from_instructions(self, instructions: str) -> List[str]:
-        """Extrae palabras clave de las instrucciones de un área"""
-
-        # Palabras clave comunes por área (esto se podría mejorar con NLP)
-        common_keywords = [
-            "declaracion", "renta", "impuesto", "contabilidad", "estados", "financieros",
-            "legal", "juridico", "contrato", "empresa", "constitucion", "sociedad",
-            "inversion", "financiero", "credito", "prestamo", "flujo", "caja",
-            "tributario", "fiscal", "iva", "retencion", "planeacion"
-        ]
-
-        instructions_lower = instructions.lower()
-        found_keywords = []
-
-        for keyword in common_keywords:
-            if keyword in instructions_lower:
-                found_keywords.append(keyword)
-
-        return found_keywords
-
-
     async def _get_default_config(self) -> ConfiguracionIA:
         """Obtiene la configuración por defecto de la IA"""
 
@@ -266,7 +603,7 @@ Si decides derivar, incluye en tu respuesta: "🔄 DERIVAR: [nombre_del_área]"
             temperatura=0.7,
             min_tokens=50,
             max_tokens=300,
-            model="gemini-pro",
+            model=settings.ai_default_model,
             auto_derivacion_activa=True,
             updated_at=datetime.utcnow()
         )
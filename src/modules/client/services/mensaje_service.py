@@ -3,9 +3,14 @@ from typing import List, Dict, Any
 from src.modules.client.repositories import MensajeRepository
 from src.infrastructure.database.models import Mensaje, TipoMensajeEnum
 from src.shared.utils.timing import now
+from src.shared.settings.base import settings
+from src.shared.utils.tracing import tracer
+from .recent_message_buffer import RecentMessage, recent_messages
+from .chat_metrics import chat_stage
 
 
 
+@tracer.traced_class
 class MensajeService:
     def __init__(self, mensaje_repository: MensajeRepository):
         self.mensaje_repository = mensaje_repository
@@ -32,8 +37,14 @@ class MensajeService:
         }
 
         # Crear mensaje sin acceder a propiedades que causen refresh
-        mensaje = await self.mensaje_repository.create(processed_data)
-        await self.mensaje_repository.commit()
+        with chat_stage("db_write"):
+            mensaje = await self.mensaje_repository.create(processed_data)
+            await self.mensaje_repository.commit()
+
+        # Mantener al día los mensajes recientes en memoria (solo tras confirmar)
+        recent_messages.append(processed_data["id_conversacion"], RecentMessage(
+            processed_data["tipo"].value, processed_data["contenido"], processed_data["remitente"]
+        ))
 
         return mensaje
 
@@ -50,6 +61,27 @@ class MensajeService:
         )
 
 
+    async def get_recent_context(self, conversation_id: int) -> List[RecentMessage]:
+        """
+        Últimos mensajes de la conversación para el contexto de la IA.
+
+        Se sirven desde memoria; solo se consulta la BD si la conversación no
+        está en el buffer (p.ej. tras un reinicio).
+        """
+
+        cached = recent_messages.get(conversation_id)
+        if cached is not None:
+            return cached
+
+        mensajes = await self.mensaje_repository.get_recent_by_conversation(
+            conversation_id, limit=settings.ai_context_messages
+        )
+        history = [RecentMessage(msg.tipo.value, msg.contenido, msg.remitente) for msg in mensajes]
+        recent_messages.load(conversation_id, history)
+
+        return history
+
+
     async def create_derivation_message(
         self,
         conversation_id: int,
@@ -0,0 +1,129 @@
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Iterable, List, NamedTuple, Optional
+
+from src.shared.settings.base import settings
+
+
+
+class RecentMessage(NamedTuple):
+    """Mensaje reciente en forma compacta (una tupla), suficiente para el contexto de la IA"""
+
+    message_type: str
+    content: str
+    sender: str
+
+
+
+class RecentMessageBuffer:
+    """
+    Últimos mensajes de cada conversación, en memoria.
+
+    Cada conversación tiene un ring buffer de tamaño fijo que se llena al
+    escribir mensajes, así que en régimen normal el contexto de la IA no
+    consulta la base de datos. Un buffer ausente (conversación nueva para este
+    worker, reinicio, desalojo) se reconstruye una vez desde la BD.
+
+    Las conversaciones se desalojan por LRU cuando el total de caracteres
+    guardados supera el máximo configurado.
+    """
+
+    def __init__(self, per_conversation: int, max_chars: int):
+        self.per_conversation = per_conversation
+        self.max_chars = max_chars
+        self._buffers: "OrderedDict[int, Deque[RecentMessage]]" = OrderedDict()
+        self._chars: Dict[int, int] = {}
+        self._total_chars = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+
+    def get(self, conversation_id: int) -> Optional[List[RecentMessage]]:
+        """Copia de los mensajes recientes (más antiguo primero), o None si no está en memoria"""
+
+        buffer = self._buffers.get(conversation_id)
+        if buffer is None:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        self._buffers.move_to_end(conversation_id)
+        return list(buffer)
+
+
+    def load(self, conversation_id: int, messages: Iterable[RecentMessage]) -> None:
+        """Reemplaza el buffer con mensajes leídos de la BD (más antiguo primero)"""
+
+        self.discard(conversation_id)
+
+        buffer: Deque[RecentMessage] = deque(maxlen=self.per_conversation)
+        self._buffers[conversation_id] = buffer
+        self._chars[conversation_id] = 0
+        for message in messages:
+            self._push(conversation_id, buffer, message)
+
+        self._evict()
+
+
+    def append(self, conversation_id: int, message: RecentMessage) -> None:
+        """
+        Agrega un mensaje recién guardado.
+
+        Si la conversación no está en memoria no se crea un buffer parcial: el
+        próximo get() será un miss y se cargará completo desde la BD.
+        """
+
+        buffer = self._buffers.get(conversation_id)
+        if buffer is None:
+            return
+
+        self._push(conversation_id, buffer, message)
+        self._buffers.move_to_end(conversation_id)
+        self._evict()
+
+
+    def discard(self, conversation_id: int) -> None:
+        if self._buffers.pop(conversation_id, None) is not None:
+            self._total_chars -= self._chars.pop(conversation_id)
+
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self._hits + self._misses
+        return {
+            "conversations": len(self._buffers),
+            "messages": sum(len(buffer) for buffer in self._buffers.values()),
+            "chars": self._total_chars,
+            "max_chars": self.max_chars,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / total, 4) if total else 0.0,
+            "evictions": self._evictions
+        }
+
+
+    def _push(self, conversation_id: int, buffer: Deque[RecentMessage], message: RecentMessage) -> None:
+        # El deque descarta el más antiguo al llenarse; descontar su tamaño
+        if len(buffer) == buffer.maxlen:
+            removed = len(buffer[0].content)
+            self._chars[conversation_id] -= removed
+            self._total_chars -= removed
+
+        buffer.append(message)
+        self._chars[conversation_id] += len(message.content)
+        self._total_chars += len(message.content)
+
+
+    def _evict(self) -> None:
+        # Nunca desalojar la conversación recién usada (la última del orden LRU)
+        while self._total_chars > self.max_chars and len(self._buffers) > 1:
+            conversation_id = next(iter(self._buffers))
+            self.discard(conversation_id)
+            self._evictions += 1
+
+
+
+# Singleton compartido por todas las conexiones del worker
+recent_messages = RecentMessageBuffer(
+    per_conversation=settings.ai_context_messages,
+    max_chars=settings.ai_context_buffer_max_chars
+)
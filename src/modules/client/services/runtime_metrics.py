@@ -0,0 +1,109 @@
+from typing import Dict, Optional
+
+from src.infrastructure.database.config import db_config
+from src.shared.utils.metrics import metrics_registry
+from .ai_task_registry import ai_task_registry
+from .ai_response_cache import ai_response_cache
+from .ai_model_pool import ai_model_pool
+from .ai_load_shedder import ai_load_shedder
+from .ai_call_telemetry import ai_call_telemetry
+from .recent_message_buffer import recent_messages
+from .ia_service import ai_single_flight, ai_limiter, ai_circuit_breaker
+
+
+_CIRCUIT_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+
+def _db_pool_usage() -> Optional[Dict[tuple, int]]:
+    """Uso del pool de conexiones del engine de la app (None si aún no existe)"""
+
+    engine = getattr(db_config, "engine_instance", None)
+    if engine is None:
+        return None
+
+    pool = engine.sync_engine.pool
+    usage = {}
+    for state in ("size", "checkedout", "checkedin", "overflow"):
+        reader = getattr(pool, state, None)
+        if callable(reader):
+            # overflow() es negativo mientras el pool no se llena
+            usage[(state,)] = max(reader(), 0)
+    return usage
+
+
+def register_runtime_metrics() -> None:
+    """Métricas leídas al exportar desde los contadores que ya llevan los singletons"""
+
+    registry = metrics_registry
+
+    # Cola de IA y limitador
+    registry.callback(
+        "prism_ai_tasks", "Tareas de IA por estado (in_flight, queued)",
+        lambda: {(state,): ai_task_registry.get_stats()[state] for state in ("in_flight", "queued")},
+        labelnames=("state",)
+    )
+    registry.callback(
+        "prism_ai_tasks_finished_total", "Tareas de IA terminadas por resultado",
+        lambda: {(state,): ai_task_registry.get_stats()[state] for state in ("completed", "failed", "cancelled")},
+        kind="counter", labelnames=("result",)
+    )
+    registry.callback(
+        "prism_ai_limiter", "Limitador adaptativo: límite actual, llamadas en curso y en espera",
+        lambda: {(field,): ai_limiter.get_stats()[field] for field in ("limit", "in_flight", "waiting")},
+        labelnames=("field",)
+    )
+    registry.callback(
+        "prism_ai_circuit_state", "Estado del circuit breaker (0 cerrado, 1 semiabierto, 2 abierto)",
+        lambda: _CIRCUIT_STATES.get(ai_circuit_breaker.state, -1)
+    )
+    registry.callback(
+        "prism_ai_shed_total", "Mensajes descartados por el control de admisión, por política",
+        lambda: {(policy,): count for policy, count in ai_load_shedder.get_stats()["shed_by_policy"].items()},
+        kind="counter", labelnames=("policy",)
+    )
+
+    # Cachés y deduplicación: hits/misses como contadores, el hit rate se calcula en Prometheus
+    registry.callback(
+        "prism_cache_lookups_total", "Consultas a cachés en memoria por caché y resultado",
+        lambda: {
+            ("ai_response", "hit"): ai_response_cache.get_stats()["hits"],
+            ("ai_response", "miss"): ai_response_cache.get_stats()["misses"],
+            ("recent_messages", "hit"): recent_messages.get_stats()["hits"],
+            ("recent_messages", "miss"): recent_messages.get_stats()["misses"],
+            ("context_cache", "hit"): ai_model_pool.get_stats()["context_cache_hits"],
+            ("context_cache", "miss"): ai_model_pool.get_stats()["context_cache_created"]
+        },
+        kind="counter", labelnames=("cache", "result")
+    )
+    registry.callback(
+        "prism_ai_single_flight_total", "Llamadas a la IA que ejecutaron (leader) o se sumaron a otra (merged)",
+        lambda: {(role,): ai_single_flight.get_stats()[role] for role in ("leaders", "merged")},
+        kind="counter", labelnames=("role",)
+    )
+    registry.callback(
+        "prism_recent_messages_chars", "Caracteres guardados en el buffer de mensajes recientes",
+        lambda: recent_messages.get_stats()["chars"]
+    )
+
+    # Telemetría
+    registry.callback(
+        "prism_ai_telemetry_buffered", "Registros de telemetría esperando ser escritos",
+        lambda: ai_call_telemetry.get_stats()["buffered"]
+    )
+    registry.callback(
+        "prism_ai_telemetry_dropped_total", "Registros de telemetría descartados",
+        lambda: ai_call_telemetry.get_stats()["dropped"],
+        kind="counter"
+    )
+
+    # Base de datos
+    registry.callback(
+        "prism_db_pool_connections", "Conexiones del pool de la BD por estado",
+        _db_pool_usage,
+        labelnames=("state",)
+    )
+
+
+
+register_runtime_metrics()
@@ -0,0 +1,189 @@
+import hashlib
+import os
+import re
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, IO, List, Optional
+
+import msgspec
+
+from src.shared.settings.base import settings
+
+
+Frame = Dict[str, Any]
+Scrubber = Callable[[Frame], Optional[Frame]]
+
+RECORDING_FORMAT_VERSION = 1
+
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_RUT = re.compile(r"\b\d{1,2}\.?\d{3}\.?\d{3}-[\dkK]\b")
+_PHONE = re.compile(r"\+?\d[\d\s-]{7,}\d")
+_TEXT_FIELDS = ("message", "content")
+
+
+
+def _pseudonym(value: Any) -> str:
+    return hashlib.sha1(str(value).encode("utf-8")).hexdigest()[:8]
+
+
+def scrub_pii(frame: Frame) -> Frame:
+    """
+    Scrubber por defecto: nombres a seudónimos estables (el mismo nombre da
+    siempre el mismo seudónimo), correos, RUT y teléfonos enmascarados en los
+    textos y adjuntos sin contenido. Conserva los largos aproximados, que son
+    los que importan para el rendimiento.
+    """
+
+    scrubbed = dict(frame)
+
+    if scrubbed.get("client_name"):
+        scrubbed["client_name"] = f"Cliente {_pseudonym(scrubbed['client_name'])}"
+
+    for field in _TEXT_FIELDS:
+        value = scrubbed.get(field)
+        if isinstance(value, str):
+            value = _EMAIL.sub("correo@ejemplo.cl", value)
+            value = _RUT.sub("11.111.111-1", value)
+            scrubbed[field] = _PHONE.sub("+56900000000", value)
+
+    if isinstance(scrubbed.get("files"), list):
+        scrubbed["files"] = [
+            {**file, "name": f"archivo-{_pseudonym(file.get('name'))}", "data": "x" * len(file.get("data") or "")}
+            if isinstance(file, dict) else file
+            for file in scrubbed["files"]
+        ]
+
+    return scrubbed
+
+
+
+class SessionRecorder:
+    """
+    Grabador opt-in de los frames entrantes del chat WebSocket.
+
+    Escribe NDJSON compacto, una línea por evento, con el tiempo en ms
+    relativo al inicio de la grabación para que el replayer pueda reproducir
+    la concurrencia real entre sesiones:
+
+        {"t":1532,"c":"conn-1","e":"open"}
+        {"t":1540,"c":"conn-1","f":{"type":"new_client_message",...}}
+        {"t":9032,"c":"conn-1","e":"close"}
+
+    Cada frame pasa por los scrubbers registrados antes de escribirse; un
+    scrubber que retorna None descarta el frame. Los archivos rotan al
+    superar max_bytes.
+    """
+
+    def __init__(self, enabled: bool, directory: str, max_bytes: int, scrub_default: bool = True):
+        self.enabled = enabled
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.scrubbers: List[Scrubber] = [scrub_pii] if scrub_default else []
+        self._encoder = msgspec.json.Encoder()
+        self._file: Optional[IO[bytes]] = None
+        self._path: Optional[str] = None
+        self._started = time.perf_counter()
+        self._written_bytes = 0
+        self._files = 0
+        self._frames = 0
+        self._dropped = 0
+
+
+    def add_scrubber(self, scrubber: Scrubber) -> None:
+        """Registra un hook de limpieza de PII (se aplican en orden de registro)"""
+        self.scrubbers.append(scrubber)
+
+
+    def open(self, connection_id: str) -> None:
+        if self.enabled:
+            self._write({"t": self._elapsed_ms(), "c": connection_id, "e": "open"})
+
+
+    def record(self, connection_id: str, frame: Frame) -> None:
+        if not self.enabled:
+            return
+
+        for scrubber in self.scrubbers:
+            frame = scrubber(frame)
+            if frame is None:
+                self._dropped += 1
+                return
+
+        self._frames += 1
+        self._write({"t": self._elapsed_ms(), "c": connection_id, "f": frame})
+
+
+    def close(self, connection_id: str) -> None:
+        if self.enabled:
+            self._write({"t": self._elapsed_ms(), "c": connection_id, "e": "close"})
+
+
+    async def stop(self) -> None:
+        """Cierra el archivo en curso (hook de cierre de la app)"""
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            print(f"🎙️ Grabación cerrada: {self._path} ({self._frames} frames)")
+
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "file": self._path,
+            "files": self._files,
+            "frames": self._frames,
+            "dropped": self._dropped,
+            "bytes": self._written_bytes
+        }
+
+
+    def _elapsed_ms(self) -> int:
+        return int((time.perf_counter() - self._started) * 1000)
+
+
+    def _write(self, event: Dict[str, Any]) -> None:
+        line = self._encoder.encode(event) + b"\n"
+
+        if self._file is None or self._written_bytes + len(line) > self.max_bytes:
+            self._rotate()
+
+        # Escritura con buffer del archivo: normalmente no toca el disco
+        self._file.write(line)
+        self._written_bytes += len(line)
+
+
+    def _rotate(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+        self._files += 1
+        self._path = os.path.join(self.directory, f"ws-{stamp}-{os.getpid()}-{self._files}.ndjson")
+        self._file = open(self._path, "wb", buffering=1024 * 1024)
+        self._written_bytes = 0
+
+        # Cabecera: el tiempo de cada archivo sigue relativo al mismo inicio
+        self._write_header()
+        print(f"🎙️ Grabando sesiones WebSocket en {self._path}")
+
+
+    def _write_header(self) -> None:
+        header = self._encoder.encode({
+            "v": RECORDING_FORMAT_VERSION,
+            "started_at": datetime.utcnow().isoformat(),
+            "t": self._elapsed_ms()
+        }) + b"\n"
+        self._file.write(header)
+        self._written_bytes += len(header)
+
+
+
+# Singleton del worker; apagado salvo WS_RECORDING_ENABLED=true
+session_recorder = SessionRecorder(
+    enabled=settings.ws_recording_enabled,
+    directory=settings.ws_recording_dir,
+    max_bytes=settings.ws_recording_max_bytes,
+    scrub_default=settings.ws_recording_scrub_pii
+)
@@ -0,0 +1,64 @@
+import asyncio
+import json
+import math
+import random
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from src.shared.settings.base import settings
+
+
+_REPLIES = (
+    "Gracias por escribirnos. Con gusto te ayudo con tu consulta.",
+    "Entiendo tu situación. Te cuento cómo funciona nuestro servicio.",
+    "Buena pregunta. Para eso necesitamos revisar algunos antecedentes.",
+    "Podemos ayudarte con eso. Te explico los pasos a seguir."
+)
+
+
+
+class SimulatedLLM:
+    """
+    Modelo falso con la misma interfaz que GenerativeModel.generate_content_async.
+
+    Permite correr pruebas de carga sin red ni cuota de Gemini: espera una
+    latencia log-normal (mediana latency_ms) y responde una decisión JSON
+    válida con uso de tokens estimado (~4 caracteres por token).
+    """
+
+    def __init__(self, latency_ms: float, latency_sigma: float, seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self._random = random.Random(seed)
+        self._calls = 0
+
+
+    async def generate_content_async(self, contents: List[Dict[str, Any]], generation_config: Any = None):
+        self._calls += 1
+        latency = self.latency_ms * math.exp(self._random.gauss(0, self.latency_sigma)) / 1000
+        await asyncio.sleep(latency)
+
+        reply = self._random.choice(_REPLIES)
+        prompt_chars = sum(len(str(part)) for turn in contents for part in turn.get("parts", []))
+        text = json.dumps({"respuesta": reply, "derivar": False, "area_id": None, "confianza": 0.9})
+
+        return SimpleNamespace(
+            text=text,
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=prompt_chars // 4,
+                candidates_token_count=len(reply) // 4,
+                cached_content_token_count=0
+            )
+        )
+
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"calls": self._calls, "latency_ms": self.latency_ms, "latency_sigma": self.latency_sigma}
+
+
+
+# Solo se usa con AI_SIMULATED=true
+simulated_llm = SimulatedLLM(
+    latency_ms=settings.ai_simulated_latency_ms,
+    latency_sigma=settings.ai_simulated_latency_sigma
+)
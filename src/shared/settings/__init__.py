@@ -2,7 +2,10 @@ from .base import settings
 from .constants import ROOT_PATH
 from .templates import template_config
 from .templates import static_files
+from .templates import asset_manifest
+from .templates import precompile_templates
 from .logging import logging_config
+from .compression import compression_config
 
 
 __all__ = [
@@ -10,5 +13,8 @@ __all__ = [
     "settings",
     "template_config",
     "static_files",
-    "logging_config"
+    "asset_manifest",
+    "precompile_templates",
+    "logging_config",
+    "compression_config"
 ]
@@ -16,9 +16,79 @@ class Settings(BaseSettings):
     db_user: str = Field(description="Database username")
     db_password: str = Field(description="Database password")
     db_name: str = Field(description="Database name")
+    repository_backend: str = Field(default="sql", description="Backend de los repositorios: sql | memory (sin base, para demos y benchmarks)")
 
     gemini_api_key: str = Field(description="Gemini API Key")
 
+    # IA
+    ai_default_model: str = Field(default="gemini-2.0-flash", description="Modelo cuando la configuración no indica uno válido")
+    ai_cascade_model: str = Field(default="", description="Modelo barato a probar primero (vacío = sin cascada)")
+    ai_cascade_max_chars: int = Field(default=280, description="Largo máximo del mensaje para usar la cascada")
+    ai_cascade_min_confidence: float = Field(default=0.5, description="Confianza mínima del modelo barato para no escalar")
+    ai_context_cache_enabled: bool = Field(default=True, description="Usar la caché de contexto de Gemini para el prompt del sistema")
+    ai_context_cache_min_chars: int = Field(default=16000, description="Largo mínimo del prompt del sistema para cachearlo (mínimo de tokens del proveedor)")
+    ai_context_cache_ttl: int = Field(default=3600, description="Vigencia de cada caché de contexto en el proveedor (segundos)")
+    ai_prompt_areas_top_k: int = Field(default=4, description="Áreas con detalle completo en el prompt; el resto va como índice (0 = todas)")
+    ai_context_messages: int = Field(default=5, description="Mensajes previos que recibe la IA como contexto")
+    ai_context_buffer_max_chars: int = Field(
+        default=20_000_000,
+        description="Caracteres máximos en memoria para los mensajes recientes de todas las conversaciones"
+    )
+    ai_max_concurrency: int = Field(default=8, description="Máximo de generaciones de IA simultáneas por worker")
+    ai_response_cache_enabled: bool = Field(default=False, description="Cachear respuestas de IA a mensajes sin historial")
+    ai_response_cache_maxsize: int = Field(default=1024, description="Entradas máximas de la caché de respuestas")
+    ai_response_cache_ttl: int = Field(default=3600, description="Vigencia de la caché de respuestas en segundos")
+    ai_single_flight_policy: str = Field(
+        default="first_turn",
+        description="Qué llamadas idénticas concurrentes se fusionan: off | exact | first_turn"
+    )
+    ai_call_timeout: float = Field(default=20.0, description="Timeout por intento de llamada a Gemini (segundos)")
+    ai_call_deadline: float = Field(default=30.0, description="Deadline total de la llamada incluyendo reintentos (segundos)")
+    ai_retry_attempts: int = Field(default=3, description="Intentos máximos ante 429/5xx/timeout")
+    ai_latency_target: float = Field(default=8.0, description="Latencia objetivo del limitador adaptativo (segundos)")
+    ai_circuit_failure_threshold: int = Field(default=5, description="Fallos consecutivos para abrir el circuito")
+    ai_circuit_recovery_timeout: float = Field(default=30.0, description="Segundos con el circuito abierto antes de probar de nuevo")
+    ai_shed_policy: str = Field(default="busy", description="Política ante cola de IA saturada: off | transfer | busy")
+    ai_shed_max_wait: float = Field(default=15.0, description="Espera estimada máxima antes de aplicar la política (segundos)")
+    ai_simulated: bool = Field(default=False, description="Responder con un LLM simulado, sin llamar a Gemini (pruebas de carga)")
+    ai_simulated_latency_ms: float = Field(default=1200.0, description="Latencia mediana del LLM simulado (ms)")
+    ai_simulated_latency_sigma: float = Field(default=0.35, description="Dispersión log-normal de la latencia del LLM simulado")
+    ai_telemetry_enabled: bool = Field(default=True, description="Registrar cada llamada a la IA en ai_llamadas")
+    ai_telemetry_batch_size: int = Field(default=200, description="Registros por lote de escritura de telemetría")
+    ai_telemetry_flush_interval: float = Field(default=5.0, description="Segundos máximos entre escrituras de telemetría")
+    ai_telemetry_max_buffer: int = Field(default=10000, description="Registros máximos en memoria antes de descartar")
+
+    # Plantillas
+    templates_bytecode_cache_dir: str = Field(
+        default=".cache/jinja",
+        description="Directorio de la caché de bytecode de Jinja, compartido por los workers (vacío = sin caché)"
+    )
+
+    # Respuestas condicionales (ETag)
+    area_cache_ttl: float = Field(
+        default=30.0,
+        description="Segundos máximos que un worker puede servir áreas desactualizadas tras una escritura en otro (0 = sin límite)"
+    )
+
+    # Compresión de respuestas HTTP
+    compression_enabled: bool = Field(default=True, description="Comprimir respuestas HTML/JSON según Accept-Encoding")
+    compression_minimum_size: int = Field(default=1024, description="Bytes mínimos de una respuesta para comprimirla")
+    compression_gzip_level: int = Field(default=6, description="Nivel de gzip para respuestas dinámicas (1-9)")
+    compression_brotli_quality: int = Field(default=5, description="Calidad de brotli para respuestas dinámicas (0-11)")
+
+    # Observabilidad
+    tracing_enabled: bool = Field(default=True, description="Trazar cada mensaje WebSocket en memoria")
+    tracing_recent_size: int = Field(default=200, description="Trazas recientes que se conservan")
+    tracing_slowest_size: int = Field(default=20, description="Trazas más lentas que se conservan")
+    tracing_max_spans: int = Field(default=500, description="Spans máximos por traza")
+    ws_recording_enabled: bool = Field(default=False, description="Grabar los frames WebSocket entrantes para replay")
+    ws_recording_dir: str = Field(default="recordings", description="Directorio de las grabaciones NDJSON")
+    ws_recording_max_bytes: int = Field(default=100_000_000, description="Tamaño máximo de cada archivo de grabación")
+    ws_recording_scrub_pii: bool = Field(default=True, description="Aplicar el scrubber de PII por defecto a lo grabado")
+    db_monitor_enabled: bool = Field(default=True, description="Contar y medir las consultas SQL por request/mensaje")
+    db_slow_query_ms: float = Field(default=200.0, description="Milisegundos a partir de los cuales una consulta se registra como lenta")
+    db_n_plus_one_threshold: int = Field(default=5, description="Repeticiones de la misma consulta en una unidad de trabajo para marcar N+1")
+
     @property
     def url_db(self) -> str:
         """Construye la URL de conexión MySQL."""
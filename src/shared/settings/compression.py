@@ -0,0 +1,22 @@
+from importlib.util import find_spec
+
+from litestar.config.compression import CompressionConfig
+
+from .base import settings
+
+
+
+# Brotli es opcional: sin el paquete se comprime con gzip
+compression_backend = "brotli" if find_spec("brotli") else "gzip"
+
+
+# Compresión de respuestas dinámicas (HTML de las páginas, JSON de la API).
+# Los estáticos se excluyen: ya se sirven con variantes precomprimidas.
+compression_config = CompressionConfig(
+    backend=compression_backend,
+    minimum_size=settings.compression_minimum_size,
+    gzip_compress_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
+    brotli_gzip_fallback=True,
+    exclude=["^/static", "^/metrics"]
+) if settings.compression_enabled else None
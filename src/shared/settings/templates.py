@@ -1,13 +1,13 @@
 import os
-from datetime import datetime, timezone
+import time
 from typing import Any, Callable, Dict
 
-from litestar.static_files import create_static_files_router
-
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 from litestar.template.config import TemplateConfig
 from litestar.contrib.jinja import JinjaTemplateEngine
-from litestar.static_files import create_static_files_router
 
+from src.shared.utils.static_assets import AssetManifest, create_static_assets_router
+from .base import settings
 from .constants import ROOT_PATH
 
 
@@ -29,27 +29,56 @@ def configure_template_engine(engine: JinjaTemplateEngine) -> None:
 
 
 def static_version(ctx, file_path) -> str:
-    # Implementación para obtener la versión estática del archivo (Ej. fecha de modificación)
+    # URL con la huella de contenido del archivo (búsqueda en el manifest, sin tocar el disco)
+    return asset_manifest.url_for(file_path)
+
+
+# Manifest de estáticos (se construye en el arranque de la app)
+asset_manifest = AssetManifest(ROOT_PATH / "static", url_prefix="/static")
+
+
+def create_template_environment() -> Environment:
+    """
+    Entorno de Jinja con caché de bytecode en disco (compartida por los workers)
+    y sin auto_reload en producción, donde las plantillas no cambian sin deploy
+    """
+    bytecode_cache = None
+    if settings.templates_bytecode_cache_dir:
+        cache_dir = ROOT_PATH / settings.templates_bytecode_cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(str(cache_dir))
+
+    return Environment(
+        loader=FileSystemLoader(ROOT_PATH / "templates"),
+        autoescape=True,
+        auto_reload=settings.environment != "production",
+        bytecode_cache=bytecode_cache,
+        # Todas las plantillas caben: ninguna se recompila por desalojo
+        cache_size=-1
+    )
 
-    full_path = ROOT_PATH / "static" / file_path.lstrip("/")
 
-    if full_path.exists():
-        modified_time = os.path.getmtime(full_path)
-        version = datetime.fromtimestamp(modified_time, tz=timezone.utc).strftime('%Y%m%d%H%M%S')
-        return f"static/{file_path}?v={version}"
-    return f"static/{file_path}"
+template_environment = create_template_environment()
+
+
+def precompile_templates() -> None:
+    """Compila todas las plantillas al arrancar para que ningún request pague la compilación"""
+
+    started = time.perf_counter()
+    names = template_environment.list_templates(extensions=["html"])
+    for name in names:
+        template_environment.get_template(name)
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"🧩 {len(names)} plantillas precompiladas en {elapsed_ms:.0f} ms")
 
 
 # Configuración de templates
 template_config = TemplateConfig(
-    directory = ROOT_PATH / "templates",
-    engine = JinjaTemplateEngine,
+    engine = JinjaTemplateEngine.from_environment(template_environment),
     engine_callback=configure_template_engine,
 )
 
 
 # Configuración de static files
-static_files = create_static_files_router(
-    path = "/static",
-    directories = [ROOT_PATH / "static"]
-)
+static_files = create_static_assets_router(asset_manifest, path="/static")
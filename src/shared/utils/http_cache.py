@@ -0,0 +1,113 @@
+"""
+Respuestas condicionales (ETag / If-None-Match) con cuerpos ya codificados.
+
+VersionedBodyCache mantiene un contador de versión por conjunto de datos: el
+ETag de cada recurso sale de esa versión, así que un If-None-Match vigente se
+responde con 304 sin consultar la BD ni serializar nada. El 200 se sirve con
+el cuerpo codificado la primera vez y guardado para los siguientes. Cualquier
+escritura llama a bump() y todo queda invalidado.
+
+La versión es por proceso: con varios workers, una escritura solo invalida el
+worker que la atendió. Por eso el ETag también cambia cada `ttl` segundos,
+lo que acota a ese tiempo lo desactualizado que puede quedar otro worker.
+"""
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from litestar.response import Response
+from litestar.status_codes import HTTP_304_NOT_MODIFIED
+
+from src.shared.utils.metrics import metrics_registry
+
+
+http_cache_responses_total = metrics_registry.counter(
+    "prism_http_cache_responses_total",
+    "Respuestas de recursos con ETag por resultado (not_modified, hit, miss)",
+    labelnames=("cache", "result")
+)
+
+# Distingue procesos y reinicios: un ETag de otro worker nunca coincide por accidente
+_PROCESS_TAG = f"{os.getpid():x}{int(time.time()):x}"
+
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Si alguno de los ETags de If-None-Match (débiles o fuertes) es `etag`"""
+
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {candidate.strip().removeprefix("W/").strip('"') for candidate in if_none_match.split(",")}
+    return etag in candidates
+
+
+
+class VersionedBodyCache:
+    """ETags por versión y cuerpos codificados de los recursos de un conjunto de datos"""
+
+    def __init__(self, name: str, ttl: float = 0):
+        self.name = name
+        self.ttl = ttl
+        self.version = 0
+        self._bodies: Dict[str, Tuple[str, bytes]] = {}
+        self._not_modified = 0
+        self._hits = 0
+        self._misses = 0
+
+
+    def bump(self) -> None:
+        """Invalida todos los recursos (llamar después de cada escritura confirmada)"""
+        self.version += 1
+        self._bodies.clear()
+
+
+    def etag(self, key: str) -> str:
+        epoch = int(time.time() // self.ttl) if self.ttl > 0 else 0
+        return f"{self.name}-{_PROCESS_TAG}-{self.version}-{epoch}-{key}"
+
+
+    async def respond(
+        self,
+        key: str,
+        if_none_match: Optional[str],
+        build: Callable[[], Awaitable[bytes]],
+        media_type: str = "application/json"
+    ) -> Response:
+        """304 si el cliente tiene la versión vigente; si no, el cuerpo guardado o recién construido"""
+
+        etag = self.etag(key)
+        # Débil: la capa de compresión puede servir el mismo cuerpo con otro encoding
+        headers = {"ETag": f'W/"{etag}"', "Cache-Control": "no-cache"}
+
+        if etag_matches(if_none_match, etag):
+            self._not_modified += 1
+            http_cache_responses_total.inc(cache=self.name, result="not_modified")
+            return Response(content=b"", status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+
+        cached = self._bodies.get(key)
+        if cached is not None and cached[0] == etag:
+            self._hits += 1
+            http_cache_responses_total.inc(cache=self.name, result="hit")
+            return Response(content=cached[1], media_type=media_type, headers=headers)
+
+        self._misses += 1
+        http_cache_responses_total.inc(cache=self.name, result="miss")
+        body = await build()
+
+        # Si hubo una escritura mientras se construía, este cuerpo ya no es la versión vigente
+        if self.etag(key) == etag:
+            self._bodies[key] = (etag, body)
+            return Response(content=body, media_type=media_type, headers=headers)
+        return Response(content=body, media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "cached_bodies": len(self._bodies),
+            "not_modified": self._not_modified,
+            "hits": self._hits,
+            "misses": self._misses
+        }
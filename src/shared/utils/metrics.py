@@ -0,0 +1,228 @@
+import math
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+
+# Buckets en segundos: del milisegundo (BD, broadcast) a decenas de segundos (LLM)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+CallbackResult = Union[float, int, Dict[LabelValues, Union[float, int]]]
+
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+
+class Counter:
+    """Contador monotónico con etiquetas opcionales"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+
+    def samples(self) -> Iterator[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+
+class Histogram:
+    """
+    Histograma de buckets fijos (formato Prometheus).
+
+    observe() es una búsqueda binaria y un par de sumas: apto para el camino
+    caliente. Los buckets se acumulan recién al exportar.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # etiquetas → [conteo por bucket (+Inf al final), suma, cantidad]
+        self._series: Dict[LabelValues, List[Any]] = {}
+
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        series = self._series.get(key)
+        if series is None:
+            series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            self._series[key] = series
+
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Mide la duración del bloque (también si termina con excepción)"""
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+
+    def mean(self, **labels: Any) -> Optional[float]:
+        """Promedio observado para las etiquetas dadas, o None si no hay datos"""
+
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        series = self._series.get(key)
+        if not series or not series[2]:
+            return None
+        return series[1] / series[2]
+
+
+    def samples(self) -> Iterator[str]:
+        for key, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+
+class CallbackMetric:
+    """Métrica cuyo valor se lee al exportar (profundidad de colas, tamaño de pools, etc.)"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], CallbackResult],
+        kind: str = "gauge",
+        labelnames: Sequence[str] = ()
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+
+
+    def samples(self) -> Iterator[str]:
+        value = self.callback()
+        if value is None:
+            return
+
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if item is not None:
+                    yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(item)}"
+        else:
+            yield f"{self.name} {_format_value(value)}"
+
+
+
+class MetricsRegistry:
+    """Registro de métricas del proceso, exportable en formato de texto de Prometheus"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Union[Counter, Histogram, CallbackMetric]] = {}
+
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+
+    def callback(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], CallbackResult],
+        kind: str = "gauge",
+        labelnames: Sequence[str] = ()
+    ) -> CallbackMetric:
+        return self._register(CallbackMetric(name, documentation, callback, kind, labelnames))
+
+
+    def get(self, name: str) -> Optional[Union[Counter, Histogram, CallbackMetric]]:
+        return self._metrics.get(name)
+
+
+    def render(self) -> str:
+        """Exporta todas las métricas (text/plain; version=0.0.4)"""
+
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            try:
+                samples = list(metric.samples())
+            except Exception as e:
+                # Un colector roto no debe tumbar todo el endpoint
+                print(f"⚠️ Error leyendo métrica {metric.name}: {str(e)}")
+                continue
+
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(samples)
+
+        return "\n".join(lines) + "\n"
+
+
+    def _register(self, metric):
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            # Registrar dos veces el mismo nombre devuelve la métrica ya creada
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+
+
+# Registro único del proceso
+metrics_registry = MetricsRegistry()
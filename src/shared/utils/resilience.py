@@ -0,0 +1,220 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict
+
+
+
+class CircuitOpenError(Exception):
+    """El circuito está abierto: el proveedor se considera degradado"""
+
+
+
+class AdaptiveLimiter:
+    """
+    Limitador de concurrencia AIMD (additive increase, multiplicative decrease).
+
+    El límite crece de a poco mientras las llamadas terminan bien y por debajo
+    de la latencia objetivo, y se reduce a la mitad (por defecto) cuando una
+    llamada se pasa de la latencia objetivo o falla por sobrecarga (429/5xx).
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        latency_target: float,
+        is_overload: Callable[[BaseException], bool],
+        decrease_factor: float = 0.5
+    ):
+        self._limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self._is_overload = is_overload
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._increases = 0
+        self._decreases = 0
+        self._latency_ewma = None
+
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        """Ocupa un slot mientras dura el bloque y ajusta el límite según el resultado"""
+
+        await self._wait_for_slot()
+        started = time.monotonic()
+        overloaded = False
+        cancelled = False
+
+        try:
+            yield
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        except Exception as exc:
+            overloaded = self._is_overload(exc)
+            raise
+        finally:
+            self._release(time.monotonic() - started, overloaded, adjust=not cancelled)
+
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "waiting": self.waiting,
+            "latency_ewma": round(self._latency_ewma, 3) if self._latency_ewma is not None else None,
+            "increases": self._increases,
+            "decreases": self._decreases
+        }
+
+
+    async def _wait_for_slot(self) -> None:
+        while self._in_flight >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Si nos despertaron y luego nos cancelaron, ceder el turno
+                if waiter.done() and not waiter.cancelled():
+                    self._wake_waiters()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+        self._in_flight += 1
+
+
+    def _release(self, latency: float, overloaded: bool, adjust: bool = True) -> None:
+        self._in_flight -= 1
+
+        if not adjust:
+            # Una llamada cancelada no dice nada sobre la salud del proveedor
+            self._wake_waiters()
+            return
+
+        # Latencia típica observada (EWMA), útil para estimar esperas en cola
+        if self._latency_ewma is None:
+            self._latency_ewma = latency
+        else:
+            self._latency_ewma = 0.8 * self._latency_ewma + 0.2 * latency
+
+        if overloaded or latency > self.latency_target:
+            self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+            self._decreases += 1
+        else:
+            # +1 por "ventana" completa de llamadas exitosas
+            self._limit = min(float(self.max_limit), self._limit + 1.0 / max(self._limit, 1.0))
+            self._increases += 1
+
+        self._wake_waiters()
+
+
+    def _wake_waiters(self) -> None:
+        free_slots = self.limit - self._in_flight
+        for waiter in self._waiters:
+            if free_slots <= 0:
+                break
+            if not waiter.done():
+                waiter.set_result(None)
+                free_slots -= 1
+
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker clásico: cerrado → abierto tras N fallos consecutivos,
+    y semiabierto tras el tiempo de recuperación para dejar pasar una prueba.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, recovery_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at = None
+        self._times_opened = 0
+        self._short_circuited = 0
+
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_started_at = None
+        return self._state
+
+
+    def allow(self) -> bool:
+        """Indica si se puede llamar al proveedor"""
+
+        state = self.state
+        if state == self.CLOSED:
+            return True
+
+        # Una sola prueba a la vez; si la prueba nunca reporta (p.ej. se canceló),
+        # se permite otra pasado el tiempo de recuperación
+        now = time.monotonic()
+        if state == self.HALF_OPEN and (
+            self._probe_started_at is None or now - self._probe_started_at >= self.recovery_timeout
+        ):
+            self._probe_started_at = now
+            return True
+
+        self._short_circuited += 1
+        return False
+
+
+    def check(self) -> None:
+        """Como allow(), pero lanza CircuitOpenError si el circuito no deja pasar"""
+        if not self.allow():
+            raise CircuitOpenError("Proveedor de IA degradado, circuito abierto")
+
+
+    def record_success(self) -> None:
+        self._state = self.CLOSED
+        self._failures = 0
+        self._probe_started_at = None
+
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probe_started_at = None
+
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                self._times_opened += 1
+                print(f"⚡ Circuito de IA abierto tras {self._failures} fallo(s)")
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "times_opened": self._times_opened,
+            "short_circuited": self._short_circuited
+        }
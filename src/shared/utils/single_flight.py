@@ -0,0 +1,63 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+
+T = TypeVar("T")
+
+
+
+class SingleFlight:
+    """
+    Deduplica llamadas asíncronas concurrentes con la misma clave.
+
+    La primera llamada ejecuta la corrutina; las que llegan mientras sigue en
+    vuelo esperan el mismo resultado (o la misma excepción). Si todos los que
+    esperan se cancelan, la llamada compartida también se cancela.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self._leaders = 0
+        self._merged = 0
+
+
+    async def do(self, key: Hashable, coro_factory: Callable[[], Awaitable[T]]) -> T:
+        """Ejecuta coro_factory o se suma a la llamada en vuelo con la misma clave"""
+
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.create_task(coro_factory())
+            self._calls[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda _: self._forget(key, task))
+            self._leaders += 1
+        else:
+            self._merged += 1
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # Solo cancelar la llamada compartida si nadie más la espera
+            if self._calls.get(key) is task:
+                self._waiters[key] -= 1
+                if self._waiters[key] <= 0:
+                    task.cancel()
+            raise
+
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self._leaders + self._merged
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self._leaders,
+            "merged": self._merged,
+            "merge_rate": round(self._merged / total, 4) if total else 0.0
+        }
+
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+            self._waiters.pop(key, None)
@@ -0,0 +1,244 @@
+"""
+Manifest de los archivos estáticos con huellas de contenido.
+
+Al arrancar se recorre el directorio de estáticos una sola vez y se calcula
+el hash de cada archivo. Las plantillas piden la URL con huella
+(/static/js/chat-websocket.3f9a1c0b2d4e.js) con una búsqueda en un dict, y
+esa URL se sirve como inmutable por un año: si el archivo cambia, cambia la
+URL. La URL sin huella se sigue sirviendo, pero con revalidación por ETag.
+
+Los archivos de texto (js, css, html, json, svg...) se comprimen también al
+construir el manifest, con gzip al máximo nivel y con brotli si el paquete
+está instalado, y se sirve la variante que acepte el cliente según
+Accept-Encoding. Solo se guardan las variantes que efectivamente ahorran bytes.
+
+Se sirven los bytes leídos al construir el manifest, no el archivo en disco:
+así el contenido siempre corresponde a su huella y a su ETag. Los cambios en
+los estáticos se ven al reiniciar el proceso (o llamando a build() de nuevo).
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo hay variantes gzip
+    brotli = None
+
+from litestar import Router, get
+from litestar.datastructures import CacheControlHeader, ETag
+from litestar.exceptions import NotFoundException
+from litestar.params import Parameter
+from litestar.response import Response
+from litestar.status_codes import HTTP_304_NOT_MODIFIED
+
+from src.shared.utils.http_cache import etag_matches
+
+
+# Un año, el máximo que respetan los navegadores
+IMMUTABLE_MAX_AGE = 31536000
+
+_FINGERPRINT_LENGTH = 12
+
+# Variantes menores que esto no compensan el costo de descomprimir
+_MIN_COMPRESS_SIZE = 512
+
+_COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml", "application/xml")
+
+
+
+@dataclass
+class StaticAsset:
+    path: Path
+    relative_path: str
+    fingerprinted_path: str
+    digest: str
+    media_type: str
+    content: bytes
+    # Encoding (br, gzip) → contenido comprimido, en orden de preferencia
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+    @property
+    def etag(self) -> str:
+        return self.digest[:32]
+
+
+    def variant_etag(self, encoding: str) -> str:
+        return f"{self.etag}-{encoding}"
+
+
+
+class AssetManifest:
+    """Mapa ruta relativa → archivo con huella, construido una vez al arrancar"""
+
+    def __init__(self, directory: Path, url_prefix: str = "/static"):
+        self.directory = Path(directory)
+        self.url_prefix = url_prefix.rstrip("/")
+        self._assets: Dict[str, StaticAsset] = {}
+        self._fingerprinted: Dict[str, StaticAsset] = {}
+        self._built = False
+
+
+    def build(self) -> None:
+        assets: Dict[str, StaticAsset] = {}
+        fingerprinted: Dict[str, StaticAsset] = {}
+
+        for root, _, files in os.walk(self.directory):
+            for name in sorted(files):
+                path = Path(root) / name
+                relative_path = path.relative_to(self.directory).as_posix()
+                content = path.read_bytes()
+                digest = hashlib.sha256(content).hexdigest()
+                media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+                stem, extension = os.path.splitext(relative_path)
+                asset = StaticAsset(
+                    path=path,
+                    relative_path=relative_path,
+                    fingerprinted_path=f"{stem}.{digest[:_FINGERPRINT_LENGTH]}{extension}",
+                    digest=digest,
+                    media_type=media_type,
+                    content=content,
+                    variants=self._compress(content, media_type)
+                )
+                assets[relative_path] = asset
+                fingerprinted[asset.fingerprinted_path] = asset
+
+        self._assets = assets
+        self._fingerprinted = fingerprinted
+        self._built = True
+        compressed = sum(1 for asset in assets.values() if asset.variants)
+        print(f"🗂️ Manifest de estáticos: {len(assets)} archivos ({compressed} con variantes comprimidas)")
+
+
+    @staticmethod
+    def _compress(content: bytes, media_type: str) -> Dict[str, bytes]:
+        if len(content) < _MIN_COMPRESS_SIZE or not media_type.startswith(_COMPRESSIBLE_TYPES):
+            return {}
+
+        candidates = {}
+        if brotli is not None:
+            candidates["br"] = brotli.compress(content, quality=11, mode=brotli.MODE_TEXT)
+        # mtime fijo: la misma entrada produce los mismos bytes en cada arranque
+        candidates["gzip"] = gzip.compress(content, compresslevel=9, mtime=0)
+
+        return {encoding: data for encoding, data in candidates.items() if len(data) < len(content)}
+
+
+    def url_for(self, file_path: str) -> str:
+        """URL con huella del archivo (o la URL simple si no está en el manifest)"""
+
+        if not self._built:
+            self.build()
+
+        relative_path = file_path.lstrip("/")
+        asset = self._assets.get(relative_path)
+        if asset is None:
+            return f"{self.url_prefix}/{relative_path}"
+        return f"{self.url_prefix}/{asset.fingerprinted_path}"
+
+
+    def resolve(self, file_path: str) -> Optional[Tuple[StaticAsset, bool]]:
+        """Archivo pedido y si la ruta venía con huella"""
+
+        if not self._built:
+            self.build()
+
+        relative_path = file_path.lstrip("/")
+        asset = self._fingerprinted.get(relative_path)
+        if asset is not None:
+            return asset, True
+
+        asset = self._assets.get(relative_path)
+        if asset is not None:
+            return asset, False
+        return None
+
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "files": len(self._assets),
+            "bytes": sum(len(asset.content) for asset in self._assets.values()),
+            "compressed_files": sum(1 for asset in self._assets.values() if asset.variants)
+        }
+
+
+
+def parse_accept_encoding(accept_encoding: Optional[str]) -> Tuple[List[str], Set[str]]:
+    """Encodings aceptados por el cliente y los que rechaza explícitamente (q=0)"""
+
+    accepted: List[str] = []
+    refused: Set[str] = set()
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    refused.add(name)
+                    continue
+            except ValueError:
+                continue
+        accepted.append(name)
+    return accepted, refused
+
+
+def _pick_variant(asset: StaticAsset, accept_encoding: Optional[str]) -> Optional[str]:
+    accepted, refused = parse_accept_encoding(accept_encoding)
+    for encoding in asset.variants:
+        # "*" cubre los encodings no mencionados, nunca los rechazados con q=0
+        if encoding in accepted or ("*" in accepted and encoding not in refused):
+            return encoding
+    return None
+
+
+def create_static_assets_router(manifest: AssetManifest, path: str = "/static") -> Router:
+    """Router de estáticos: inmutable para URLs con huella, revalidación por ETag para el resto"""
+
+    @get("/{file_path:path}", include_in_schema=False)
+    async def serve_static(
+        file_path: str,
+        if_none_match: Optional[str] = Parameter(header="If-None-Match", default=None),
+        accept_encoding: Optional[str] = Parameter(header="Accept-Encoding", default=None)
+    ) -> Response:
+        resolved = manifest.resolve(file_path)
+        if resolved is None:
+            raise NotFoundException(detail=f"Archivo estático no encontrado: {file_path}")
+
+        asset, fingerprinted = resolved
+        cache_control = (
+            CacheControlHeader(public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+            if fingerprinted
+            else CacheControlHeader(no_cache=True)
+        )
+        encoding = _pick_variant(asset, accept_encoding)
+        etag = ETag(value=asset.variant_etag(encoding) if encoding else asset.etag)
+        headers = {"Cache-Control": cache_control.to_header()}
+        if asset.variants:
+            headers["Vary"] = "Accept-Encoding"
+
+        if etag_matches(if_none_match, etag.value):
+            return Response(
+                content=b"",
+                status_code=HTTP_304_NOT_MODIFIED,
+                headers={**headers, "ETag": etag.to_header()}
+            )
+
+        if encoding:
+            headers["Content-Encoding"] = encoding
+
+        return Response(
+            content=asset.variants[encoding] if encoding else asset.content,
+            media_type=asset.media_type,
+            headers={**headers, "ETag": etag.to_header()}
+        )
+
+    return Router(path=path, route_handlers=[serve_static])
@@ -0,0 +1,279 @@
+import functools
+import heapq
+import inspect
+import itertools
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from src.shared.settings.base import settings
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+
+class Span:
+    """Tramo medido dentro de una traza (tiempos relativos al inicio de la traza)"""
+
+    __slots__ = ("span_id", "parent_id", "name", "start", "end", "attributes", "error")
+
+    def __init__(self, span_id: int, parent_id: Optional[int], name: str, start: float, attributes: Dict[str, Any]):
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.start = start
+        self.end: Optional[float] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+
+
+class Trace:
+    """Una traza por mensaje: todos los spans que ocurren mientras se procesa"""
+
+    def __init__(self, trace_id: str, name: str, attributes: Dict[str, Any], max_spans: int):
+        self.trace_id = trace_id
+        self.name = name
+        self.attributes = attributes
+        self.started_at = datetime.utcnow()
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.max_spans = max_spans
+        self.spans: List[Span] = []
+        self.dropped_spans = 0
+        self._ids = itertools.count(1)
+
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+
+    def open_span(self, name: str, parent_id: Optional[int], attributes: Dict[str, Any]) -> Optional[Span]:
+        if len(self.spans) >= self.max_spans:
+            self.dropped_spans += 1
+            return None
+
+        span = Span(next(self._ids), parent_id, name, time.perf_counter() - self.start, attributes)
+        self.spans.append(span)
+        return span
+
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration * 1000, 2),
+            "spans": len(self.spans),
+            "attributes": self.attributes
+        }
+
+
+    def waterfall(self) -> Dict[str, Any]:
+        """Spans ordenados por inicio, con profundidad y offsets en milisegundos"""
+
+        depths: Dict[int, int] = {}
+        rows = []
+        for span in sorted(self.spans, key=lambda item: item.start):
+            depth = depths.get(span.parent_id, -1) + 1 if span.parent_id else 0
+            depths[span.span_id] = depth
+            end = span.end if span.end is not None else self.duration
+            rows.append({
+                "id": span.span_id,
+                "parent_id": span.parent_id,
+                "name": span.name,
+                "depth": depth,
+                "start_ms": round(span.start * 1000, 2),
+                "duration_ms": round((end - span.start) * 1000, 2),
+                "open": span.end is None,
+                "error": span.error,
+                "attributes": span.attributes
+            })
+
+        return {**self.summary(), "dropped_spans": self.dropped_spans, "waterfall": rows}
+
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[int]] = ContextVar("current_span", default=None)
+
+
+
+class Tracer:
+    """
+    Trazas en memoria: las últimas N y las K más lentas.
+
+    La traza viaja en un ContextVar, así que las tareas creadas durante el
+    procesamiento (asyncio.create_task) siguen agregando spans a la misma
+    traza. Sin traza activa, span() no hace nada más que leer el ContextVar.
+    """
+
+    def __init__(self, enabled: bool, recent_size: int, slowest_size: int, max_spans: int):
+        self.enabled = enabled
+        self.slowest_size = slowest_size
+        self.max_spans = max_spans
+        self._recent: Deque[Trace] = deque(maxlen=recent_size)
+        self._slowest: List[Tuple[float, int, Trace]] = []
+        self._sequence = itertools.count()
+        self._finished = 0
+
+
+    @staticmethod
+    def current_trace_id() -> Optional[str]:
+        trace = _current_trace.get()
+        return trace.trace_id if trace else None
+
+
+    @contextmanager
+    def start_trace(self, name: str, trace_id: Optional[str] = None, **attributes: Any) -> Iterator[Optional[Trace]]:
+        """Abre una traza nueva (una por mensaje) y la guarda al terminar"""
+
+        if not self.enabled:
+            yield None
+            return
+
+        # El id puede venir del cliente: se acota para no guardar strings arbitrarios
+        trace_id = str(trace_id)[:64] if trace_id else uuid.uuid4().hex[:16]
+        trace = Trace(trace_id, name, attributes, self.max_spans)
+        trace_token = _current_trace.set(trace)
+        span_token = _current_span.set(None)
+        try:
+            yield trace
+        finally:
+            trace.end = time.perf_counter()
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+            self._store(trace)
+
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[None]:
+        """Mide un tramo dentro de la traza activa (no-op si no hay traza)"""
+
+        trace = _current_trace.get()
+        if trace is None:
+            yield
+            return
+
+        span = trace.open_span(name, _current_span.get(), attributes)
+        if span is None:
+            yield
+            return
+
+        token = _current_span.set(span.span_id)
+        try:
+            yield
+        except BaseException as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            span.end = time.perf_counter() - trace.start
+            _current_span.reset(token)
+            # Tareas de fondo que siguen después de cerrar la traza la extienden
+            if trace.end is not None and trace.start + span.end > trace.end:
+                trace.end = trace.start + span.end
+
+
+    def record_span(self, name: str, started: float, ended: float, **attributes: Any) -> None:
+        """Agrega un span ya terminado (tiempos de perf_counter) bajo el span activo"""
+
+        trace = _current_trace.get()
+        if trace is None:
+            return
+
+        span = trace.open_span(name, _current_span.get(), attributes)
+        if span is not None:
+            span.start = started - trace.start
+            span.end = ended - trace.start
+
+
+    def annotate(self, **attributes: Any) -> None:
+        """Agrega atributos a la traza activa (p.ej. el id de la conversación)"""
+
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.attributes.update(attributes)
+
+
+    def traced(self, name: Optional[str] = None) -> Callable[[F], F]:
+        """Decorador: envuelve una corrutina en un span con su nombre calificado"""
+
+        def decorator(func: F) -> F:
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                if _current_trace.get() is None:
+                    return await func(*args, **kwargs)
+                with self.span(span_name):
+                    return await func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+
+    def traced_class(self, cls: type) -> type:
+        """Decorador de clase: traza todos los métodos async públicos"""
+
+        for attribute, value in list(vars(cls).items()):
+            if attribute.startswith("_") or not inspect.iscoroutinefunction(value):
+                continue
+            setattr(cls, attribute, self.traced(f"{cls.__name__}.{attribute}")(value))
+        return cls
+
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        for trace in self._recent:
+            if trace.trace_id == trace_id:
+                return trace
+        for _, _, trace in self._slowest:
+            if trace.trace_id == trace_id:
+                return trace
+        return None
+
+
+    def recent(self) -> List[Trace]:
+        return list(reversed(self._recent))
+
+
+    def slowest(self) -> List[Trace]:
+        return [trace for _, _, trace in sorted(self._slowest, reverse=True)]
+
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "finished": self._finished,
+            "recent": len(self._recent),
+            "slowest": len(self._slowest),
+            "slowest_ms": round(max(self._slowest)[0] * 1000, 2) if self._slowest else None
+        }
+
+
+    def _store(self, trace: Trace) -> None:
+        self._finished += 1
+        self._recent.append(trace)
+
+        # Min-heap de tamaño fijo: la más rápida de las lentas sale primero
+        entry = (trace.duration, next(self._sequence), trace)
+        if len(self._slowest) < self.slowest_size:
+            heapq.heappush(self._slowest, entry)
+        elif entry[0] > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+
+
+# Tracer único del proceso
+tracer = Tracer(
+    enabled=settings.tracing_enabled,
+    recent_size=settings.tracing_recent_size,
+    slowest_size=settings.tracing_slowest_size,
+    max_spans=settings.tracing_max_spans
+)
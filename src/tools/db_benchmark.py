@@ -0,0 +1,437 @@
+"""
+Benchmarks de los repositorios contra una base de datos poblada.
+
+Para cada método de MensajeRepository, ConversacionRepository y
+AreaRepository mide la distribución de latencias, las filas examinadas por
+llamada (contadores Handler_read_* de la sesión de MySQL) y captura el
+EXPLAIN de cada SELECT que emite. Con --baseline compara contra una corrida
+anterior: una regresión de latencia o un cambio de plan (otro índice, un
+full scan nuevo) se reporta con su diff y el proceso termina con código 1.
+
+    # Contra la BD actual
+    python -m src.tools.db_benchmark --output benchmarks/db.json
+
+    # Varios tamaños: completa el dataset con seed_dataset antes de cada uno
+    python -m src.tools.db_benchmark --sizes 100000,1000000,10000000 --output benchmarks/db.json
+
+    # Comparar contra la línea base
+    python -m src.tools.db_benchmark --baseline benchmarks/db.json --output /tmp/db.json
+"""
+
+import argparse
+import asyncio
+import difflib
+import json
+import os
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from src.infrastructure.database.models import (
+    Area, Cliente, Conversacion, Mensaje, EstadoConversacionEnum, TipoMensajeEnum
+)
+from src.modules.client.repositories import AreaRepository, ConversacionRepository, MensajeRepository
+from src.shared.settings.base import settings
+from src.tools import seed_dataset
+from src.tools.stats import latency_summary
+
+
+_HANDLER_READ_COUNTERS = (
+    "Handler_read_first", "Handler_read_key", "Handler_read_last", "Handler_read_next",
+    "Handler_read_prev", "Handler_read_rnd", "Handler_read_rnd_next"
+)
+
+Sample = Dict[str, Any]
+
+
+
+@dataclass
+class BenchmarkCase:
+    name: str
+    repository: type
+    call: Callable[[Any, Sample, random.Random], Awaitable[Any]]
+    # Fracción de --iterations (los métodos que leen miles de filas corren menos veces)
+    weight: float = 1.0
+    # Los casos que escriben corren en una transacción que se revierte al final
+    writes: bool = False
+
+
+
+def _random_conversation(sample: Sample, rng: random.Random) -> int:
+    return rng.randint(sample["conversation_min"], sample["conversation_max"])
+
+
+CASES: List[BenchmarkCase] = [
+    # Mensajes
+    BenchmarkCase(
+        "MensajeRepository.get_by_conversation", MensajeRepository,
+        lambda repo, sample, rng: repo.get_by_conversation(_random_conversation(sample, rng))
+    ),
+    BenchmarkCase(
+        "MensajeRepository.get_by_conversation[offset=200]", MensajeRepository,
+        lambda repo, sample, rng: repo.get_by_conversation(_random_conversation(sample, rng), limit=50, offset=200)
+    ),
+    BenchmarkCase(
+        "MensajeRepository.get_recent_by_conversation", MensajeRepository,
+        lambda repo, sample, rng: repo.get_recent_by_conversation(_random_conversation(sample, rng))
+    ),
+    BenchmarkCase(
+        "MensajeRepository.get_by_id", MensajeRepository,
+        lambda repo, sample, rng: repo.get_by_id(rng.randint(sample["message_min"], sample["message_max"]))
+    ),
+    BenchmarkCase(
+        "MensajeRepository.create", MensajeRepository,
+        lambda repo, sample, rng: repo.create({
+            "id_conversacion": _random_conversation(sample, rng),
+            "contenido": "Mensaje de benchmark",
+            "tipo": TipoMensajeEnum.CLIENTE,
+            "remitente": "Benchmark",
+            "es_derivacion": False
+        }),
+        writes=True
+    ),
+
+    # Conversaciones
+    BenchmarkCase(
+        "ConversacionRepository.get_by_id", ConversacionRepository,
+        lambda repo, sample, rng: repo.get_by_id(_random_conversation(sample, rng))
+    ),
+    BenchmarkCase(
+        "ConversacionRepository.get_active_by_client", ConversacionRepository,
+        lambda repo, sample, rng: repo.get_active_by_client(rng.choice(sample["clients_with_active"]))
+    ),
+    BenchmarkCase(
+        "ConversacionRepository.get_all_active", ConversacionRepository,
+        lambda repo, sample, rng: repo.get_all_active(),
+        weight=0.05
+    ),
+    BenchmarkCase(
+        "ConversacionRepository.update", ConversacionRepository,
+        lambda repo, sample, rng: repo.update(
+            _random_conversation(sample, rng), {"estado": EstadoConversacionEnum.ESPERANDO_HUMANO}
+        ),
+        writes=True
+    ),
+
+    # Áreas
+    BenchmarkCase("AreaRepository.get_all", AreaRepository, lambda repo, sample, rng: repo.get_all()),
+    BenchmarkCase(
+        "AreaRepository.get_by_id", AreaRepository,
+        lambda repo, sample, rng: repo.get_by_id(rng.choice(sample["area_ids"]))
+    ),
+    BenchmarkCase(
+        "AreaRepository.get_by_name", AreaRepository,
+        lambda repo, sample, rng: repo.get_by_name(rng.choice(sample["area_names"]))
+    ),
+    BenchmarkCase("AreaRepository.get_active_areas", AreaRepository, lambda repo, sample, rng: repo.get_active_areas()),
+    BenchmarkCase("AreaRepository.search", AreaRepository, lambda repo, sample, rng: repo.search("conta")),
+    BenchmarkCase("AreaRepository.get_stats", AreaRepository, lambda repo, sample, rng: repo.get_stats()),
+    BenchmarkCase(
+        "AreaRepository.get_with_relationships", AreaRepository,
+        lambda repo, sample, rng: repo.get_with_relationships(rng.choice(sample["area_ids"])),
+        weight=0.02
+    ),
+    BenchmarkCase(
+        "AreaRepository.exists_by_name", AreaRepository,
+        lambda repo, sample, rng: repo.exists_by_name(rng.choice(sample["area_names"]))
+    ),
+    BenchmarkCase(
+        "AreaRepository.get_areas_for_derivation", AreaRepository,
+        lambda repo, sample, rng: repo.get_areas_for_derivation()
+    ),
+    BenchmarkCase(
+        "AreaRepository.create", AreaRepository,
+        lambda repo, sample, rng: repo.create({
+            "nombre": f"Benchmark {uuid.uuid4().hex[:8]}",
+            "instrucciones": "Área de benchmark"
+        }),
+        writes=True
+    )
+]
+
+
+
+class StatementRecorder:
+    """Guarda las sentencias que emite el engine mientras está activo"""
+
+    def __init__(self, engine: AsyncEngine):
+        self.active = False
+        self.statements: List[Tuple[str, Any]] = []
+        event.listen(engine.sync_engine, "before_cursor_execute", self._record)
+
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if self.active:
+            self.statements.append((statement, parameters))
+
+
+
+async def _table_sizes(session: AsyncSession) -> Dict[str, int]:
+    sizes = {}
+    for name, model in (("areas", Area), ("clientes", Cliente), ("conversaciones", Conversacion), ("mensajes", Mensaje)):
+        sizes[name] = await session.scalar(select(func.count()).select_from(model)) or 0
+    return sizes
+
+
+async def _collect_sample(session: AsyncSession) -> Sample:
+    """Parámetros reales para los casos: rangos de ids, clientes con conversación activa, áreas"""
+
+    conversation_min, conversation_max = (await session.execute(
+        select(func.min(Conversacion.id), func.max(Conversacion.id))
+    )).one()
+    message_min, message_max = (await session.execute(select(func.min(Mensaje.id), func.max(Mensaje.id)))).one()
+
+    clients_with_active = (await session.scalars(
+        select(Conversacion.id_cliente).where(
+            Conversacion.estado.in_([EstadoConversacionEnum.IA_RESPONDIENDO, EstadoConversacionEnum.ESPERANDO_HUMANO])
+        ).distinct().limit(1000)
+    )).all()
+
+    areas = (await session.execute(select(Area.id, Area.nombre))).all()
+
+    if conversation_min is None or message_min is None or not areas:
+        raise RuntimeError("La base de datos está vacía: poblarla con src.tools.seed_dataset o usar --sizes")
+
+    return {
+        "conversation_min": conversation_min,
+        "conversation_max": conversation_max,
+        "message_min": message_min,
+        "message_max": message_max,
+        "clients_with_active": list(clients_with_active) or [0],
+        "area_ids": [area.id for area in areas],
+        "area_names": [area.nombre for area in areas]
+    }
+
+
+async def _rows_examined(session: AsyncSession) -> int:
+    result = await session.execute(text("SHOW SESSION STATUS LIKE 'Handler_read%'"))
+    return sum(int(value) for name, value in result.all() if name in _HANDLER_READ_COUNTERS)
+
+
+async def _explain(session: AsyncSession, statements: List[Tuple[str, Any]]) -> Tuple[List[str], List[int]]:
+    """
+    Plan normalizado de cada SELECT: tabla, tipo de acceso, índice y Extra.
+    Las filas estimadas van aparte porque varían entre corridas.
+    """
+
+    plan: List[str] = []
+    estimated_rows: List[int] = []
+    connection = await session.connection()
+
+    for index, (statement, parameters) in enumerate(statements):
+        if not statement.lstrip().lower().startswith("select"):
+            continue
+
+        result = await connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+        for row in result.mappings().all():
+            plan.append(
+                f"q{index} {row.get('select_type')} {row.get('table')}: type={row.get('type')} "
+                f"key={row.get('key')} extra={row.get('Extra') or ''}"
+            )
+            estimated_rows.append(int(row.get("rows") or 0))
+
+    return plan, estimated_rows
+
+
+async def run_case(
+    engine: AsyncEngine,
+    recorder: StatementRecorder,
+    case: BenchmarkCase,
+    sample: Sample,
+    args: argparse.Namespace
+) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    iterations = max(int(args.iterations * case.weight), 3)
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        repository = case.repository(session)
+
+        # Calentamiento (buffer pool, caché de sentencias)
+        for _ in range(min(args.warmup, iterations)):
+            await case.call(repository, sample, rng)
+            session.expunge_all()
+
+        # Plan: sentencias de una llamada representativa
+        recorder.statements.clear()
+        recorder.active = True
+        try:
+            await case.call(repository, sample, rng)
+        finally:
+            recorder.active = False
+        statements = list(recorder.statements)
+        session.expunge_all()
+
+        # Filas examinadas: delta de Handler_read_* descontando lo que suma el propio SHOW STATUS
+        calibration_start = await _rows_examined(session)
+        status_overhead = await _rows_examined(session) - calibration_start
+
+        latencies: List[float] = []
+        rows_before = await _rows_examined(session)
+        for _ in range(iterations):
+            started = time.perf_counter()
+            await case.call(repository, sample, rng)
+            latencies.append(time.perf_counter() - started)
+            session.expunge_all()
+        rows_after = await _rows_examined(session)
+
+        plan, estimated_rows = await _explain(session, statements)
+
+        if case.writes:
+            await session.rollback()
+
+    rows_examined = max(rows_after - rows_before - status_overhead, 0) / iterations
+    return {
+        **latency_summary(latencies),
+        "statements": len(statements),
+        "rows_examined": round(rows_examined, 1),
+        "plan": plan,
+        "estimated_rows": estimated_rows,
+        "full_scans": sum(1 for line in plan if " type=ALL " in line)
+    }
+
+
+async def _grow_dataset(session: AsyncSession, target_messages: int, args: argparse.Namespace) -> None:
+    """Completa el dataset hasta target_messages con la proporción de seed_dataset"""
+
+    current = await session.scalar(select(func.count()).select_from(Mensaje)) or 0
+    # Cerrar la transacción: con REPEATABLE READ el snapshot abierto por el COUNT
+    # ocultaría a las lecturas siguientes las filas que el seeder confirma en otras conexiones
+    await session.commit()
+    missing = target_messages - current
+    if missing <= 0:
+        return
+
+    conversations = max(missing // 10, 1)
+    seed_args = seed_dataset.parse_args([
+        "--areas", "0" if current else "10",
+        "--clientes", str(max(conversations // 5, 1)),
+        "--conversaciones", str(conversations),
+        "--mensajes", str(missing),
+        "--seed", str(args.seed)
+    ])
+    print(f"🌱 Completando el dataset: {current:,} → {target_messages:,} mensajes")
+    await seed_dataset.seed(seed_args)
+
+
+async def benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    engine = create_async_engine(settings.url_db, pool_size=1, max_overflow=0)
+    recorder = StatementRecorder(engine)
+    selected = [case for case in CASES if not args.only or any(term in case.name for term in args.only)]
+    runs = []
+
+    try:
+        for target in args.sizes or [None]:
+            async with AsyncSession(engine) as session:
+                if target is not None:
+                    await _grow_dataset(session, target, args)
+                sizes = await _table_sizes(session)
+                sample = await _collect_sample(session)
+
+            label = str(target) if target is not None else "current"
+            print(f"📏 Tamaño {label}: {sizes}")
+
+            cases = {}
+            for case in selected:
+                result = await run_case(engine, recorder, case, sample, args)
+                cases[case.name] = result
+                scan_note = f" ⚠️ {result['full_scans']} full scan(s)" if result["full_scans"] else ""
+                print(
+                    f"   {case.name}: p50={result['p50_ms']} ms p95={result['p95_ms']} ms "
+                    f"filas={result['rows_examined']}{scan_note}"
+                )
+
+            runs.append({"label": label, "sizes": sizes, "cases": cases})
+
+    finally:
+        await engine.dispose()
+
+    return {
+        "created_at": datetime.utcnow().isoformat(),
+        "iterations": args.iterations,
+        "runs": runs
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], max_regression: float) -> List[str]:
+    """Regresiones de latencia (p95) y cambios de plan por caso y tamaño"""
+
+    problems: List[str] = []
+    baseline_runs = {run["label"]: run for run in baseline.get("runs", [])}
+
+    for run in current["runs"]:
+        previous_run = baseline_runs.get(run["label"])
+        if previous_run is None:
+            continue
+
+        for name, result in run["cases"].items():
+            previous = previous_run["cases"].get(name)
+            if previous is None:
+                continue
+
+            if previous["p95_ms"] and result["p95_ms"] > previous["p95_ms"] * (1 + max_regression):
+                problems.append(
+                    f"⏱️ [{run['label']}] {name}: p95 {previous['p95_ms']} → {result['p95_ms']} ms "
+                    f"(+{(result['p95_ms'] / previous['p95_ms'] - 1) * 100:.0f}%)"
+                )
+
+            if previous["rows_examined"] and result["rows_examined"] > previous["rows_examined"] * (1 + max_regression):
+                problems.append(
+                    f"📈 [{run['label']}] {name}: filas examinadas {previous['rows_examined']} → {result['rows_examined']}"
+                )
+
+            if previous["plan"] != result["plan"]:
+                diff = "\n".join(difflib.unified_diff(
+                    previous["plan"], result["plan"], fromfile="baseline", tofile="actual", lineterm=""
+                ))
+                problems.append(f"🧭 [{run['label']}] {name}: el plan cambió\n{diff}")
+
+    return problems
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmarks de repositorios con captura de planes de consulta")
+    parser.add_argument("--sizes", default=None, help="Mensajes objetivo por corrida, separados por coma (completa el dataset)")
+    parser.add_argument("--iterations", type=int, default=200, help="Llamadas medidas por caso")
+    parser.add_argument("--warmup", type=int, default=10, help="Llamadas de calentamiento por caso")
+    parser.add_argument("--only", nargs="*", default=None, help="Solo los casos cuyo nombre contenga alguno de estos textos")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla de los parámetros aleatorios")
+    parser.add_argument("--output", default=None, help="Archivo JSON donde guardar el resultado")
+    parser.add_argument("--baseline", default=None, help="Resultado anterior contra el cual comparar")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="Aumento tolerado de p95 y filas examinadas (0.25 = 25%%)")
+
+    args = parser.parse_args(argv)
+    args.sizes = [int(size) for size in args.sizes.split(",")] if args.sizes else None
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    result = asyncio.run(benchmark(args))
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(result, file, indent=2, ensure_ascii=False)
+        print(f"💾 Resultado guardado en {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            problems = compare(json.load(file), result, args.max_regression)
+
+        if problems:
+            print(f"\n❌ {len(problems)} regresión(es) respecto de {args.baseline}:")
+            for problem in problems:
+                print(problem)
+            raise SystemExit(1)
+        print(f"\n✅ Sin regresiones respecto de {args.baseline}")
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Microbenchmarks de los caminos calientes en Python puro.
+
+Mide, con entradas fijas y deterministas, lo que corre en cada mensaje:
+armado del prompt y de los turnos, interpretación de la decisión de la IA,
+matcher local de áreas, formateo del historial y serialización de los
+payloads de broadcast. Los casos que dependen del catálogo corren con 4,
+50 y 500 áreas.
+
+    # Medir y comparar contra la línea base guardada
+    python -m src.tools.microbench
+
+    # Actualizar la línea base después de una optimización
+    python -m src.tools.microbench --save-baseline
+
+La línea base depende de la máquina: compararla en la misma donde se generó.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import timeit
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from litestar.serialization import encode_json
+
+from src.infrastructure.database.models import (
+    Area, ConfiguracionIA, EstadoEnum, Mensaje, TipoMensajeEnum
+)
+from src.modules.client.controllers.api.chat_controller import ChatWebSocketController
+from src.modules.client.schemas import AIDecision
+from src.modules.client.services import AIService, AreaService, RecentMessage
+from src.shared.settings.constants import ROOT_PATH
+
+
+DEFAULT_BASELINE = os.path.join(ROOT_PATH, "benchmarks", "microbench_baseline.json")
+
+AREA_COUNTS = (4, 50, 500)
+
+_AREA_TOPICS = (
+    ("Contable", "renta declaración contabilidad estados financieros libros balance"),
+    ("Legal", "empresa constitución contrato legal jurídico derecho sociedad"),
+    ("Financiera", "inversión financiero flujo caja crédito préstamo"),
+    ("Tributaria", "impuesto fiscal tributario iva retención planeación"),
+    ("Laboral", "contrato trabajo finiquito despido liquidación sueldo"),
+    ("Comercio Exterior", "importación exportación aduana arancel")
+)
+
+_CLIENT_MESSAGE = "Hola, necesito ayuda con la declaración de renta de mi empresa y el pago del IVA atrasado"
+
+_FIXED_NOW = datetime(2025, 1, 15, 10, 30)
+
+
+
+@dataclass
+class MicroCase:
+    name: str
+    # Recibe el número de áreas (o None si no depende del catálogo) y retorna la función a medir
+    setup: Callable[[Optional[int]], Callable[[], Any]]
+    scales_with_areas: bool = True
+
+
+
+def _make_areas(count: int) -> List[Area]:
+    rng = random.Random(count)
+    areas = []
+    for index in range(count):
+        topic, keywords = _AREA_TOPICS[index % len(_AREA_TOPICS)]
+        words = keywords.split()
+        areas.append(Area(
+            id=index + 1,
+            nombre=f"{topic} {index + 1}",
+            descripcion=f"Área {topic.lower()} número {index + 1}",
+            instrucciones=(
+                f"Derivar consultas sobre {', '.join(rng.sample(words, min(3, len(words))))}. "
+                "Pedir antecedentes antes de responder y confirmar el RUT del cliente."
+            ),
+            estado=EstadoEnum.ACTIVE,
+            tiempo_respuesta=rng.choice((15, 30, 60, 120)),
+            especialista_asignado=f"Especialista {index + 1}"
+        ))
+    return areas
+
+
+def _make_history(count: int) -> List[RecentMessage]:
+    history = []
+    for index in range(count):
+        if index % 2 == 0:
+            history.append(RecentMessage("cliente", f"Consulta número {index} sobre mi declaración", "Ana Pérez"))
+        else:
+            history.append(RecentMessage("ia", f"Respuesta número {index}: te explico cómo funciona", "Prism IA"))
+    return history
+
+
+def _make_messages(count: int) -> List[Mensaje]:
+    return [
+        Mensaje(
+            id=index + 1,
+            id_conversacion=1,
+            contenido=f"Mensaje {index} de la conversación con algo de texto para que pese como uno real",
+            tipo=TipoMensajeEnum.CLIENTE if index % 2 == 0 else TipoMensajeEnum.IA,
+            remitente="Ana Pérez" if index % 2 == 0 else "Prism IA",
+            timestamp=_FIXED_NOW + timedelta(seconds=index * 30),
+            es_derivacion=False
+        )
+        for index in range(count)
+    ]
+
+
+def _config() -> ConfiguracionIA:
+    return ConfiguracionIA(
+        id=1,
+        system_prompt="Eres Prism, el asistente de IA de Biplan. Responde de forma profesional y cordial.",
+        temperatura=0.7,
+        min_tokens=50,
+        max_tokens=300,
+        model="gemini-2.0-flash",
+        auto_derivacion_activa=True
+    )
+
+
+def _ai_service() -> AIService:
+    # Sin __init__: los métodos medidos no usan el cliente de Gemini
+    return AIService.__new__(AIService)
+
+
+def _run_sync(coroutine) -> Any:
+    """Ejecuta una corrutina que no espera nada, sin el costo del event loop"""
+
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("La corrutina quedó esperando I/O")
+
+
+def _setup_system_prompt(area_count: int) -> Callable[[], Any]:
+    service, config, areas = _ai_service(), _config(), _make_areas(area_count)
+    return lambda: _run_sync(service._build_system_prompt(config, areas))
+
+
+def _setup_conversation_contents(area_count: int) -> Callable[[], Any]:
+    service, areas, history = _ai_service(), _make_areas(area_count), _make_history(10)
+
+    def run():
+        query = service._build_ranking_query(_CLIENT_MESSAGE, history)
+        area_details = service._build_area_details(areas, query)
+        return service._build_conversation_contents(_CLIENT_MESSAGE, "Ana Pérez", history, area_details)
+
+    return run
+
+
+def _setup_analyze_transfer(area_count: int) -> Callable[[], Any]:
+    service, areas = _ai_service(), _make_areas(area_count)
+    # El peor caso: el área elegida es la última del catálogo
+    decision = AIDecision(respuesta="Te derivo con el especialista", derivar=True, area_id=area_count, confianza=0.8)
+    return lambda: service._analyze_response_for_transfer(decision, areas)
+
+
+def _setup_match_best_area(area_count: int) -> Callable[[], Any]:
+    areas = _make_areas(area_count)
+    return lambda: AreaService.match_best_area(_CLIENT_MESSAGE, areas)
+
+
+def _setup_format_history(_: Optional[int]) -> Callable[[], Any]:
+    mensajes = _make_messages(50)
+    return lambda: ChatWebSocketController._format_history(mensajes)
+
+
+def _setup_encode_ai_response(_: Optional[int]) -> Callable[[], Any]:
+    payload = {
+        "type": "ai_response",
+        "conversation_id": 12345,
+        "client_id": 678,
+        "client_name": "Ana Pérez",
+        "message": {
+            "id": "temp_1736937000.123",
+            "content": "Gracias por escribirnos. " * 12,
+            "sender": "Prism IA",
+            "timestamp": _FIXED_NOW.isoformat(),
+            "message_type": "ia"
+        },
+        "trace_id": "0123456789abcdef"
+    }
+    return lambda: encode_json(payload)
+
+
+def _setup_encode_history(_: Optional[int]) -> Callable[[], Any]:
+    payload = {
+        "type": "conversation_history",
+        "conversation_id": 12345,
+        "messages": ChatWebSocketController._format_history(_make_messages(50))
+    }
+    return lambda: encode_json(payload)
+
+
+CASES: List[MicroCase] = [
+    MicroCase("AIService._build_system_prompt", _setup_system_prompt),
+    MicroCase("AIService._build_conversation_contents", _setup_conversation_contents),
+    MicroCase("AIService._analyze_response_for_transfer", _setup_analyze_transfer),
+    MicroCase("AreaService.match_best_area", _setup_match_best_area),
+    MicroCase("ChatWebSocketController._format_history[50]", _setup_format_history, scales_with_areas=False),
+    MicroCase("encode_json[ai_response]", _setup_encode_ai_response, scales_with_areas=False),
+    MicroCase("encode_json[conversation_history 50]", _setup_encode_history, scales_with_areas=False)
+]
+
+
+def measure(function: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, float]:
+    """Microsegundos por llamada: mínimo y mediana entre repeticiones de ~min_time segundos"""
+
+    timer = timeit.Timer(function)
+    number, elapsed = timer.autorange()
+    number = max(int(number * min_time / max(elapsed, 1e-9)), 1)
+    per_call = [total / number * 1e6 for total in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "min_us": round(min(per_call), 3),
+        "median_us": round(statistics.median(per_call), 3),
+        "loops": number
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    results: Dict[str, Dict[str, float]] = {}
+    for case in CASES:
+        if args.only and not any(term in case.name for term in args.only):
+            continue
+
+        for area_count in (AREA_COUNTS if case.scales_with_areas else (None,)):
+            key = f"{case.name}@{area_count}" if area_count is not None else case.name
+            function = case.setup(area_count)
+            function()
+            results[key] = measure(function, args.repeat, args.min_time)
+            print(f"   {key}: mediana {results[key]['median_us']} µs (mín {results[key]['min_us']} µs)")
+
+    return {
+        "created_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], max_regression: float) -> List[str]:
+    lines = []
+    regressions = []
+    for key, result in current["results"].items():
+        previous = baseline.get("results", {}).get(key)
+        if not previous:
+            continue
+
+        change = result["median_us"] / previous["median_us"] - 1
+        lines.append(f"   {key}: {previous['median_us']} → {result['median_us']} µs ({change * 100:+.1f}%)")
+        if change > max_regression:
+            regressions.append(key)
+
+    print("\n📊 Comparación con la línea base")
+    print("\n".join(lines))
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Microbenchmarks de los caminos calientes del chat")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Archivo de línea base")
+    parser.add_argument("--save-baseline", action="store_true", help="Guardar el resultado como nueva línea base")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Aumento tolerado de la mediana (0.2 = 20%%)")
+    parser.add_argument("--repeat", type=int, default=7, help="Repeticiones por caso")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Segundos aproximados por repetición")
+    parser.add_argument("--only", nargs="*", default=None, help="Solo los casos cuyo nombre contenga alguno de estos textos")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    print("⏱️ Microbenchmarks")
+    result = run(args)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(result, file, indent=2, ensure_ascii=False)
+            file.write("\n")
+        print(f"💾 Línea base guardada en {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"⚠️ No hay línea base en {args.baseline} (generarla con --save-baseline)")
+        return
+
+    with open(args.baseline, encoding="utf-8") as file:
+        regressions = compare(json.load(file), result, args.max_regression)
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} caso(s) más lentos que la línea base: {', '.join(regressions)}")
+        raise SystemExit(1)
+    print("\n✅ Sin regresiones")
+
+
+
+if __name__ == "__main__":
+    main()
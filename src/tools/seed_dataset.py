@@ -0,0 +1,462 @@
+"""
+Generador de datos sintéticos para pruebas de escala.
+
+Crea áreas, clientes, conversaciones y mensajes con distribuciones realistas
+y los escribe con INSERT multi-fila en lotes grandes (executemany, que el
+driver reescribe como un solo INSERT ... VALUES (...), (...)), usando varias
+conexiones en paralelo mientras se genera el siguiente lote.
+
+- Largo de conversación de cola larga (log-normal): la mayoría cortas, unas
+  pocas de cientos de mensajes.
+- Clientes sesgados: pocos clientes concentran muchas conversaciones.
+- Estados sesgados por antigüedad: lo viejo está finalizado, lo reciente en curso.
+  Como en la aplicación, cada cliente tiene a lo más una conversación activa
+  (la más nueva); las anteriores quedan finalizadas.
+- Horarios concentrados en horario de oficina.
+
+Los ids se asignan en el generador (a partir del MAX(id) actual), así que no
+hace falta leer nada de vuelta. Con un millón de conversaciones y 10M de
+mensajes tarda minutos, no horas:
+
+    python -m src.tools.seed_dataset --clientes 200000 --conversaciones 1000000 --mensajes 10000000
+"""
+
+import argparse
+import array
+import asyncio
+import itertools
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from faker import Faker
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from src.infrastructure.database.models import (
+    Area, Cliente, Conversacion, Mensaje,
+    EstadoEnum, EstadoConversacionEnum, TipoMensajeEnum
+)
+from src.shared.settings.base import settings
+
+
+_AREA_NAMES = (
+    "Contabilidad", "Tributario", "Legal Corporativo", "Laboral", "Finanzas",
+    "Auditoría", "Remuneraciones", "Comercio Exterior", "Inmobiliario", "Familia"
+)
+
+_IA_TEXTS = (
+    "Gracias por escribirnos. Con gusto te ayudo con tu consulta.",
+    "Para eso necesitamos revisar algunos antecedentes. ¿Me puedes indicar tu RUT?",
+    "Te explico: el plazo depende del régimen tributario de tu empresa.",
+    "Esta consulta la debe revisar un especialista, te derivaré con el área correspondiente.",
+    "¿Hay algo más en lo que te pueda ayudar?"
+)
+
+# Peso relativo de cada hora del día (más tráfico en horario de oficina)
+_HOUR_WEIGHTS = [1, 1, 1, 1, 1, 2, 4, 8, 14, 18, 20, 20, 16, 14, 18, 20, 18, 14, 10, 7, 5, 4, 3, 2]
+
+_ACTIVE_WINDOW = timedelta(days=2)
+
+Row = Dict[str, Any]
+Batch = Tuple[Any, List[Row]]
+
+
+
+class DatasetGenerator:
+    """Genera filas en memoria, ya con ids, listas para insertar en lote"""
+
+    def __init__(self, args: argparse.Namespace, start_ids: Dict[str, int], existing_area_names: set):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.faker = Faker(args.locale)
+        if args.seed is not None:
+            Faker.seed(args.seed)
+
+        self.start_ids = start_ids
+        self.existing_area_names = existing_area_names
+        self.now = datetime.utcnow().replace(microsecond=0)
+        self.area_ids: List[int] = []
+        self.client_names: List[str] = []
+
+        # Pools de textos: Faker es lento por fila, así que se pre-generan y se combinan
+        self.client_texts = [
+            self.faker.sentence(nb_words=self.rng.randint(5, 25)) for _ in range(args.text_pool)
+        ]
+        self.human_texts = [
+            self.faker.paragraph(nb_sentences=self.rng.randint(1, 3)) for _ in range(args.text_pool // 4 or 1)
+        ]
+        self.specialists = [self.faker.name() for _ in range(max(args.areas * 2, 1))]
+        self._hours = list(range(24))
+        self._hour_cum_weights = list(itertools.accumulate(_HOUR_WEIGHTS))
+
+
+    def areas(self) -> List[Row]:
+        rows = []
+        for index in range(self.args.areas):
+            base_name = _AREA_NAMES[index % len(_AREA_NAMES)]
+            name = base_name if index < len(_AREA_NAMES) else f"{base_name} {index // len(_AREA_NAMES) + 1}"
+            suffix = 2
+            while name in self.existing_area_names:
+                name = f"{base_name} {suffix}"
+                suffix += 1
+            self.existing_area_names.add(name)
+
+            area_id = self.start_ids["areas"] + index
+            self.area_ids.append(area_id)
+            rows.append({
+                "id": area_id,
+                "nombre": name,
+                "descripcion": self.faker.sentence(nb_words=12),
+                "instrucciones": self.faker.paragraph(nb_sentences=3),
+                # Una de cada diez áreas queda inactiva
+                "estado": EstadoEnum.INACTIVE if self.rng.random() < 0.1 else EstadoEnum.ACTIVE,
+                "tiempo_respuesta": self.rng.choice((15, 30, 60, 120, 240)),
+                "especialista_asignado": self.rng.choice(self.specialists),
+                "created_at": self.now - timedelta(days=self.args.days)
+            })
+        return rows
+
+
+    def clientes(self) -> Iterator[List[Row]]:
+        names = [self.faker.name() for _ in range(min(self.args.clientes, 5000) or 1)]
+        batch: List[Row] = []
+
+        for index in range(self.args.clientes):
+            name = names[index % len(names)]
+            self.client_names.append(name)
+
+            roll = self.rng.random()
+            estado = "nuevo" if roll < 0.5 else "activo" if roll < 0.85 else "derivado"
+            batch.append({
+                "id": self.start_ids["clientes"] + index,
+                "nombre": name,
+                "telefono": f"+569{self.rng.randint(10000000, 99999999)}",
+                "estado": estado,
+                "id_area_asignada": self.rng.choice(self.area_ids) if estado == "derivado" and self.area_ids else None,
+                "created_at": self._random_datetime()
+            })
+
+            if len(batch) >= self.args.batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+
+    def conversation_lengths(self) -> List[int]:
+        """Largo de cada conversación (log-normal) escalado para sumar exactamente --mensajes"""
+
+        count = self.args.conversaciones
+        total = self.args.mensajes
+        if count == 0:
+            return []
+
+        weights = [self.rng.lognormvariate(0, self.args.length_sigma) for _ in range(count)]
+        scale = total / sum(weights)
+        lengths = [max(1, int(weight * scale)) for weight in weights]
+
+        # Ajustar el redondeo repartiendo la diferencia al azar
+        difference = total - sum(lengths)
+        while difference != 0:
+            index = self.rng.randrange(count)
+            if difference > 0:
+                lengths[index] += 1
+                difference -= 1
+            elif lengths[index] > 1:
+                lengths[index] -= 1
+                difference += 1
+        return lengths
+
+
+    def conversation_plan(self, count: int) -> Tuple[array.array, array.array, Dict[int, int]]:
+        """Cliente y antigüedad de cada conversación, y la más nueva de cada cliente
+
+        Se decide antes de generar las filas porque los lotes se insertan a
+        medida que salen: al escribir una conversación ya hay que saber si es
+        la última del cliente, la única que puede quedar activa.
+        """
+
+        client_count = len(self.client_names)
+        client_indexes = array.array("l")
+        # Segundos antes de self.now (arrays compactos: con millones de conversaciones pesa)
+        ages = array.array("d")
+        newest: Dict[int, int] = {}
+
+        for index in range(count):
+            # Sesgo tipo ley de potencias hacia los primeros clientes
+            client_index = min(int(client_count * self.rng.random() ** 2.5), client_count - 1)
+            age = (self.now - self._random_datetime()).total_seconds()
+            client_indexes.append(client_index)
+            ages.append(age)
+
+            current = newest.get(client_index)
+            if current is None or age < ages[current]:
+                newest[client_index] = index
+
+        return client_indexes, ages, newest
+
+
+    def conversaciones_y_mensajes(self) -> Iterator[Batch]:
+        conversation_table = Conversacion.__table__
+        message_table = Mensaje.__table__
+        conversations: List[Row] = []
+        messages: List[Row] = []
+        message_id = self.start_ids["mensajes"]
+
+        lengths = self.conversation_lengths()
+        client_indexes, ages, newest = self.conversation_plan(len(lengths))
+
+        for index, length in enumerate(lengths):
+            conversation_id = self.start_ids["conversaciones"] + index
+            client_index = client_indexes[index]
+            client_name = self.client_names[client_index]
+            created_at = self.now - timedelta(seconds=ages[index])
+            may_be_active = newest[client_index] == index
+
+            estado, area_id, derived_at_message = self._conversation_state(created_at, length, may_be_active)
+            timestamp = created_at
+            fecha_derivacion = None
+            specialist = self.rng.choice(self.specialists)
+
+            for position in range(length):
+                # Pausas exponenciales entre mensajes, con alguna espera larga ocasional
+                timestamp += timedelta(seconds=self.rng.expovariate(1 / 40))
+                if self.rng.random() < 0.02:
+                    timestamp += timedelta(hours=self.rng.uniform(1, 20))
+
+                if derived_at_message is not None and position == derived_at_message:
+                    tipo, content, sender, is_derivation = (
+                        TipoMensajeEnum.SISTEMA, "Conversación derivada a un especialista", "Sistema", True
+                    )
+                    fecha_derivacion = timestamp
+                elif position % 2 == 0:
+                    tipo, content, sender, is_derivation = (
+                        TipoMensajeEnum.CLIENTE, self.rng.choice(self.client_texts), client_name, False
+                    )
+                elif fecha_derivacion is not None:
+                    tipo, content, sender, is_derivation = (
+                        TipoMensajeEnum.HUMANO, self.rng.choice(self.human_texts), specialist, False
+                    )
+                else:
+                    tipo, content, sender, is_derivation = (
+                        TipoMensajeEnum.IA, self.rng.choice(_IA_TEXTS), "Prism IA", False
+                    )
+
+                messages.append({
+                    "id": message_id,
+                    "id_conversacion": conversation_id,
+                    "contenido": content,
+                    "tipo": tipo,
+                    "remitente": sender,
+                    "timestamp": min(timestamp, self.now),
+                    "es_derivacion": is_derivation
+                })
+                message_id += 1
+
+                if len(messages) >= self.args.batch_size:
+                    yield message_table, messages
+                    messages = []
+
+            conversations.append({
+                "id": conversation_id,
+                "id_cliente": self.start_ids["clientes"] + client_index,
+                "id_area_derivada": area_id,
+                "estado": estado,
+                "fecha_derivacion": fecha_derivacion,
+                "created_at": created_at,
+                "updated_at": min(timestamp, self.now)
+            })
+            if len(conversations) >= self.args.batch_size:
+                yield conversation_table, conversations
+                conversations = []
+
+        if conversations:
+            yield conversation_table, conversations
+        if messages:
+            yield message_table, messages
+
+
+    def _conversation_state(
+        self,
+        created_at: datetime,
+        length: int,
+        may_be_active: bool
+    ) -> Tuple[EstadoConversacionEnum, Optional[int], Optional[int]]:
+        """Estado, área derivada y posición del mensaje de derivación (si hay)"""
+
+        recent = self.now - created_at < _ACTIVE_WINDOW
+        roll = self.rng.random()
+        if not may_be_active:
+            # Solo la conversación más nueva del cliente puede seguir activa
+            estado = EstadoConversacionEnum.FINALIZADA
+        elif recent:
+            estado = EstadoConversacionEnum.IA_RESPONDIENDO if roll < 0.6 else EstadoConversacionEnum.ESPERANDO_HUMANO
+        else:
+            estado = (
+                EstadoConversacionEnum.FINALIZADA if roll < 0.92
+                else EstadoConversacionEnum.IA_RESPONDIENDO if roll < 0.97
+                else EstadoConversacionEnum.ESPERANDO_HUMANO
+            )
+
+        derived = estado == EstadoConversacionEnum.ESPERANDO_HUMANO or self.rng.random() < 0.25
+        if not derived or not self.area_ids or length < 3:
+            return estado, None, None
+
+        return estado, self.rng.choice(self.area_ids), self.rng.randint(2, length - 1)
+
+
+    def _random_datetime(self) -> datetime:
+        day = self.now - timedelta(days=self.rng.uniform(0, self.args.days))
+        hour = self.rng.choices(self._hours, cum_weights=self._hour_cum_weights)[0]
+        moment = day.replace(hour=hour, minute=self.rng.randrange(60), second=self.rng.randrange(60))
+        return min(moment, self.now)
+
+
+
+async def _next_ids(engine: AsyncEngine) -> Tuple[Dict[str, int], set]:
+    async with engine.connect() as connection:
+        start_ids = {}
+        for name, model in (("areas", Area), ("clientes", Cliente), ("conversaciones", Conversacion), ("mensajes", Mensaje)):
+            current = await connection.scalar(select(func.coalesce(func.max(model.id), 0)))
+            start_ids[name] = current + 1
+        area_names = set((await connection.scalars(select(Area.nombre))).all())
+    return start_ids, area_names
+
+
+async def _writer(engine: AsyncEngine, queue: asyncio.Queue, counts: Dict[str, int]) -> None:
+    """Consume lotes de la cola y los inserta; cada writer usa su propia conexión"""
+
+    async with engine.connect() as connection:
+        # Sesión de carga: sin verificación de FK/unicidad por fila (los ids ya son consistentes)
+        await connection.execute(text("SET SESSION foreign_key_checks = 0, unique_checks = 0"))
+        await connection.commit()
+
+        while True:
+            item = await queue.get()
+            if item is None:
+                queue.task_done()
+                return
+
+            table, rows = item
+            try:
+                await connection.execute(insert(table), rows)
+                await connection.commit()
+                counts[table.name] = counts.get(table.name, 0) + len(rows)
+            finally:
+                queue.task_done()
+
+
+async def _watching_writers(awaitable, writers: List[asyncio.Task]) -> None:
+    """
+    Espera una operación sobre la cola, fallando apenas un writer falla: si
+    fallan todos nadie consume la cola y el put() o el join() quedarían colgados
+    """
+
+    waiter = asyncio.ensure_future(awaitable)
+    while True:
+        failed = [task for task in writers if task.done() and (task.cancelled() or task.exception())]
+        if failed:
+            waiter.cancel()
+            if failed[0].cancelled():
+                raise RuntimeError("Un writer del seeder fue cancelado")
+            raise failed[0].exception()
+
+        if waiter.done():
+            return waiter.result()
+
+        # FIRST_COMPLETED y no FIRST_EXCEPTION: esta última no retorna cuando la operación termina bien.
+        # Un writer que terminó bien (consumió su centinela) ya no se vigila
+        running = [task for task in writers if not task.done()]
+        await asyncio.wait([waiter, *running], return_when=asyncio.FIRST_COMPLETED)
+
+
+async def seed(args: argparse.Namespace) -> Dict[str, int]:
+    engine = create_async_engine(settings.url_db, pool_size=args.workers, max_overflow=0)
+    counts: Dict[str, int] = {}
+    writers: List[asyncio.Task] = []
+
+    try:
+        start_ids, area_names = await _next_ids(engine)
+        generator = DatasetGenerator(args, start_ids, area_names)
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=args.workers * 2)
+        writers = [asyncio.create_task(_writer(engine, queue, counts)) for _ in range(args.workers)]
+        started = time.perf_counter()
+        last_report = started
+
+        async def put(table, rows: List[Row]) -> None:
+            nonlocal last_report
+            # put() bloquea si los writers van atrasados: la memoria queda acotada
+            await _watching_writers(queue.put((table, rows)), writers)
+            if time.perf_counter() - last_report >= 5:
+                last_report = time.perf_counter()
+                elapsed = last_report - started
+                inserted = sum(counts.values())
+                print(f"⏱️ {inserted:,} filas en {elapsed:.0f}s ({inserted / elapsed:,.0f} filas/s) {counts}")
+
+        if args.areas:
+            await put(Area.__table__, generator.areas())
+        for batch in generator.clientes():
+            await put(Cliente.__table__, batch)
+
+        # Las áreas y clientes deben existir antes de referenciarlos desde otra conexión
+        await _watching_writers(queue.join(), writers)
+
+        for table, batch in generator.conversaciones_y_mensajes():
+            await put(table, batch)
+
+        for _ in writers:
+            await _watching_writers(queue.put(None), writers)
+        await asyncio.gather(*writers)
+
+        elapsed = time.perf_counter() - started
+        total = sum(counts.values())
+        print(f"✅ {total:,} filas insertadas en {elapsed:.1f}s ({total / elapsed:,.0f} filas/s): {counts}")
+        return counts
+
+    finally:
+        # Si algo falló, no dejar writers vivos sobre un engine que se cierra
+        for task in writers:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*writers, return_exceptions=True)
+        await engine.dispose()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos de Prism con inserts masivos")
+    parser.add_argument("--areas", type=int, default=8, help="Áreas a crear")
+    parser.add_argument("--clientes", type=int, default=10000, help="Clientes a crear")
+    parser.add_argument("--conversaciones", type=int, default=50000, help="Conversaciones a crear")
+    parser.add_argument("--mensajes", type=int, default=500000, help="Mensajes totales a crear")
+    parser.add_argument("--days", type=float, default=365, help="Ventana de tiempo hacia atrás (días)")
+    parser.add_argument("--length-sigma", type=float, default=1.1, help="Dispersión log-normal del largo de conversación")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Filas por INSERT multi-fila")
+    parser.add_argument("--workers", type=int, default=4, help="Conexiones insertando en paralelo")
+    parser.add_argument("--text-pool", type=int, default=4000, help="Textos pre-generados con Faker")
+    parser.add_argument("--locale", default="es_ES", help="Locale de Faker")
+    parser.add_argument("--seed", type=int, default=None, help="Semilla para reproducir el mismo dataset")
+
+    args = parser.parse_args(argv)
+    if args.conversaciones and not args.clientes:
+        parser.error("--conversaciones requiere al menos un cliente")
+    if args.mensajes < args.conversaciones:
+        parser.error("--mensajes debe ser mayor o igual a --conversaciones (mínimo un mensaje por conversación)")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    print(
+        f"🌱 Generando {args.areas} áreas, {args.clientes:,} clientes, "
+        f"{args.conversaciones:,} conversaciones y {args.mensajes:,} mensajes"
+    )
+    asyncio.run(seed(args))
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+
+
+def percentile(values: Sequence[float], fraction: float) -> Optional[float]:
+    """Percentil por rango más cercano"""
+
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(math.ceil(fraction * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+def latency_summary(values: List[float]) -> Dict[str, Any]:
+    """Conteo, media y p50/p95/p99/máx en milisegundos (valores en segundos)"""
+
+    def to_ms(value: Optional[float]) -> Optional[float]:
+        return round(value * 1000, 3) if value is not None else None
+
+    return {
+        "count": len(values),
+        "mean_ms": to_ms(sum(values) / len(values)) if values else None,
+        "p50_ms": to_ms(percentile(values, 0.50)),
+        "p95_ms": to_ms(percentile(values, 0.95)),
+        "p99_ms": to_ms(percentile(values, 0.99)),
+        "max_ms": to_ms(max(values) if values else None)
+    }
@@ -0,0 +1,300 @@
+"""
+Generador de carga para el chat WebSocket.
+
+Abre N conexiones a /api/chat/ws/{connection_id}, cada una como un cliente
+sintético (Faker), y envía new_client_message siguiendo una curva de llegadas
+(proceso de Poisson con tasa variable). Mide:
+
+- tiempo hasta el broadcast: envío → new_message propio recibido
+- tiempo hasta la respuesta de IA: envío → ai_response con el mismo trace_id
+  (el servidor lo devuelve aunque el tracing esté apagado, también en las
+  derivaciones por saturación)
+
+Para correrlo sin Gemini, levantar el servidor con el LLM simulado:
+
+    AI_SIMULATED=true uvicorn src.main:app
+    python -m src.tools.ws_load_test --clients 200 --rate 20 --duration 120 --curve ramp
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+import websockets
+from faker import Faker
+
+from src.tools.stats import latency_summary
+
+
+# Consultas típicas de los clientes de una consultora (se combinan con datos de Faker)
+_TOPICS = (
+    "¿Cómo declaro el IVA de este mes si tuve facturas atrasadas?",
+    "Necesito ayuda para constituir una sociedad, ¿qué documentos piden?",
+    "Me llegó una notificación del SII y no entiendo qué debo hacer.",
+    "¿Cuánto cuesta llevar la contabilidad de una pyme?",
+    "Quiero revisar un contrato de arriendo antes de firmarlo.",
+    "¿Me conviene cambiarme de régimen tributario este año?",
+    "Tengo dudas con las liquidaciones de sueldo de mis trabajadores.",
+    "¿Pueden ayudarme a preparar un flujo de caja para pedir un crédito?",
+    "¿Cuál es el plazo para la operación renta?",
+    "Hola, quería saber qué servicios ofrecen."
+)
+
+
+
+def arrival_curve(name: str) -> Callable[[float], float]:
+    """Fracción de la tasa máxima según el avance de la prueba (0 a 1)"""
+
+    curves = {
+        "constant": lambda progress: 1.0,
+        "ramp": lambda progress: max(progress, 0.02),
+        "step": lambda progress: 0.25 if progress < 0.5 else 1.0,
+        "spike": lambda progress: 1.0 if 0.45 <= progress < 0.55 else 0.2,
+        "sine": lambda progress: 0.55 + 0.45 * math.sin(4 * math.pi * progress)
+    }
+    if name not in curves:
+        raise ValueError(f"Curva desconocida: {name} (opciones: {', '.join(curves)})")
+    return curves[name]
+
+
+
+class SyntheticClient:
+    """Una conexión WebSocket que se hace pasar por un cliente del chat"""
+
+    def __init__(self, base_url: str, client_id: int, faker: Faker, stats: "LoadStats"):
+        self.connection_id = f"load-{client_id}-{uuid.uuid4().hex[:6]}"
+        self.url = f"{base_url}/api/chat/ws/{self.connection_id}"
+        self.client_id = client_id
+        self.client_name = faker.name()
+        self.company = faker.company()
+        self.faker = faker
+        self.stats = stats
+        self.socket = None
+        self._reader: Optional[asyncio.Task] = None
+        self._pending_broadcast: Dict[str, float] = {}
+        self._pending_reply: Dict[str, float] = {}
+
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending_broadcast) + len(self._pending_reply)
+
+
+    async def connect(self) -> None:
+        self.socket = await websockets.connect(self.url, max_size=None)
+        welcome = json.loads(await self.socket.recv())
+        if welcome.get("type") != "connection_established":
+            raise RuntimeError(f"Respuesta inesperada al conectar: {welcome}")
+        self._reader = asyncio.create_task(self._read_loop())
+
+
+    async def send_message(self) -> None:
+        trace_id = uuid.uuid4().hex[:16]
+        text = self._compose_message()
+        sent_at = time.perf_counter()
+
+        self._pending_broadcast[text] = sent_at
+        self._pending_reply[trace_id] = sent_at
+        self.stats.sent += 1
+
+        await self.socket.send(json.dumps({
+            "type": "new_client_message",
+            "client_id": self.client_id,
+            "client_name": self.client_name,
+            "message": text,
+            "trace_id": trace_id
+        }))
+
+
+    async def close(self) -> None:
+        if self._reader:
+            self._reader.cancel()
+        if self.socket:
+            await self.socket.close()
+
+
+    def _compose_message(self) -> str:
+        topic = self.faker.random_element(_TOPICS)
+        if self.faker.boolean(chance_of_getting_true=40):
+            topic = f"Hola, soy {self.client_name.split()[0]} de {self.company}. {topic}"
+        # Sufijo único para reconocer el broadcast de este mensaje
+        return f"{topic} {self.faker.sentence(nb_words=6)} [{uuid.uuid4().hex[:6]}]"
+
+
+    async def _read_loop(self) -> None:
+        try:
+            async for raw in self.socket:
+                received_at = time.perf_counter()
+                payload = json.loads(raw)
+
+                # El broadcast llega a todas las conexiones: solo cuentan los propios
+                if payload.get("client_id") != self.client_id:
+                    continue
+
+                message_type = payload.get("type")
+                if message_type == "new_message":
+                    sent_at = self._pending_broadcast.pop(payload.get("message", {}).get("content"), None)
+                    if sent_at is not None:
+                        self.stats.broadcast_latencies.append(received_at - sent_at)
+
+                elif message_type == "ai_response":
+                    sent_at = self._pending_reply.pop(payload.get("trace_id"), None)
+                    if sent_at is not None:
+                        self.stats.reply_latencies.append(received_at - sent_at)
+                    else:
+                        # Avisos de cola o mensajes de error
+                        self.stats.other_ai_messages += 1
+
+                elif message_type == "error":
+                    self.stats.errors += 1
+
+        except websockets.ConnectionClosed:
+            self.stats.disconnects += 1
+
+
+
+class LoadStats:
+    def __init__(self):
+        self.sent = 0
+        self.errors = 0
+        self.disconnects = 0
+        self.other_ai_messages = 0
+        self.broadcast_latencies: List[float] = []
+        self.reply_latencies: List[float] = []
+
+
+    def report(self, elapsed: float, pending: int) -> Dict[str, Any]:
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "sent": self.sent,
+            "throughput_sent_per_s": round(self.sent / elapsed, 2) if elapsed else 0,
+            "throughput_replies_per_s": round(len(self.reply_latencies) / elapsed, 2) if elapsed else 0,
+            "time_to_broadcast": latency_summary(self.broadcast_latencies),
+            "time_to_ai_reply": latency_summary(self.reply_latencies),
+            "unanswered": pending,
+            "other_ai_messages": self.other_ai_messages,
+            "errors": self.errors,
+            "disconnects": self.disconnects
+        }
+
+
+
+async def run_load_test(args: argparse.Namespace) -> Dict[str, Any]:
+    faker = Faker(args.locale)
+    rng = random.Random(args.seed)
+    if args.seed is not None:
+        Faker.seed(args.seed)
+
+    stats = LoadStats()
+    curve = arrival_curve(args.curve)
+    clients = [
+        SyntheticClient(args.url, args.client_id_base + index, faker, stats)
+        for index in range(args.clients)
+    ]
+
+    # Conexiones escalonadas para no medir la tormenta de handshakes
+    print(f"🔌 Abriendo {len(clients)} conexiones a {args.url}...")
+    connect_limit = asyncio.Semaphore(args.connect_concurrency)
+
+    async def connect(client: SyntheticClient) -> None:
+        async with connect_limit:
+            await client.connect()
+
+    await asyncio.gather(*(connect(client) for client in clients))
+    print(f"✅ {len(clients)} clientes conectados")
+
+    # Llegadas de Poisson no homogéneas (thinning): candidatos a la tasa máxima,
+    # aceptados con probabilidad curve(progreso)
+    print(f"🚀 Enviando hasta {args.rate} msg/s durante {args.duration}s (curva {args.curve})")
+    started = time.perf_counter()
+    sends = []
+    next_arrival = started
+    while True:
+        next_arrival += rng.expovariate(args.rate)
+        progress = (next_arrival - started) / args.duration
+        if progress >= 1:
+            break
+
+        delay = next_arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if rng.random() <= curve(progress):
+            sends.append(asyncio.create_task(rng.choice(clients).send_message()))
+
+    await asyncio.gather(*sends, return_exceptions=True)
+    sending_elapsed = time.perf_counter() - started
+
+    # Esperar las respuestas en vuelo
+    print(f"⏳ Esperando respuestas pendientes (máx. {args.drain_timeout}s)...")
+    drain_deadline = time.perf_counter() + args.drain_timeout
+    while any(client.pending for client in clients) and time.perf_counter() < drain_deadline:
+        await asyncio.sleep(0.1)
+
+    pending = sum(client.pending for client in clients)
+    await asyncio.gather(*(client.close() for client in clients), return_exceptions=True)
+
+    report = stats.report(sending_elapsed, pending)
+    report["config"] = {
+        "clients": args.clients,
+        "rate": args.rate,
+        "duration": args.duration,
+        "curve": args.curve
+    }
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print("\n📊 Resultado de la prueba de carga")
+    print(f"   Mensajes enviados: {report['sent']} ({report['throughput_sent_per_s']} msg/s)")
+    print(f"   Respuestas de IA: {report['time_to_ai_reply']['count']} ({report['throughput_replies_per_s']} resp/s)")
+    for key, label in (("time_to_broadcast", "Tiempo hasta broadcast"), ("time_to_ai_reply", "Tiempo hasta respuesta IA")):
+        item = report[key]
+        print(
+            f"   {label}: p50={item['p50_ms']} ms  p95={item['p95_ms']} ms  "
+            f"p99={item['p99_ms']} ms  máx={item['max_ms']} ms"
+        )
+    print(
+        f"   Sin respuesta: {report['unanswered']}  Otros mensajes IA: {report['other_ai_messages']}  "
+        f"Errores: {report['errors']}  Desconexiones: {report['disconnects']}"
+    )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Prueba de carga del chat WebSocket con clientes sintéticos")
+    parser.add_argument("--url", default="ws://127.0.0.1:8000", help="URL base del servidor (ws:// o wss://)")
+    parser.add_argument("--clients", type=int, default=50, help="Conexiones concurrentes")
+    parser.add_argument("--rate", type=float, default=5.0, help="Tasa máxima de mensajes por segundo (todas las conexiones)")
+    parser.add_argument("--duration", type=float, default=60.0, help="Duración del envío en segundos")
+    parser.add_argument(
+        "--curve", default="constant", choices=("constant", "ramp", "step", "spike", "sine"),
+        help="Curva de llegadas"
+    )
+    parser.add_argument("--drain-timeout", type=float, default=60.0, help="Espera máxima por respuestas al final")
+    parser.add_argument("--connect-concurrency", type=int, default=20, help="Handshakes simultáneos al conectar")
+    parser.add_argument("--client-id-base", type=int, default=900000, help="Primer id de cliente sintético")
+    parser.add_argument("--locale", default="es_ES", help="Locale de Faker")
+    parser.add_argument("--seed", type=int, default=None, help="Semilla para reproducir la misma carga")
+    parser.add_argument("--json", dest="json_path", default=None, help="Guardar el resultado en un archivo JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    report = asyncio.run(run_load_test(args))
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        print(f"💾 Resultado guardado en {args.json_path}")
+
+
+
+if __name__ == "__main__":
+    main()
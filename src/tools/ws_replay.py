@@ -0,0 +1,316 @@
+"""
+Replay de sesiones WebSocket grabadas por SessionRecorder.
+
+Reabre cada sesión grabada contra un servidor y reenvía sus frames con los
+tiempos originales divididos por --speed (1 = tiempo real, 10 = diez veces
+más rápido, 0 = tan rápido como sea posible), conservando el orden dentro de
+cada sesión y el solapamiento entre sesiones. Mide por tipo de frame:
+
+- new_client_message: tiempo hasta el broadcast y hasta la respuesta de IA
+  (ai_response con el trace_id enviado, que el servidor devuelve aunque el
+  tracing esté apagado y también en las derivaciones por saturación)
+- get_active_conversations / get_conversation_history: tiempo hasta la respuesta
+
+    AI_SIMULATED=true uvicorn src.main:app
+    python -m src.tools.ws_replay recordings/*.ndjson --speed 10 --output /tmp/replay-a.json
+    python -m src.tools.ws_replay recordings/*.ndjson --speed 10 --compare /tmp/replay-a.json
+
+Los ids de cliente se desplazan con --client-id-offset para no mezclarse con
+los datos reales de la base destino. Los frames de administración que apuntan
+a conversaciones grabadas (admin_response, transfer, close) solo tienen
+sentido contra una copia de la base de origen.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import msgspec
+import websockets
+
+from src.tools.stats import latency_summary
+
+
+# Frame enviado → tipo de la respuesta directa que se espera en el mismo socket
+_DIRECT_RESPONSES = {
+    "get_active_conversations": "active_conversations",
+    "get_conversation_history": "conversation_history"
+}
+
+Event = Dict[str, Any]
+
+
+
+def load_sessions(paths: List[str], types: Optional[List[str]]) -> Dict[str, List[Event]]:
+    """Agrupa los eventos de las grabaciones por conexión, ordenados por tiempo"""
+
+    decoder = msgspec.json.Decoder()
+    sessions: Dict[str, List[Event]] = defaultdict(list)
+
+    for path in paths:
+        with open(path, "rb") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                event = decoder.decode(line)
+                if "c" not in event:
+                    continue  # cabecera
+                frame = event.get("f")
+                if frame is not None and types and frame.get("type") not in types:
+                    continue
+                sessions[event["c"]].append(event)
+
+    for events in sessions.values():
+        events.sort(key=lambda event: event["t"])
+
+    # Sesiones sin frames (solo open/close) no aportan carga
+    return {connection: events for connection, events in sessions.items() if any("f" in event for event in events)}
+
+
+
+class ReplayStats:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.sent: Dict[str, int] = defaultdict(int)
+        self.errors = 0
+        self.unanswered = 0
+        self.other_ai_messages = 0
+
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "sent": dict(self.sent),
+            "latencies": {name: latency_summary(values) for name, values in sorted(self.latencies.items())},
+            "errors": self.errors,
+            "unanswered": self.unanswered,
+            "other_ai_messages": self.other_ai_messages
+        }
+
+
+
+class ReplaySession:
+    """Reproduce una sesión grabada sobre una conexión nueva"""
+
+    def __init__(self, url: str, events: List[Event], args: argparse.Namespace, stats: ReplayStats, origin: float):
+        self.url = f"{url}/api/chat/ws/replay-{uuid.uuid4().hex[:10]}"
+        self.events = events
+        self.args = args
+        self.stats = stats
+        self.origin = origin
+        self.socket = None
+        self._client_ids: set = set()
+        self._pending_broadcast: Dict[Tuple[int, str], Deque[float]] = defaultdict(deque)
+        self._pending_reply: Dict[str, float] = {}
+        self._pending_direct: Dict[str, Deque[Tuple[str, float]]] = defaultdict(deque)
+
+
+    @property
+    def pending(self) -> int:
+        return (
+            sum(len(queue) for queue in self._pending_broadcast.values())
+            + len(self._pending_reply)
+            + sum(len(queue) for queue in self._pending_direct.values())
+        )
+
+
+    async def run(self) -> None:
+        await self._wait_until(self.events[0]["t"])
+        self.socket = await websockets.connect(self.url, max_size=None)
+        await self.socket.recv()  # connection_established
+        reader = asyncio.create_task(self._read_loop())
+
+        try:
+            for event in self.events:
+                frame = event.get("f")
+                if frame is None:
+                    continue
+                await self._wait_until(event["t"])
+                await self._send(dict(frame))
+
+            # Esperar lo pendiente de esta sesión
+            deadline = time.perf_counter() + self.args.drain_timeout
+            while self.pending and time.perf_counter() < deadline:
+                await asyncio.sleep(0.05)
+            self.stats.unanswered += self.pending
+
+        finally:
+            reader.cancel()
+            await self.socket.close()
+
+
+    async def _wait_until(self, recorded_ms: int) -> None:
+        if self.args.speed <= 0:
+            return
+        delay = self.origin + recorded_ms / 1000 / self.args.speed - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+    async def _send(self, frame: Dict[str, Any]) -> None:
+        frame_type = frame.get("type", "unknown")
+        sent_at = time.perf_counter()
+
+        if frame_type == "new_client_message":
+            client_id = int(frame.get("client_id", 0)) + self.args.client_id_offset
+            frame["client_id"] = client_id
+            frame["trace_id"] = uuid.uuid4().hex[:16]
+            self._client_ids.add(client_id)
+            self._pending_broadcast[(client_id, frame.get("message"))].append(sent_at)
+            self._pending_reply[frame["trace_id"]] = sent_at
+
+        elif frame_type in _DIRECT_RESPONSES:
+            self._pending_direct[_DIRECT_RESPONSES[frame_type]].append((frame_type, sent_at))
+
+        self.stats.sent[frame_type] += 1
+        await self.socket.send(json.dumps(frame))
+
+
+    async def _read_loop(self) -> None:
+        try:
+            await self._consume()
+        except websockets.ConnectionClosed:
+            pass
+
+
+    async def _consume(self) -> None:
+        async for raw in self.socket:
+            received_at = time.perf_counter()
+            payload = json.loads(raw)
+            payload_type = payload.get("type")
+
+            if payload_type in self._pending_direct and self._pending_direct[payload_type]:
+                frame_type, sent_at = self._pending_direct[payload_type].popleft()
+                self.stats.latencies[frame_type].append(received_at - sent_at)
+                continue
+
+            if payload_type == "error":
+                self.stats.errors += 1
+                continue
+
+            # Broadcasts: solo los de los clientes de esta sesión
+            if payload.get("client_id") not in self._client_ids:
+                continue
+
+            if payload_type == "new_message":
+                key = (payload["client_id"], payload.get("message", {}).get("content"))
+                if self._pending_broadcast.get(key):
+                    sent_at = self._pending_broadcast[key].popleft()
+                    self.stats.latencies["new_client_message.broadcast"].append(received_at - sent_at)
+
+            elif payload_type == "ai_response":
+                sent_at = self._pending_reply.pop(payload.get("trace_id"), None)
+                if sent_at is not None:
+                    self.stats.latencies["new_client_message.ai_reply"].append(received_at - sent_at)
+                else:
+                    # Avisos de cola o mensajes de error
+                    self.stats.other_ai_messages += 1
+
+
+
+async def replay(args: argparse.Namespace) -> Dict[str, Any]:
+    sessions = load_sessions(args.recordings, args.types)
+    if not sessions:
+        raise SystemExit("No hay sesiones con frames en las grabaciones indicadas")
+
+    # El tiempo de la grabación arranca en la primera sesión reproducida
+    first_ms = min(events[0]["t"] for events in sessions.values())
+    for events in sessions.values():
+        for event in events:
+            event["t"] -= first_ms
+
+    total_frames = sum(1 for events in sessions.values() for event in events if "f" in event)
+    speed = f"{args.speed}x" if args.speed > 0 else "máxima velocidad"
+    print(f"▶️ Reproduciendo {len(sessions)} sesiones ({total_frames} frames) a {speed} contra {args.url}")
+
+    stats = ReplayStats()
+    started = time.perf_counter()
+    runners = [ReplaySession(args.url, events, args, stats, started) for events in sessions.values()]
+    results = await asyncio.gather(*(runner.run() for runner in runners), return_exceptions=True)
+
+    failed = [result for result in results if isinstance(result, Exception)]
+    if failed:
+        print(f"⚠️ {len(failed)} sesiones fallaron (p.ej. {failed[0]!r})")
+
+    report = stats.report(time.perf_counter() - started)
+    report["config"] = {"speed": args.speed, "sessions": len(sessions), "frames": total_frames}
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"\n📊 Replay: {report['elapsed_s']}s, enviados {report['sent']}")
+    for name, summary in report["latencies"].items():
+        print(
+            f"   {name}: n={summary['count']} p50={summary['p50_ms']} ms "
+            f"p95={summary['p95_ms']} ms p99={summary['p99_ms']} ms"
+        )
+    print(
+        f"   Sin respuesta: {report['unanswered']}  Errores: {report['errors']}  "
+        f"Otros mensajes de IA: {report.get('other_ai_messages', 0)}"
+    )
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any], max_regression: float) -> List[str]:
+    """Compara percentiles por tipo de frame; retorna las regresiones de p95/p99"""
+
+    regressions = []
+    print("\n📊 Comparación con la corrida anterior")
+    for name, summary in current["latencies"].items():
+        before = previous.get("latencies", {}).get(name)
+        if not before:
+            continue
+
+        changes = []
+        for percentile_name in ("p50_ms", "p95_ms", "p99_ms"):
+            old, new = before.get(percentile_name), summary.get(percentile_name)
+            if not old or new is None:
+                continue
+            change = new / old - 1
+            changes.append(f"{percentile_name[:-3]} {old} → {new} ms ({change * 100:+.0f}%)")
+            if percentile_name != "p50_ms" and change > max_regression:
+                regressions.append(f"{name} {percentile_name[:-3]}")
+        print(f"   {name}: {'  '.join(changes)}")
+
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Reproduce sesiones WebSocket grabadas y mide latencias")
+    parser.add_argument("recordings", nargs="+", help="Archivos NDJSON de SessionRecorder")
+    parser.add_argument("--url", default="ws://127.0.0.1:8000", help="URL base del servidor (ws:// o wss://)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Factor de velocidad (1, 10, ...; 0 = máxima)")
+    parser.add_argument("--types", nargs="*", default=None, help="Solo reproducir estos tipos de frame")
+    parser.add_argument("--client-id-offset", type=int, default=0, help="Desplazamiento de los ids de cliente")
+    parser.add_argument("--drain-timeout", type=float, default=60.0, help="Espera máxima por respuestas al final de cada sesión")
+    parser.add_argument("--output", default=None, help="Guardar el resultado en un archivo JSON")
+    parser.add_argument("--compare", default=None, help="Resultado de una corrida anterior para comparar")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Aumento tolerado de p95/p99 (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    report = asyncio.run(replay(args))
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+        print(f"💾 Resultado guardado en {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            regressions = compare(json.load(file), report, args.max_regression)
+        if regressions:
+            print(f"\n❌ Regresiones: {', '.join(regressions)}")
+            raise SystemExit(1)
+        print("\n✅ Sin regresiones")
+
+
+
+if __name__ == "__main__":
+    main()